@@ -0,0 +1,89 @@
+import random
+import sys
+from timeit import default_timer
+from auxiliary_functions.auxiliary_functions import random_car
+from car_controllers.follower_controller import follower_controller
+from models.message import Message
+from models.vehicle_engine import VehicleEngine
+
+
+def create_cars(number_of_cars, seed=0):
+    """
+    Creates the cars of a benchmark, in random lanes and with random
+    intentions. Every car after the first one of its lane follows the
+    previous car of the lane, as in a simulation.
+    :param number_of_cars: <int>
+    :param seed: <int> seed of the random values of the cars.
+    :return: <list of Cars>
+    """
+    generator = random.Random(seed)
+    cars = []
+    last_cars = {}
+    for name in range(number_of_cars):
+        car = random_car(name, 10, 10, 0, 4, True, 5, generator=generator,
+                         lane=generator.randint(0, 3),
+                         intention=generator.choice(["l", "s", "r"]))
+        car.new_footprint()
+        leader = last_cars.get(car.get_lane())
+        if leader is not None:
+            car.set_following_car_message(Message(leader))
+            car.set_controller(follower_controller)
+            car.set_following(True)
+        last_cars[car.get_lane()] = car
+        cars.append(car)
+    return cars
+
+
+def time_scalar_update(cars, ticks):
+    """
+    Times the update of the kinematics of some cars one by one.
+    :param cars: <list of Cars>
+    :param ticks: <int> number of ticks.
+    :return: <float> seconds per tick.
+    """
+    start = default_timer()
+    for _ in range(ticks):
+        for car in cars:
+            car.update_kinematics()
+    return (default_timer() - start) / ticks
+
+
+def time_engine_update(cars, ticks):
+    """
+    Times the update of the kinematics of some cars with a VehicleEngine.
+    :param cars: <list of Cars>
+    :param ticks: <int> number of ticks.
+    :return: <float> seconds per tick.
+    """
+    engine = VehicleEngine()
+    for car in cars:
+        engine.add(car)
+    start = default_timer()
+    for _ in range(ticks):
+        engine.step()
+    return (default_timer() - start) / ticks
+
+
+def engine_benchmark(numbers_of_cars=(1, 4, 8, 16, 32, 64, 128, 512),
+                     ticks=300):
+    """
+    Prints the milliseconds per tick used to update the kinematics of the
+    cars one by one and with a VehicleEngine, for some numbers of cars.
+    :param numbers_of_cars: <list of ints>
+    :param ticks: <int> number of ticks of every run.
+    """
+    print "{:>6}{:>12}{:>12}{:>10}".format("cars", "scalar", "engine",
+                                           "speedup")
+    for number_of_cars in numbers_of_cars:
+        scalar = time_scalar_update(create_cars(number_of_cars), ticks)
+        engine = time_engine_update(create_cars(number_of_cars), ticks)
+        print "{:>6}{:>12.3f}{:>12.3f}{:>10.2f}".format(
+            number_of_cars, scalar * 1000, engine * 1000, scalar / engine
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        engine_benchmark([int(number) for number in sys.argv[1:]])
+    else:
+        engine_benchmark()
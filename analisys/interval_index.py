@@ -0,0 +1,167 @@
+from bisect import bisect_right
+
+infinity = float("inf")
+
+
+class IntervalIndex(object):
+    """
+    Centered interval tree of items by the interval [start, end) they
+    cover, built once, usually the cars of a log by the ticks they were at
+    the intersection (see car_interval_index). Every node has a center, the
+    intervals of the node (the ones containing the center), sorted by start
+    and by end, and the nodes of the intervals before and after the center,
+    so the items at a time or overlapping a window are found in
+    O(log n + items found). The items aren't returned in any order.
+    """
+
+    def __init__(self, intervals):
+        """
+        :param intervals: <list of tuples> (start, end, item) of every item.
+            The intervals with end <= start are left out.
+        """
+        intervals = [interval for interval in intervals
+                     if interval[1] > interval[0]]
+        self.starts = sorted(interval[0] for interval in intervals)
+        self.ends = sorted(interval[1] for interval in intervals)
+        self.root = self.build(intervals)
+
+    def __len__(self):
+        """
+        Number of items of the index.
+        :return: <int>
+        """
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, intervals):
+        """
+        Builds the node of some intervals and its children.
+        :param intervals: <list of tuples> (start, end, item).
+        :return: <tuple> (center, intervals by start, intervals by end from
+            the last one, node before, node after), or None without
+            intervals.
+        """
+        if not intervals:
+            return None
+        starts = sorted(interval[0] for interval in intervals)
+        center = starts[len(starts) // 2]
+        before = []
+        after = []
+        centered = []
+        for interval in intervals:
+            if interval[1] <= center:
+                before.append(interval)
+            elif interval[0] > center:
+                after.append(interval)
+            else:
+                centered.append(interval)
+        return (
+            center,
+            sorted(centered, key=lambda interval: interval[0]),
+            sorted(centered, key=lambda interval: -interval[1]),
+            cls.build(before),
+            cls.build(after)
+        )
+
+    def at(self, time):
+        """
+        Returns the items whose interval contains a time.
+        :param time: <float>
+        :return: <list> items with start <= time < end.
+        """
+        items = []
+        node = self.root
+        while node is not None:
+            center, by_start, by_end, before, after = node
+            if time < center:
+                # the intervals of the node end after the time
+                for interval in by_start:
+                    if interval[0] > time:
+                        break
+                    items.append(interval[2])
+                node = before
+            elif time > center:
+                # the intervals of the node start before the time
+                for interval in by_end:
+                    if interval[1] <= time:
+                        break
+                    items.append(interval[2])
+                node = after
+            else:
+                items.extend(interval[2] for interval in by_start)
+                node = None
+        return items
+
+    def overlapping(self, start, end):
+        """
+        Returns the items whose interval overlaps a window.
+        :param start: <float> start of the window.
+        :param end: <float> end of the window, not included. Greater than
+            start.
+        :return: <list> items with start < end of the window and end > start
+            of the window.
+        """
+        items = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, before, after = node
+            if end <= center:
+                # the intervals of the node end after the window
+                for interval in by_start:
+                    if interval[0] >= end:
+                        break
+                    items.append(interval[2])
+                nodes.append(before)
+            elif start > center:
+                # the intervals of the node start before the window
+                for interval in by_end:
+                    if interval[1] <= start:
+                        break
+                    items.append(interval[2])
+                nodes.append(after)
+            else:
+                items.extend(interval[2] for interval in by_start)
+                nodes.append(before)
+                nodes.append(after)
+        return items
+
+    def count_at(self, time):
+        """
+        Returns the number of items whose interval contains a time, without
+        finding them.
+        :param time: <float>
+        :return: <int>
+        """
+        return bisect_right(self.starts, time) - bisect_right(self.ends, time)
+
+    def get_occupancy(self, times):
+        """
+        Returns the number of items at some times, as the number of cars at
+        the intersection at every tick.
+        :param times: <list of floats>
+        :return: <list of ints>
+        """
+        return [self.count_at(time) for time in times]
+
+
+def car_interval_index(records):
+    """
+    Creates the index of the ticks the cars of a log were at the
+    intersection, from their creation time until they left it. The cars
+    that never left (-1 left intersection time) are at the intersection
+    until the end, and the ones without creation time (-1) are left out.
+    :param records: <list of CarRecords> (see log_files_process).
+    :return: <IntervalIndex> of the records.
+    """
+    intervals = []
+    for record in records:
+        if record.creation_time == -1:
+            continue
+        end = record.left_intersection_time
+        if end == -1:
+            end = infinity
+        intervals.append((record.creation_time, end, record))
+    return IntervalIndex(intervals)
@@ -1,12 +1,70 @@
+from collections import namedtuple
 from models.car import Car
 from models.message import Message
-from json import JSONDecoder
+from auxiliary_functions.json_lines import read_json_lines
 
+# state of a car in a log. The logs are read as records, which are much
+# lighter than Cars, and a Car is built from a record (see record_to_car)
+# only when it has to be simulated or drawn. The nulls of all the logs are
+# read as -1.
+CarRecord = namedtuple("CarRecord", [
+    "name", "following", "lane", "speed", "creation_time",
+    "left_intersection_time", "intention", "x_coordinate", "y_coordinate",
+    "direction", "caravan_depth"
+])
+# collision of a collisions log: the cars at the intersection and the names
+# of the collided cars
+CollisionLogRecord = namedtuple("CollisionLogRecord", [
+    "code", "time", "cars", "collided_names"
+])
+# coordination of a coordination log: the coordinated car and the cars at
+# the intersection, in the order the supervisor checked them
+CoordinationRecord = namedtuple("CoordinationRecord", [
+    "coordinated_car", "car_order", "selected_car"
+])
 
-def generate_left_intersection_cars_from_file(left_intersection_file):
+
+def car_record(car_information):
+    """
+    Creates the record of a car logged with Car.to_json.
+    :param car_information: <dict> json representation of the car.
+    :return: <CarRecord>
+    """
+    coordinates = car_information["actual_coordinates"]
+    return CarRecord(
+        car_information["name"], car_information["following"],
+        car_information["lane"], car_information["speed"],
+        car_information["creation_time"],
+        car_information.get("left_intersection_time", -1),
+        car_information["intention"].encode('ascii', 'ignore'),
+        coordinates["x_coordinate"], coordinates["y_coordinate"],
+        coordinates["direction"], car_information.get("actual_caravan_depth")
+    )
+
+
+def record_to_car(record):
     """
-    Create cars from the information at a file. Every line of the file must
-    have the form
+    Creates a car from its record.
+    :param record: <CarRecord>
+    :return: <Car>
+    """
+    return Car(
+        int(record.name),
+        pos_x=record.x_coordinate,
+        pos_y=record.y_coordinate,
+        absolute_speed=record.speed,
+        direction=record.direction,
+        lane=record.lane,
+        intention=record.intention,
+        creation_time=record.creation_time,
+        left_intersection_time=record.left_intersection_time
+    )
+
+
+def iterate_left_intersection_records(left_intersection_file):
+    """
+    Reads the cars of a log of cars that left the intersection, one at a
+    time. Every record of the file (see read_json_lines) must have the form
     {
         "time":<log_time, str>,
         "message":[
@@ -27,35 +85,61 @@ def generate_left_intersection_cars_from_file(left_intersection_file):
             }
         ]
     }
+    The nulls of the log are read as -1, as in the other logs.
     :param left_intersection_file: log file of the cars that left the
         intersection.
-    :return: <dict> Dictionary that for key has the car and the values is the
-        car.
-    """
-    all_cars = {}
-    for line in left_intersection_file:
-        cars_information = JSONDecoder().decode(
-            line[:len(line) - 2]
-        )['message']
-        for car_information in cars_information:
-            all_cars[car_information["name"]] = Car(
-                int(car_information["name"]),
-                pos_x=car_information["actual_coordinates"]["x_coordinate"],
-                pos_y=car_information["actual_coordinates"]["y_coordinate"],
-                direction=car_information["actual_coordinates"]["direction"],
-                lane=car_information["lane"],
-                intention=car_information["intention"].encode(
-                    'ascii', 'ignore'
+    :return: <generator of CarRecords>
+    """
+    for record in read_json_lines(left_intersection_file, null=-1):
+        for car_information in record['message']:
+            yield car_record(car_information)
+
+
+def iterate_collision_records(collisions_file):
+    """
+    Reads the collisions of a collisions log, one at a time. The nulls of
+    the log are read as -1.
+    :param collisions_file: log file of the collisions.
+    :return: <generator of CollisionLogRecords>
+    """
+    for record in read_json_lines(collisions_file, null=-1):
+        collision_information = record['message']
+        yield CollisionLogRecord(
+            collision_information["collision_code"],
+            collision_information["collision_time"],
+            tuple(
+                car_record(car_information)
+                for car_information in collision_information[
+                    "collision_initial_conditions"]
+            ),
+            tuple(
+                car_information["name"]
+                for car_information in collision_information["collided_cars"]
+            )
+        )
+
+
+def iterate_coordination_records(coordination_file):
+    """
+    Reads the coordinations of a coordination log, one at a time. The nulls
+    of the log are read as -1, and the records without a coordination are
+    printed and skipped.
+    :param coordination_file: file with the json information.
+    :return: <generator of CoordinationRecords>
+    """
+    for record in read_json_lines(coordination_file, null=-1):
+        try:
+            coordination = record['message']
+            yield CoordinationRecord(
+                car_record(coordination["coordinated_car"]),
+                tuple(
+                    car_record(car_information)
+                    for car_information in coordination["car_order"]
                 ),
-                creation_time=car_information["creation_time"],
-                left_intersection_time=car_information[
-                    "left_intersection_time"
-                ]
+                car_record(coordination["selected_car"])
             )
-            if car_information["following"] in all_cars.keys():
-                all_cars[car_information["name"]].set_following_car_message(
-                    Message(all_cars[car_information["following"]]))
-    return all_cars
+        except KeyError:
+            print record
 
 
 def generate_collision_cars_from_file(collisions_file, all_cars):
@@ -64,119 +148,64 @@ def generate_collision_cars_from_file(collisions_file, all_cars):
     dictionry that for value has dicts that are all the cars present at a
     collision.
     :param collisions_file: log file of the collisions.
-    :param all_cars: all the cars of the simulation.
+    :param all_cars: <dict> records of all the cars of the simulation, by
+        name (see iterate_left_intersection_records). A car is only created
+        when a car of a collision follows it.
     :return: dict that for keys has an int (from 0 and on) and for value has
     another dict, that for key has a car name and for value a car.
     """
     collisions_cars = {}
     collided_cars = {}
-    counter = 0
-    for line in collisions_file:
-        collision_information = JSONDecoder().decode(
-            line[:len(line) - 2].replace("None", "-1")
-        )['message']
-        collided_cars_information = collision_information["collided_cars"]
-        collisions_cars[counter] = {}
-        collision_cars = collisions_cars[counter]
+    for counter, collision in enumerate(
+            iterate_collision_records(collisions_file)):
+        collision_cars = {}
+        collisions_cars[counter] = collision_cars
         collided_cars[counter] = []
-        for car_information in collision_information[
-                "collision_initial_conditions"]:
-            collision_cars[car_information["name"]] = Car(
-                car_information["name"],
-                pos_x=car_information["actual_coordinates"]["x_coordinate"],
-                pos_y=car_information["actual_coordinates"]["y_coordinate"],
-                direction=car_information["actual_coordinates"]["direction"],
-                lane=car_information["lane"],
-                absolute_speed=car_information["speed"],
-                intention=car_information["intention"],
-                creation_time=car_information["creation_time"]
-            )
-            car_1_collitioned = (
-                collision_cars[car_information["name"]].get_name() ==
-                collided_cars_information[0]["name"]
-            )
-            car_2_collitioned = (
-                collision_cars[car_information["name"]].get_name() ==
-                collided_cars_information[1]["name"]
-            )
-            if car_1_collitioned or car_2_collitioned:
-                collided_cars[counter].append(
-                    collision_cars[car_information["name"]]
-                )
-        for car_information in collision_information[
-                "collision_initial_conditions"]:
-            if car_information["following"] in collision_cars.keys():
-                collision_cars[car_information["name"]].set_following(True)
-                collision_cars[
-                    car_information["name"]
-                ].set_following_car_message(
-                    Message(collision_cars[car_information["following"]])
+        for record in collision.cars:
+            car = record_to_car(record)
+            collision_cars[record.name] = car
+            if record.name in collision.collided_names:
+                collided_cars[counter].append(car)
+        for record in collision.cars:
+            if record.following in collision_cars:
+                collision_cars[record.name].set_following(True)
+                collision_cars[record.name].set_following_car_message(
+                    Message(collision_cars[record.following])
                 )
-            elif car_information["following"] is not -1:
-                collisions_cars[counter][
-                    car_information["name"]
-                ].set_following_car_message(
-                    Message(all_cars[car_information["following"]])
+            elif record.following != -1:
+                collision_cars[record.name].set_following_car_message(
+                    Message(record_to_car(all_cars[record.following]))
                 )
-        counter += 1
     return collisions_cars, collided_cars
 
 
 def generate_coordination_info_from_file(coordination_file):
     """
-    Generates the cars that were present when a car was created. Used for
-    collision simulation purposes.
+    Reads the coordinations of a log, to create the cars that were present
+    when a car was created with coordination_cars. Used for collision
+    simulation purposes.
     :param coordination_file: file with the json information.
-    :return: dict with list of car. The key is the car that was created.
+    :return: <dict> CoordinationRecord of every coordinated car, by name.
     """
-    coordination_info = {}
-    for line in coordination_file:
-        try:
-            coordination = JSONDecoder().decode(
-                line[:len(line) - 2].replace("None", "-1")
-            )['message']
-            coordination_info[coordination["coordinated_car"]["name"]] = []
-            for car_information in coordination["car_order"]:
-                car = Car(
-                    car_information["name"],
-                    pos_x=car_information[
-                        "actual_coordinates"]["x_coordinate"],
-                    pos_y=car_information[
-                        "actual_coordinates"]["y_coordinate"],
-                    absolute_speed=car_information["speed"],
-                    direction=car_information[
-                        "actual_coordinates"]["direction"],
-                    lane=car_information["lane"],
-                    intention=car_information["intention"],
-                    creation_time=car_information["creation_time"]
-                )
-                car.set_origin_coordinates(car.get_lane())
-                car.set_registered_caravan_depth(
-                    car_information["actual_caravan_depth"]
-                )
-                car.set_following(True)
-                coordination_info[
-                    coordination["coordinated_car"]["name"]].append(car)
-            same_car = Car(
-                coordination["coordinated_car"]["name"],
-                pos_x=coordination[
-                    "coordinated_car"]["actual_coordinates"]["x_coordinate"],
-                pos_y=coordination[
-                    "coordinated_car"]["actual_coordinates"]["y_coordinate"],
-                absolute_speed=coordination["coordinated_car"]["speed"],
-                direction=coordination[
-                    "coordinated_car"]["actual_coordinates"]["direction"],
-                lane=coordination["coordinated_car"]["lane"],
-                intention=coordination["coordinated_car"]["intention"],
-                creation_time=coordination["coordinated_car"]["creation_time"]
-            )
-            same_car.set_origin_coordinates(same_car.get_lane())
-            same_car.set_registered_caravan_depth(
-                coordination["coordinated_car"]["actual_caravan_depth"]
-            )
-            same_car.set_following(True)
-            coordination_info[
-                coordination["coordinated_car"]["name"]].append(same_car)
-        except KeyError:
-            print line
-    return coordination_info
+    return {
+        coordination.coordinated_car.name: coordination
+        for coordination in iterate_coordination_records(coordination_file)
+    }
+
+
+def coordination_cars(coordination):
+    """
+    Creates the cars that were present when a car was created, and the car
+    itself, following the cars before them.
+    :param coordination: <CoordinationRecord>
+    :return: <list of Cars> the cars in the order the supervisor checked
+        them and the coordinated car.
+    """
+    cars = []
+    for record in coordination.car_order + (coordination.coordinated_car,):
+        car = record_to_car(record)
+        car.set_origin_coordinates(car.get_lane())
+        car.set_registered_caravan_depth(record.caravan_depth)
+        car.set_following(True)
+        cars.append(car)
+    return cars
@@ -0,0 +1,65 @@
+import sys
+from models.car import Car, SupervisorCar, InfrastructureCar, \
+    SecondAtChargeCar
+from models.message import Message, InfoMessage, NewCarMessage, \
+    LeftIntersectionMessage, SupervisorLeftIntersectionMessage, \
+    FollowingCarMessage, SecondAtChargeMessage, NewSupervisorMessage
+
+
+def get_object_size(obj):
+    """
+    Gets the bytes used by an object and its attribute dictionary, if it has
+    one. The values of the attributes aren't counted.
+    :param obj: any object.
+    :return: <int>
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def get_containers_size(obj):
+    """
+    Gets the bytes used by the lists and dictionaries an object has as
+    attributes.
+    :param obj: any object.
+    :return: <int>
+    """
+    size = 0
+    names = list(getattr(obj, "__dict__", {}))
+    for cls in type(obj).__mro__:
+        names.extend(getattr(cls, "__slots__", ()))
+    for name in set(names):
+        value = getattr(obj, name, None)
+        if isinstance(value, (list, dict)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def memory_report():
+    """
+    Prints the bytes used by every car and message class.
+    """
+    car = Car(1)
+    cars = [car, SupervisorCar(2), InfrastructureCar(-1), SecondAtChargeCar(3)]
+    messages = [
+        Message(), Message(car), InfoMessage(car), NewCarMessage(car),
+        LeftIntersectionMessage(car), SupervisorLeftIntersectionMessage(car),
+        FollowingCarMessage(car, 2, -1), SecondAtChargeMessage(car, 2),
+        NewSupervisorMessage(car)
+    ]
+    print "{:<36}{:>10}{:>12}{:>8}".format(
+        "class", "object", "containers", "total"
+    )
+    for obj in cars + messages:
+        object_size = get_object_size(obj)
+        containers_size = get_containers_size(obj)
+        print "{:<36}{:>10}{:>12}{:>8}".format(
+            obj.__class__.__name__, object_size, containers_size,
+            object_size + containers_size
+        )
+
+
+if __name__ == "__main__":
+    memory_report()
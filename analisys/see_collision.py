@@ -2,8 +2,11 @@ import pygame
 import os
 from auxiliary_functions.auxiliary_functions import display_info_on_car, \
     show_caravan, continue_simulation, init_graphic_environment
-from log_files_process import generate_left_intersection_cars_from_file, \
+from log_files_process import iterate_left_intersection_records, \
     generate_collision_cars_from_file
+from interval_index import car_interval_index
+from models.car import Car
+from models.sprite_cache import car_sprites
 
 
 def see_collision(log):
@@ -16,27 +19,28 @@ def see_collision(log):
     all_cars_file = open(log_directory + "left_intersection" + log + ".log")
     collisions_file = open(log_directory + "collisions" + log + ".log")
 
-    print "Creating cars"
-    all_cars = generate_left_intersection_cars_from_file(all_cars_file)
-    print "Finished creating cars. Loading collisions."
+    print "Reading cars"
+    all_cars = {
+        record.name: record
+        for record in iterate_left_intersection_records(all_cars_file)
+    }
+    print "Finished reading cars. Loading collisions."
     collisions_cars, collided_cars = generate_collision_cars_from_file(
         collisions_file, all_cars
     )
     print "Finished"
 
     cars_at_creation_of_collided_car = {}
-    all_cars_values = all_cars.values()
+    cars_index = car_interval_index(all_cars.values())
     for collided_car in collided_cars.values():
-        cars_at_creation_of_collided_car[collided_car[1].get_name()] = []
-        for car in all_cars_values:
-            if (car.get_name() <= collided_car[1].get_name() and
-                    car.get_left_intersection_time() >
-                    collided_car[1].get_creation_time()):
-                cars_at_creation_of_collided_car[
-                    collided_car[1].get_name()].append(car)
+        cars_at_creation_of_collided_car[collided_car[1].get_name()] = [
+            car for car in cars_index.at(collided_car[1].get_creation_time())
+            if car.name <= collided_car[1].get_name()
+        ]
     screen, background, intersection_background, font = (
         init_graphic_environment(1468, 768)
     )
+    car_sprites.pre_render(Car.image_scale_rate)
     actual_collision = 0
     false_positive_counter = 0
     false_positive = False
@@ -1,12 +1,15 @@
 import pygame
 import os
-from log_files_process import generate_left_intersection_cars_from_file, \
-    generate_collision_cars_from_file, generate_coordination_info_from_file
+from log_files_process import iterate_left_intersection_records, \
+    generate_collision_cars_from_file, generate_coordination_info_from_file, \
+    coordination_cars
 from auxiliary_functions.auxiliary_functions import display_info_on_car, \
     show_caravan, init_graphic_environment, check_close_application, \
     continue_simulation, colliding_cars
 from models.car import Car, SupervisorCar
 from models.message import NewCarMessage
+from models.message_queue import MessageQueue
+from models.sprite_cache import car_sprites
 
 
 def simulate_collisions(log):
@@ -23,7 +26,10 @@ def simulate_collisions(log):
     collisions_file = open(log_directory + "collisions" + log + ".log")
     coordination_file = open(log_directory + "coordination" + log + ".log")
 
-    all_cars = generate_left_intersection_cars_from_file(all_cars_file)
+    all_cars = {
+        record.name: record
+        for record in iterate_left_intersection_records(all_cars_file)
+    }
     collisions_cars, collided_cars_info = generate_collision_cars_from_file(
         collisions_file, all_cars
     )
@@ -34,6 +40,7 @@ def simulate_collisions(log):
     screen, background, intersection_background, font = (
         init_graphic_environment(1468, 768)
     )
+    car_sprites.pre_render(Car.image_scale_rate)
     full_intersection_rect = pygame.Rect(0, 0, 768, 768)
 
     infrastructure_supervisor = SupervisorCar(-1)
@@ -59,7 +66,7 @@ def simulate_collisions(log):
     for key in collided_cars_info:
         cars = []
         messages = []
-        new_messages = []
+        new_messages = MessageQueue()
         collision_wait = True
         iteration = True
         print [str(car) for car in collided_cars_info[key]]
@@ -67,7 +74,8 @@ def simulate_collisions(log):
             collided_cars_info[key][1].get_name(),
             collided_cars_info[key][0].get_name()
         )
-        for car in coordination_info[newest_car_collisioned]:
+        for car in coordination_cars(
+                coordination_info[newest_car_collisioned]):
             car.new_image()
             cars.append(car)
 
@@ -87,6 +95,8 @@ def simulate_collisions(log):
             for car in cars:
                 message.process(car)
         infrastructure_supervisor.set_new_messages([])
+        new_messages.extend(messages)
+        messages = new_messages.drain()
         for car in cars:
             if (not car.get_following_car_name() in
                     [cars[k].get_name() for k in range(len(cars))]):
@@ -95,32 +105,24 @@ def simulate_collisions(log):
             if not collision_wait:
                 left_intersection_cars = []
                 left_intersection_cars_log = []
-                messages.sort(
-                    key=(
-                        lambda not_sorted_message: (
-                            not_sorted_message.get_value()
-                        )
-                    ),
-                    reverse=True
-                )
                 for message in messages:
                     message.process(infrastructure_supervisor)
-                new_messages = infrastructure_supervisor.get_new_messages()
-                for new_message in new_messages:
-                    new_messages.append(new_message)
+                new_messages.extend(
+                    infrastructure_supervisor.get_new_messages()
+                )
                 infrastructure_supervisor.set_new_messages([])
                 for car in cars:
                     for message in messages:
                         message.process(car)
                     car.update()
-                    for new_message in car.get_new_messages():
-                        new_messages.append(new_message)
+                    new_messages.extend(car.get_new_messages())
                     car.set_new_messages([])
                     if not car.screen_car.colliderect(full_intersection_rect):
                         left_intersection_cars.append(car)
-                        new_messages.append(
-                            car.get_left_intersection_messages()
-                        )
+                        if car.get_left_intersection_messages() is not None:
+                            new_messages.append(
+                                car.get_left_intersection_messages()
+                            )
                         # new_messages.append(LeftIntersectionMessage(car))
                         # if car.get_active_supervisor():
                         #     new_messages.insert(
@@ -133,8 +135,7 @@ def simulate_collisions(log):
                 collided_cars, collide = colliding_cars(cars)
                 for left_car in left_intersection_cars:
                     cars.remove(left_car)
-                messages = new_messages
-                new_messages = []
+                messages = new_messages.drain()
 
                 events = pygame.event.get()
                 iteration = not check_close_application(events)
@@ -142,6 +143,7 @@ def simulate_collisions(log):
                 screen.blit(background, (0, 0))
                 screen.blit(intersection_background, (0, 0))
                 for car in cars:
+                    car.draw_car()
                     screen.blit(car.rotated_image, car.screen_car)
                     display_info_on_car(car, screen, font, 1)
                 show_caravan(cars, screen, font, collided_cars, screen_width)
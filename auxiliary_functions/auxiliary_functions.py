@@ -1,9 +1,12 @@
+from __future__ import absolute_import
 import pygame
 from models.car import Car
-from random import randint
+import random
 import logging
 import os
 from car_controllers.follower_controller import follower_controller
+from auxiliary_functions.spatial_hash import SpatialHash
+from auxiliary_functions.json_lines import JsonLinesFormatter
 
 white = (255, 255, 255)  # RGB white color representation
 black = (0, 0, 0)  # RGB black color representation
@@ -114,19 +117,21 @@ def random_car(
     :param min_speed: minimum speed of a car.
     :param max_speed: maximum speed of the car.
     :param kwargs: the lane can be passed in this argument in the "lane"
-        argument.
+        argument. The random values are drawn from the "generator" argument
+        (a random.Random), or from the random module if it isn't given.
     :param fix: <boolean> boolean for the car to use the fix for the
         supervisory level or not.
     :param stand_still_param: <int> number of times the lenght of the car is
         used for the stand still distance
     :return: a Car object.
     """
+    generator = kwargs.get("generator", random)
     if "lane" in kwargs:
         pos_x, pos_y, direction, lane = initial_positions[kwargs["lane"]]
     else:
-        new_lane = randint(0, number_of_lanes - 1)
+        new_lane = generator.randint(0, number_of_lanes - 1)
         pos_x, pos_y, direction, lane = initial_positions[new_lane]
-    initial_speed = randint(min_speed, max_speed)
+    initial_speed = generator.randint(min_speed, max_speed)
     if "initial_speed" in kwargs:
         initial_speed = kwargs["initial_speed"]
     if "intention" in kwargs:
@@ -134,13 +139,13 @@ def random_car(
     else:
         intention = "s"
         if number_of_lanes == 4:
-            random_intention = randint(0, 2)
+            random_intention = generator.randint(0, 2)
             if random_intention == 0:
                 intention = "l"
             elif random_intention == 1:
                 intention = "r"
         else:
-            random_intention = randint(0, 1)
+            random_intention = generator.randint(0, 1)
             if lane == 0:
                 if random_intention == 0:
                     intention = "r"
@@ -166,13 +171,29 @@ def colliding_cars(car_list):
     :return: tuple with the colliding cars and True, if the cars collided. None
         and false otherwise.
     """
-    for i in range(len(car_list)):
-        for j in range(i + 1, len(car_list)):
-            if car_list[i].screen_car.colliderect(car_list[j].screen_car):
-                return (car_list[i], car_list[j]), True
+    pairs = colliding_pairs(car_list)
+    if pairs:
+        return pairs[0], True
     return None, False
 
 
+def colliding_pairs(car_list, spatial_hash=None):
+    """
+    Finds every pair of colliding cars of the car_list, using a spatial hash
+    as broadphase.
+    :param car_list: lists of car.
+    :param spatial_hash: <SpatialHash> grid to store the cars. It's rebuilt
+        with the cars of car_list, so it can be used for other queries until
+        the cars move. If None, a new one is used.
+    :return: <list> list of (<Car>, <Car>) tuples with the colliding cars,
+        ordered as the cars are in car_list.
+    """
+    if spatial_hash is None:
+        spatial_hash = SpatialHash()
+    spatial_hash.build(car_list)
+    return spatial_hash.colliding_pairs()
+
+
 def display_info_on_car(car, display, letter, normalized=1):
     """
     Displays some information of a car on top of it. The Car, display to draw
@@ -230,48 +251,65 @@ def create_car_from_json(json_car):
     return car
 
 
-def setup_logger(logger_name, log_file, level=logging.DEBUG):
+def setup_logger(logger_name, log_file, level=logging.DEBUG, mode="w"):
     """
-    Set up the loggers of the application.
+    Set up the loggers of the application. The logs are JSON Lines (see
+    JsonLinesFormatter), so the objects logged must be json serializable.
     :param logger_name:
     :param log_file:
     :param level:
+    :param mode: <string> "w" to overwrite the log file, "a" to append to it.
     :return:
     """
     logger = logging.getLogger(logger_name)
-    formatter = logging.Formatter(
-        '{"time":"%(asctime)s", "message":%(message)s},'
-    )
-    file_handler = logging.FileHandler(log_file, mode='w')
+    # the file of a previous simulation with the same logs isn't written
+    # anymore
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+    formatter = JsonLinesFormatter()
+    file_handler = logging.FileHandler(log_file, mode=mode)
     file_handler.setFormatter(formatter)
     logger.setLevel(level)
     logger.addHandler(file_handler)
 
 
-def create_logs(log_name):
+def create_logs(log_name, log_directory=None, mode="w"):
     """
     Function to create the logs for the simulation: collisions_log,
     number_of_cars_simulated_log, cars_left_intersection_log and
     coordination_log
     :param log_name: <string> name to store the logs (to difference them with
         the others).
-    """
-    setup_logger(
-        "collision{}".format(log_name),
-        "{}collisions{}.log".format(logger_directory, log_name)
-    )
-    setup_logger(
-        "numbers_of_cars{}".format(log_name),
-        "{}total_cars{}.log".format(logger_directory, log_name)
-    )
-    setup_logger(
-        "left_intersection{}".format(log_name),
-        "{}left_intersection{}.log".format(logger_directory, log_name)
-    )
-    setup_logger(
-        "coordination{}".format(log_name),
-        "{}coordination{}.log".format(logger_directory, log_name)
-    )
+    :param log_directory: <string> directory to store the logs, ending with
+        "/". If None, the logs directory of the project is used.
+    :param mode: <string> "w" to overwrite the logs, "a" to append to them.
+    """
+    for name, path in get_log_paths(log_name, log_directory).items():
+        setup_logger(name + log_name, path, mode=mode)
+
+
+def get_log_paths(log_name, log_directory=None, extension="log"):
+    """
+    Returns the paths of the logs of a simulation: collisions, total_cars,
+    left_intersection and coordination.
+    :param log_name: <string> name of the logs.
+    :param log_directory: <string> directory of the logs, ending with "/".
+        If None, the logs directory of the project is used.
+    :param extension: <string> extension of the files, "log" for the text
+        logs and "bin" for the columnar ones.
+    :return: <dict> path of every log, by the name of its logger.
+    """
+    if log_directory is None:
+        log_directory = logger_directory
+    return {
+        name: "{}{}{}.{}".format(log_directory, file_name, log_name, extension)
+        for name, file_name in [
+            ("collision", "collisions"), ("numbers_of_cars", "total_cars"),
+            ("left_intersection", "left_intersection"),
+            ("coordination", "coordination")
+        ]
+    }
 
 
 def separate_new_and_old_cars(car_list):
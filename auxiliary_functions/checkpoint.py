@@ -0,0 +1,87 @@
+import cPickle
+import gzip
+import os
+import random
+from pygame import Surface
+from models.car import Car
+from models.message import Message
+
+checkpoint_version = 1
+
+
+def persistent_id(obj):
+    """
+    Objects of a checkpoint that aren't pickled: the images of the cars, which
+    are taken from the sprite cache again when the cars are drawn, and the
+    objects shared by all the simulations.
+    :param obj: object being pickled.
+    :return: <string> id of the object, or None to pickle it.
+    """
+    if isinstance(obj, Surface):
+        return "surface"
+    if obj is random:
+        return "random"
+    if obj is Car.default_following_car_message:
+        return "default_following_car_message"
+    return None
+
+
+def persistent_load(persistent_id):
+    """
+    Inverse of persistent_id.
+    :param persistent_id: <string> id of the object.
+    :return: the object, or None for an image.
+    """
+    return {
+        "surface": None,
+        "random": random,
+        "default_following_car_message": Car.default_following_car_message
+    }[persistent_id]
+
+
+def save_checkpoint(path, state):
+    """
+    Writes the state of a simulation to a compressed pickle. The file is
+    written under a temporary name and then renamed, so a failure while
+    writing doesn't break the last checkpoint.
+    :param path: <string> path of the checkpoint.
+    :param state: <dict> state of the simulation. Objects referenced many
+        times in the state are restored as a single object.
+    """
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    checkpoint_file = gzip.open(temporary_path, "wb")
+    try:
+        pickler = cPickle.Pickler(checkpoint_file, cPickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump({
+            "version": checkpoint_version,
+            "depth_version": Message.depth_version,
+            "state": state
+        })
+    finally:
+        checkpoint_file.close()
+    os.rename(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Reads the state of a simulation written by save_checkpoint.
+    :param path: <string> path of the checkpoint.
+    :return: <dict> state of the simulation.
+    """
+    checkpoint_file = gzip.open(path, "rb")
+    try:
+        unpickler = cPickle.Unpickler(checkpoint_file)
+        unpickler.persistent_load = persistent_load
+        checkpoint = unpickler.load()
+    finally:
+        checkpoint_file.close()
+    if checkpoint["version"] != checkpoint_version:
+        raise ValueError(
+            "Checkpoint version {} not supported".format(checkpoint["version"])
+        )
+    # the caravan depths of the registries are checked against it
+    Message.depth_version = max(
+        Message.depth_version, checkpoint["depth_version"]
+    )
+    return checkpoint["state"]
@@ -0,0 +1,171 @@
+from __future__ import absolute_import
+from pygame import Rect
+from auxiliary_functions.spatial_hash import SpatialHash
+
+
+def overlap_interval(start_gap, end_gap, interval):
+    """
+    Restricts a time interval to the times where a gap between two edges is
+    positive. The gap changes linearly from the start to the end of the tick.
+    :param start_gap: <float> gap at the start of the tick (time 0).
+    :param end_gap: <float> gap at the end of the tick (time 1).
+    :param interval: (<float>, <float>) actual interval.
+    :return: (<float>, <float>) restricted interval. Empty if the first time
+        isn't smaller than the second one.
+    """
+    start, end = interval
+    if start_gap <= 0 and end_gap <= 0:
+        return 1.0, 0.0
+    if start_gap <= 0:
+        start = max(start, float(start_gap) / (start_gap - end_gap))
+    elif end_gap <= 0:
+        end = min(end, float(start_gap) / (start_gap - end_gap))
+    return start, end
+
+
+def time_of_impact(first_rects, second_rects):
+    """
+    Finds the first time two rectangles moving between two ticks overlap. The
+    edges of the rectangles move linearly from their position at the previous
+    tick to their position at the actual one.
+    :param first_rects: (<pygame.Rect>, <pygame.Rect>) previous and actual
+        rectangle of the first car.
+    :param second_rects: (<pygame.Rect>, <pygame.Rect>) previous and actual
+        rectangle of the second car.
+    :return: <float> time of impact, from 0 (previous tick) to 1 (actual
+        tick), or None if the rectangles don't overlap between the ticks.
+    """
+    interval = (0.0, 1.0)
+    for low, high in [("left", "right"), ("top", "bottom")]:
+        for (low_start, low_end), (high_start, high_end) in [
+                (first_rects, second_rects), (second_rects, first_rects)]:
+            # the rectangles overlap while the low edge of one is before the
+            # high edge of the other one, in both axes and in both orders
+            interval = overlap_interval(
+                getattr(high_start, high) - getattr(low_start, low),
+                getattr(high_end, high) - getattr(low_end, low),
+                interval
+            )
+            if interval[0] >= interval[1]:
+                return None
+    return interval[0]
+
+
+class CollisionEvent(object):
+    """
+    Collision between two cars: the pair of cars and the time of impact.
+    """
+
+    def __init__(self, first_car, second_car, tick, time_of_impact):
+        """
+        :param first_car: <Car> first car of the pair.
+        :param second_car: <Car> second car of the pair.
+        :param tick: <int> tick at which the collision was detected.
+        :param time_of_impact: <float> fraction of the tick, from 0 (previous
+            tick) to 1 (the tick of the collision), at which the cars touched.
+        """
+        self.first_car = first_car
+        self.second_car = second_car
+        self.tick = tick
+        self.time_of_impact = time_of_impact
+
+    def get_cars(self):
+        """
+        Returns the pair of cars.
+        :return: (<Car>, <Car>)
+        """
+        return self.first_car, self.second_car
+
+    def get_code(self):
+        """
+        Code of the collision used in the logs.
+        :return: <string> "<first car name>to<second car name>"
+        """
+        return "{}to{}".format(
+            self.first_car.get_name(), self.second_car.get_name()
+        )
+
+    def get_time(self):
+        """
+        Time of the collision, in ticks.
+        :return: <float>
+        """
+        return self.tick - 1 + self.time_of_impact
+
+
+class CollisionRecord(object):
+    """
+    Record of the collisions of a simulation. A pair of cars is only recorded
+    at its first collision.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.pairs = set()
+
+    def __len__(self):
+        """
+        Number of recorded collisions.
+        :return: <int>
+        """
+        return len(self.events)
+
+    def add(self, event):
+        """
+        Records a collision if its pair of cars hasn't collided before.
+        :param event: <CollisionEvent>
+        :return: <boolean> True if the collision is new.
+        """
+        pair = (event.first_car.get_name(), event.second_car.get_name())
+        if pair in self.pairs:
+            return False
+        self.pairs.add(pair)
+        self.events.append(event)
+        return True
+
+
+class SweptCollisionDetector(object):
+    """
+    Continuous collision detection. Instead of checking if the cars overlap at
+    a tick, it checks if they overlapped at any time since the previous tick,
+    so two fast cars crossing each other between two ticks collide too. Every
+    car is swept from its rectangle at the previous tick to its actual one.
+    """
+
+    def __init__(self, cell_size=64):
+        """
+        :param cell_size: <int> side of the cells of the spatial hash used as
+            broadphase.
+        """
+        self.spatial_hash = SpatialHash(cell_size)
+        self.previous_rects = {}
+
+    def detect(self, cars, tick):
+        """
+        Finds the cars that collided since the previous call. A car without a
+        previous rectangle (a new car) is considered still.
+        :param cars: <list of Cars> cars at the intersection.
+        :param tick: <int> actual tick.
+        :return: <list of CollisionEvents> collisions, with the pairs ordered
+            as the cars are in cars. Cars that overlap at the actual tick
+            always collide.
+        """
+        previous_rects = self.previous_rects
+        self.previous_rects = {}
+        self.spatial_hash.clear()
+        swept_rects = []
+        for car in cars:
+            rect = Rect(car.get_rect())
+            previous_rect = previous_rects.get(car.get_name(), rect)
+            self.previous_rects[car.get_name()] = rect
+            swept_rects.append((previous_rect, rect))
+            self.spatial_hash.insert(car, previous_rect.union(rect))
+        events = []
+        car_list = self.spatial_hash.cars
+        for i, j in self.spatial_hash.candidate_pairs():
+            impact = time_of_impact(swept_rects[i], swept_rects[j])
+            if impact is not None:
+                events.append(
+                    CollisionEvent(car_list[i], car_list[j], tick, impact)
+                )
+        return events
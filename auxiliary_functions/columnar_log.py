@@ -0,0 +1,263 @@
+from __future__ import absolute_import
+import mmap
+import os
+import struct
+import numpy as np
+from auxiliary_functions.auxiliary_functions import get_log_paths
+from models.virtual_caravan import intention_codes
+
+magic = "TICL"
+header_format = "<4sHH"
+column_format = "<16s4s"
+chunk_format = "<I"
+
+# columns of the logs of cars. All the cars written together share the
+# record, and group is the index of the group of cars of the record (see
+# CarLog.write_cars)
+car_columns = [
+    ("record", "<i8"), ("tick", "<i8"), ("group", "<i1"), ("name", "<i8"),
+    ("following", "<i8"), ("lane", "<i1"), ("intention", "<i1"),
+    ("speed", "<f8"), ("x", "<f8"), ("y", "<f8"), ("direction", "<f8"),
+    ("creation_time", "<i8"), ("left_intersection_time", "<i8"),
+    ("depth", "<i4")
+]
+total_cars_columns = [("tick", "<i8"), ("cars_simulated", "<i8")]
+intention_names = {code: name for name, code in intention_codes.items()}
+
+
+class ColumnarLog(object):
+    """
+    Append only binary log of rows with fixed width numeric columns. The rows
+    are kept in memory and written in chunks, every column of a chunk
+    contiguous, after a header with the names and types of the columns:
+
+        header: "TICL", version, number of columns, (name, type) per column
+        chunk: number of rows, the values of every column
+
+    The file is read back with read_columnar_log.
+    """
+    version = 1
+
+    def __init__(self, path, columns, mode="w", chunk_size=4096):
+        """
+        :param path: <string> path of the log.
+        :param columns: <list> (name, numpy type) of every column.
+        :param mode: <string> "w" to overwrite the log, "a" to append to it.
+            The columns of an existing log must be the same.
+        :param chunk_size: <int> number of rows of a full chunk.
+        """
+        self.path = path
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.rows = [[] for _ in columns]
+        header = self.get_header()
+        if mode == "a" and os.path.exists(path) and os.path.getsize(path):
+            with open(path, "r+b") as log_file:
+                if log_file.read(len(header)) != header:
+                    raise ValueError(
+                        "{} has other columns than the log".format(path)
+                    )
+                # a chunk that was being written is dropped, as the rows
+                # appended after it couldn't be read
+                log_file.truncate(get_complete_size(path))
+            self.log_file = open(path, "ab")
+        else:
+            self.log_file = open(path, "wb")
+            self.log_file.write(header)
+            self.log_file.flush()
+
+    def __len__(self):
+        """
+        Number of rows not written yet.
+        :return: <int>
+        """
+        return len(self.rows[0])
+
+    def get_header(self):
+        """
+        Header of the log file.
+        :return: <string>
+        """
+        return struct.pack(
+            header_format, magic, self.version, len(self.columns)
+        ) + "".join(
+            struct.pack(column_format, name, dtype)
+            for name, dtype in self.columns
+        )
+
+    def append(self, row):
+        """
+        Adds a row to the log. The row is written with its chunk.
+        :param row: <tuple> value of every column.
+        """
+        for values, value in zip(self.rows, row):
+            values.append(value)
+        if len(self) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the rows that haven't been written as a chunk.
+        """
+        if not len(self):
+            return
+        self.log_file.write(struct.pack(chunk_format, len(self)))
+        for values, (_, dtype) in zip(self.rows, self.columns):
+            self.log_file.write(np.array(values, dtype=dtype).tostring())
+        self.log_file.flush()
+        self.rows = [[] for _ in self.columns]
+
+    def close(self):
+        """
+        Writes the last chunk and closes the file.
+        """
+        self.flush()
+        self.log_file.close()
+
+
+class CarLog(ColumnarLog):
+    """
+    Columnar log of the state of cars (see car_columns).
+    """
+
+    def __init__(self, path, mode="w", chunk_size=4096):
+        """
+        :param path: <string> path of the log.
+        :param mode: <string> "w" to overwrite the log, "a" to append to it.
+        :param chunk_size: <int> number of rows of a full chunk.
+        """
+        super(CarLog, self).__init__(path, car_columns, mode, chunk_size)
+        self.records = 0
+        if mode == "a":
+            records = read_columnar_log(path)["record"]
+            if len(records):
+                self.records = records[-1] + 1
+
+    def write_cars(self, groups, tick):
+        """
+        Writes a record: the state of some groups of cars at a tick, one row
+        per car.
+        :param groups: <list of lists of Cars> cars of the record. The
+            groups depend on the log, for example the coordinated car, the
+            cars at the intersection and the selected car of a coordination.
+        :param tick: <int> actual tick.
+        """
+        for group, cars in enumerate(groups):
+            for car in cars:
+                creation_time = car.get_creation_time()
+                self.append((
+                    self.records, tick, group, car.get_name(),
+                    car.get_following_car_message().get_name(),
+                    car.get_lane(), intention_codes[car.get_intention()],
+                    car.get_speed(), car.get_x_position(),
+                    car.get_y_position(), car.get_direction(),
+                    creation_time if creation_time is not None else -1,
+                    car.get_left_intersection_time(),
+                    car.get_caravan_depth()
+                ))
+        self.records += 1
+
+
+def map_columnar_log(path):
+    """
+    Maps a columnar log to memory and reads its header.
+    :param path: <string> path of the log.
+    :return: (<mmap>, <list>, <int>) the mapped log, (name, numpy dtype) of
+        every column and offset of the first chunk.
+    """
+    with open(path, "rb") as log_file:
+        log_map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+    log_magic, _, columns_number = struct.unpack_from(header_format, log_map)
+    if log_magic != magic:
+        raise ValueError("{} isn't a columnar log".format(path))
+    offset = struct.calcsize(header_format)
+    columns = []
+    for _ in range(columns_number):
+        name, dtype = struct.unpack_from(column_format, log_map, offset)
+        columns.append((name.rstrip("\0"), np.dtype(dtype.rstrip("\0"))))
+        offset += struct.calcsize(column_format)
+    return log_map, columns, offset
+
+
+def iterate_chunks(log_map, columns, offset):
+    """
+    Finds the complete chunks of a mapped columnar log. A last chunk that was
+    being written is left out.
+    :param log_map: <mmap> mapped log (see map_columnar_log).
+    :param columns: <list> (name, numpy dtype) of every column.
+    :param offset: <int> offset of the first chunk.
+    :return: <generator of tuples> number of rows and offset of the values
+        of every chunk.
+    """
+    row_size = sum(dtype.itemsize for _, dtype in columns)
+    while offset + struct.calcsize(chunk_format) <= len(log_map):
+        rows, = struct.unpack_from(chunk_format, log_map, offset)
+        offset += struct.calcsize(chunk_format)
+        if offset + rows * row_size > len(log_map):
+            # last chunk of a log that was being written
+            return
+        yield rows, offset
+        offset += rows * row_size
+
+
+def get_complete_size(path):
+    """
+    Returns the size of a columnar log without a last chunk that was being
+    written.
+    :param path: <string> path of the log.
+    :return: <int> bytes of the header and the complete chunks.
+    """
+    log_map, columns, size = map_columnar_log(path)
+    row_size = sum(dtype.itemsize for _, dtype in columns)
+    for rows, offset in iterate_chunks(log_map, columns, size):
+        size = offset + rows * row_size
+    log_map.close()
+    return size
+
+
+def read_columnar_log(path):
+    """
+    Reads a columnar log. The file is memory mapped and the columns are
+    numpy arrays of the mapped chunks, so no object is created per row. The
+    columns of a log with many chunks are joined in new arrays.
+    :param path: <string> path of the log.
+    :return: <dict> numpy array of every column, by name.
+    """
+    log_map, columns, offset = map_columnar_log(path)
+    chunks = {name: [] for name, _ in columns}
+    for rows, offset in iterate_chunks(log_map, columns, offset):
+        for name, dtype in columns:
+            chunks[name].append(
+                np.frombuffer(log_map, dtype, rows, offset)
+            )
+            offset += rows * dtype.itemsize
+    arrays = {}
+    for name, dtype in columns:
+        if len(chunks[name]) == 1:
+            arrays[name] = chunks[name][0]
+        elif chunks[name]:
+            arrays[name] = np.concatenate(chunks[name])
+        else:
+            arrays[name] = np.zeros(0, dtype)
+    return arrays
+
+
+def create_columnar_logs(log_name, log_directory=None, mode="w"):
+    """
+    Creates the columnar logs of a simulation, the binary counterpart of
+    create_logs: collisions, total_cars, left_intersection and coordination.
+    :param log_name: <string> name of the logs.
+    :param log_directory: <string> directory of the logs, ending with "/".
+        If None, the logs directory of the project is used.
+    :param mode: <string> "w" to overwrite the logs, "a" to append to them.
+    :return: <dict> logs by name.
+    """
+    paths = get_log_paths(log_name, log_directory, "bin")
+    return {
+        "collision": CarLog(paths["collision"], mode),
+        "numbers_of_cars": ColumnarLog(
+            paths["numbers_of_cars"], total_cars_columns, mode
+        ),
+        "left_intersection": CarLog(paths["left_intersection"], mode),
+        "coordination": CarLog(paths["coordination"], mode)
+    }
@@ -0,0 +1,59 @@
+import ast
+import json
+import logging
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats a record as a line of JSON Lines: an object with the "time" of
+    the record, as %(asctime)s, and the "message", the object logged (a dict
+    or a list) encoded as json. The keys are sorted, so every record of a
+    log has the same layout, and the line has no newlines inside.
+    """
+
+    def format(self, record):
+        """
+        :param record: <LogRecord>
+        :return: <string> json object of the record.
+        """
+        message = record.getMessage() if record.args else record.msg
+        return json.dumps(
+            {"time": self.formatTime(record, self.datefmt),
+             "message": message},
+            sort_keys=True, separators=(",", ":")
+        )
+
+
+def read_json_lines(log_file, null=None):
+    """
+    Reads the records of a log one at a time, so the memory used doesn't
+    depend on the size of the log. Lines of logs written before the logs
+    were JSON Lines, which end with a comma and may have python literals,
+    are read too.
+    :param log_file: <file> log, or any iterable of its lines.
+    :param null: value of the nulls of the records (None in old logs).
+    :return: <generator of dicts> records of the log, with the "time" and
+        the "message" of each.
+    """
+    decoder = json.JSONDecoder()
+    if null is not None:
+        decoder = json.JSONDecoder(
+            object_hook=lambda record: {
+                key: null if value is None else value
+                for key, value in record.iteritems()
+            }
+        )
+    for line in log_file:
+        line = line.strip()
+        if not line:
+            continue
+        if line.endswith(","):
+            line = line[:-1]
+        try:
+            yield decoder.decode(line)
+        except ValueError:
+            # old logs, with the messages as python literals
+            record = ast.literal_eval(line)
+            if null is not None:
+                record = decoder.decode(json.dumps(record))
+            yield record
@@ -0,0 +1,237 @@
+import logging
+import Queue
+import threading
+import time
+import traceback
+
+from models.car import Car
+
+
+class AsyncLogWriter(object):
+    """
+    Writes the records of loggers from a background thread. The simulation
+    only puts a record in a bounded queue: the logger, a function that
+    formats the message and the payload it formats, usually tuples of car
+    states (see Car.get_log_state). The thread formats the records, writes
+    them in batches, one write and flush per file and batch, and keeps the
+    time the record was put, so the logs are the same as the ones written by
+    the loggers.
+    When the queue is full, put waits until the thread makes room
+    (backpressure) or, if the writer drops records, the record is dropped.
+    Both are counted.
+    """
+
+    def __init__(self, max_size=10000, batch_size=256, drop=False):
+        """
+        :param max_size: <int> maximum number of records in the queue.
+        :param batch_size: <int> maximum number of records written at once.
+        :param drop: <boolean> drop the records put while the queue is full
+            instead of waiting.
+        """
+        self.queue = Queue.Queue(max_size)
+        self.batch_size = batch_size
+        self.drop = drop
+        self.written = 0
+        self.blocked = 0
+        self.dropped = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="log_writer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, logger, formatter, payload):
+        """
+        Adds a record to the queue.
+        :param logger: <Logger> logger of the record.
+        :param formatter: <function> returns the message of the record from
+            the payload.
+        :param payload: data of the message, which mustn't change after
+            being put.
+        """
+        record = (logger, formatter, payload, time.time())
+        try:
+            self.queue.put_nowait(record)
+        except Queue.Full:
+            if self.drop:
+                self.dropped += 1
+                return
+            self.blocked += 1
+            self.queue.put(record)
+
+    def flush(self):
+        """
+        Waits until every record put has been written.
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Writes the rest of the records and stops the thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def get_counters(self):
+        """
+        Returns the counters of the writer.
+        :return: <dict> number of records written, of puts that waited for
+            room in the queue and of records dropped.
+        """
+        return {
+            "log_records_written": self.written,
+            "log_puts_blocked": self.blocked,
+            "log_records_dropped": self.dropped
+        }
+
+    def run(self):
+        """
+        Loop of the thread: takes the records of the queue in batches and
+        writes them, until the record None is taken.
+        """
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except Queue.Empty:
+                pass
+            if None in batch:
+                # None is the last record put
+                running = False
+                batch.remove(None)
+            try:
+                self.write(batch)
+            except Exception:
+                # the thread keeps running, so put never waits forever
+                traceback.print_exc()
+                self.dropped += len(batch)
+            finally:
+                for _ in range(len(batch) + (not running)):
+                    self.queue.task_done()
+
+    def write(self, batch):
+        """
+        Formats a batch of records and writes them to the handlers of their
+        loggers. The errors are handled as the handlers of logging do (see
+        Handler.handleError), and the records that couldn't be formatted or
+        written are counted as dropped.
+        :param batch: <list of tuples> records of the queue.
+        """
+        records = []
+        failed = set()
+        lines = {}
+        for logger, formatter, payload, created in batch:
+            try:
+                record = logger.makeRecord(
+                    logger.name, logging.INFO, "(log_writer)", 0,
+                    formatter(payload), None, None
+                )
+                record.created = created
+                record.msecs = (created - long(created)) * 1000
+                record_lines = []
+                other_handlers = []
+                for handler in get_handlers(logger):
+                    if record.levelno < handler.level:
+                        continue
+                    if isinstance(handler, logging.StreamHandler):
+                        record_lines.append((handler, handler.format(record)))
+                    else:
+                        other_handlers.append(handler)
+            except Exception:
+                traceback.print_exc()
+                continue
+            index = len(records)
+            records.append(record)
+            for handler, line in record_lines:
+                lines.setdefault(handler, []).append((index, line))
+            for handler in other_handlers:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    handler.handleError(record)
+                    failed.add(index)
+        for handler, handler_lines in lines.items():
+            handler.acquire()
+            try:
+                handler.stream.write(
+                    "\n".join(line for _, line in handler_lines) + "\n"
+                )
+                handler.flush()
+            except Exception:
+                handler.handleError(records[handler_lines[-1][0]])
+                failed.update(index for index, _ in handler_lines)
+            finally:
+                handler.release()
+        self.dropped += len(batch) - len(records) + len(failed)
+        self.written += len(records) - len(failed)
+
+
+def get_handlers(logger):
+    """
+    Returns the handlers a record of a logger is passed to: the handlers of
+    the logger and of its ancestors, while they propagate.
+    :param logger: <Logger>
+    :return: <list of Handlers>
+    """
+    handlers = []
+    while logger is not None:
+        handlers.extend(logger.handlers)
+        if not logger.propagate:
+            break
+        logger = logger.parent
+    return handlers
+
+
+def format_cars(states):
+    """
+    Message of a list of cars.
+    :param states: <list of tuples> log states of the cars.
+    :return: <list of dicts> json representation of the cars.
+    """
+    return [Car.log_state_to_json(state) for state in states]
+
+
+def format_coordination(coordination):
+    """
+    Message of a coordination of the supervisor.
+    :param coordination: <tuple> log states of the coordinated car, of the
+        cars at the intersection and of the selected car.
+    :return: <dict>
+    """
+    coordinated_state, old_states, selected_state = coordination
+    return {
+        "coordinated_car": Car.log_state_to_json(coordinated_state),
+        "car_order": format_cars(old_states),
+        "selected_car": Car.log_state_to_json(selected_state)
+    }
+
+
+def format_collision(collision):
+    """
+    Message of the first collision of a simulation.
+    :param collision: <tuple> code and time of the collision, log states of
+        the cars at the intersection and of the collided cars and the codes
+        of the collisions of the tick.
+    :return: <dict>
+    """
+    code, collision_time, states, collided_states, codes = collision
+    return {
+        "collision_code": code,
+        "collision_time": collision_time,
+        "collision_initial_conditions": format_cars(states),
+        "collided_cars": format_cars(collided_states),
+        "collision_codes": codes
+    }
+
+
+def format_cars_simulated(cars_simulated):
+    """
+    Message of the number of cars simulated.
+    :param cars_simulated: <int>
+    :return: <dict>
+    """
+    return {"cars_simulated": cars_simulated}
@@ -0,0 +1,48 @@
+import hashlib
+import random
+
+
+class RandomStreams(object):
+    """
+    Random generators of a simulation. Every stochastic part of the
+    simulation (the arrivals and the cars of every lane, the attacks) draws
+    from its own stream, so a simulation is identified by its parameters and
+    its seed, and the streams don't depend on each other: adding draws to one
+    of them doesn't change the others.
+    The streams are random.Random generators, independent of the global state
+    of the random module.
+    """
+
+    def __init__(self, seed=None):
+        """
+        :param seed: <int> seed of the simulation. If None, a random seed is
+            used. It can be read from the seed attribute to repeat the
+            simulation.
+        """
+        if seed is None:
+            seed = random.SystemRandom().randint(0, 2 ** 32 - 1)
+        self.seed = seed
+        self.streams = {}
+
+    def get_stream_seed(self, name):
+        """
+        Seed of a stream, derived from the seed of the simulation and the
+        name of the stream.
+        :param name: <string> name of the stream.
+        :return: <long>
+        """
+        return long(
+            hashlib.sha256("{}/{}".format(self.seed, name)).hexdigest(), 16
+        )
+
+    def get(self, *names):
+        """
+        Returns a stream. The stream is created the first time it's asked for.
+        :param names: names identifying the stream, for example "arrivals"
+            and the lane number.
+        :return: <random.Random>
+        """
+        name = "/".join(str(name) for name in names)
+        if name not in self.streams:
+            self.streams[name] = random.Random(self.get_stream_seed(name))
+        return self.streams[name]
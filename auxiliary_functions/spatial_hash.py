@@ -0,0 +1,122 @@
+class SpatialHash(object):
+    """
+    Uniform grid over the screen used as broadphase for collision detection.
+    Every car is stored in the cells its screen rectangle covers, so only cars
+    sharing a cell have to be compared. Finding all the colliding cars is near
+    linear in the number of cars instead of quadratic.
+    """
+
+    def __init__(self, cell_size=64):
+        """
+        :param cell_size: <int> side of the cells in pixels. It should be
+            bigger than a car.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.cars = []
+        self.rects = []
+
+    def clear(self):
+        """
+        Removes all the cars from the grid.
+        """
+        self.cells = {}
+        self.cars = []
+        self.rects = []
+
+    def get_cells(self, rect):
+        """
+        Returns the cells covered by a rectangle.
+        :param rect: <pygame.Rect>
+        :return: <list> list of (<int>, <int>) cell coordinates.
+        """
+        cell_size = self.cell_size
+        columns = range(
+            rect.left // cell_size,
+            max(rect.right - 1, rect.left) // cell_size + 1
+        )
+        rows = range(
+            rect.top // cell_size,
+            max(rect.bottom - 1, rect.top) // cell_size + 1
+        )
+        return [(column, row) for column in columns for row in rows]
+
+    def insert(self, car, rect=None):
+        """
+        Adds a car to the grid. The car is stored with its actual rectangle,
+        so the grid must be rebuilt when the cars move.
+        :param car: <Car> car with a screen representation.
+        :param rect: <pygame.Rect> rectangle to store the car with, instead of
+            the rectangle of the car.
+        """
+        if rect is None:
+            rect = car.get_rect()
+        index = len(self.cars)
+        self.cars.append(car)
+        self.rects.append(rect)
+        for cell in self.get_cells(rect):
+            if cell in self.cells:
+                self.cells[cell].append(index)
+            else:
+                self.cells[cell] = [index]
+
+    def build(self, cars):
+        """
+        Rebuilds the grid with a new list of cars.
+        :param cars: <list of Cars>
+        """
+        self.clear()
+        for car in cars:
+            self.insert(car)
+
+    def query(self, rect):
+        """
+        Returns the cars of the grid that collide with a rectangle.
+        :param rect: <pygame.Rect>
+        :return: <list of Cars> colliding cars, in insertion order.
+        """
+        candidates = set()
+        for cell in self.get_cells(rect):
+            candidates.update(self.cells.get(cell, ()))
+        return [
+            self.cars[index] for index in sorted(candidates)
+            if self.rects[index].colliderect(rect)
+        ]
+
+    def collides(self, car):
+        """
+        Check if a car collides with any car of the grid. Used to know if a
+        lane is free to create a new car.
+        :param car: <Car> car to check.
+        :return: <boolean>
+        """
+        rect = car.get_rect()
+        for cell in self.get_cells(rect):
+            for index in self.cells.get(cell, ()):
+                if self.rects[index].colliderect(rect):
+                    return True
+        return False
+
+    def candidate_pairs(self):
+        """
+        Finds every pair of cars of the grid that share a cell.
+        :return: <list> list of (<int>, <int>) insertion indexes of the cars,
+            sorted.
+        """
+        candidates = set()
+        for indexes in self.cells.values():
+            for i in range(len(indexes)):
+                for j in range(i + 1, len(indexes)):
+                    candidates.add((indexes[i], indexes[j]))
+        return sorted(candidates)
+
+    def colliding_pairs(self):
+        """
+        Finds every pair of colliding cars of the grid.
+        :return: <list> list of (<Car>, <Car>) tuples, ordered as the cars were
+            inserted.
+        """
+        return [
+            (self.cars[i], self.cars[j]) for i, j in self.candidate_pairs()
+            if self.rects[i].colliderect(self.rects[j])
+        ]
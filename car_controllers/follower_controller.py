@@ -1,5 +1,64 @@
 from car_controllers.default_controller import default_controller
 
+# parameters of the control law of the followers
+headway_time = 0.7
+k_p = 0.2
+k_d = 0.7
+
+
+def must_stop(virtual_distance, car_length):
+    """
+    Checks if a follower is so close to its following car that it must stop.
+    Works with floats, for one car, and with NumPy arrays, for many cars at
+    once (see VehicleEngine).
+    :param virtual_distance: <float> distance between the following car and
+        the car at the virtual caravan.
+    :param car_length: <float> length of the car.
+    :return: <boolean> True if the car must stop.
+    """
+    return virtual_distance < car_length
+
+
+def control_law(virtual_distance, car_length, stand_still_param, speed,
+                acceleration, following_car_acceleration, control_law_value,
+                last_virtual_distance):
+    """
+    Control law of a car that is following some other. Works with floats,
+    for one car, and with NumPy arrays, for many cars at once (see
+    VehicleEngine).
+    :param virtual_distance: <float> distance between the following car and
+        the car at the virtual caravan.
+    :param car_length: <float> length of the car.
+    :param stand_still_param: <int> number of times the length of the car is
+        used for the stand still distance.
+    :param speed: <float> speed of the car, 0 if it must stop.
+    :param acceleration: <float> acceleration of the car.
+    :param following_car_acceleration: <float> acceleration of the following
+        car.
+    :param control_law_value: <float> last value of the control law.
+    :param last_virtual_distance: <float> virtual distance of the last tick.
+    :return: (<float>, <float>) derivative of the control law, added to the
+        acceleration of the car, and new control law value.
+    """
+    stand_still_distance = car_length * stand_still_param
+    value_1 = -1 * control_law_value + following_car_acceleration
+    value_2 = (
+        k_p * (
+            virtual_distance - stand_still_distance - headway_time * speed
+        )
+    )
+    value_3 = (
+        k_d * (
+            (virtual_distance - last_virtual_distance) -
+            headway_time * acceleration
+        )
+    )
+    control_law_derivative = (value_1 + value_2 + value_3) / headway_time
+    return (
+        control_law_derivative,
+        (acceleration + control_law_derivative) % 3
+    )
+
 
 def follower_controller(car):
     """
@@ -16,10 +75,6 @@ def follower_controller(car):
                 car.get_acceleration() * (delta ** 2) / 2
             )
         )
-    headway_time = 0.7
-    k_p = 0.2
-    k_d = 0.7
-    stand_still_distance = car.get_car_length() * car.get_stand_still_param()
     if not car.get_following():
         car.set_controller(default_controller)
     car_message = car.get_following_car_message()
@@ -27,26 +82,14 @@ def follower_controller(car):
         virtual_distance = (
             car_message.virtual_distance() - car.virtual_distance()
         )
-        if virtual_distance < car.get_car_length():
+        if must_stop(virtual_distance, car.get_car_length()):
             car.set_speed(0)
-        value_1 = (
-            -1 * car.get_control_law_value() + car_message.get_acceleration()
-        )
-        value_2 = (
-            k_p * (
-                virtual_distance - stand_still_distance - headway_time *
-                car.get_speed()
-            )
-        )
-        value_3 = (
-            k_d * (
-                (virtual_distance - car.get_last_virtual_distance()) -
-                headway_time * car.get_acceleration()
-            )
+        control_law_derivative, control_law_value = control_law(
+            virtual_distance, car.get_car_length(),
+            car.get_stand_still_param(), car.get_speed(),
+            car.get_acceleration(), car_message.get_acceleration(),
+            car.get_control_law_value(), car.get_last_virtual_distance()
         )
-        control_law_derivative = (value_1 + value_2 + value_3) / headway_time
         car.set_last_virtual_distance(virtual_distance)
-        car.set_control_law_value(
-            (car.get_acceleration() + control_law_derivative) % 3
-        )
+        car.set_control_law_value(control_law_value)
         car.set_acceleration(car.get_acceleration() + control_law_derivative)
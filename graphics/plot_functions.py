@@ -1,6 +1,8 @@
-import json
 import plotly.plotly as py
 import plotly.graph_objs as go
+from auxiliary_functions.json_lines import read_json_lines
+from analisys.interval_index import car_interval_index, infinity
+from analisys.log_files_process import iterate_left_intersection_records
 
 
 def collisions_per_number_of_cars(file_location):
@@ -8,28 +10,22 @@ def collisions_per_number_of_cars(file_location):
     Plot the number of collisions per car present in the intersection at the
     collision moment.
     :param file_location: absolute path to the file to read. The file must be
-        in json format.
+        a log (see read_json_lines).
     :return: url to plot.ly with the interactive graph
     """
-    reading_file = open(file_location)
-    file_string = '['
-    for line in reading_file:
-        file_string += line
-    reading_file.close()
-    file_string = file_string[:len(file_string)-2] + ']'
-    json_data = json.JSONDecoder().decode(file_string)
     x = []
     y = []
     collision_dict = {}
 
-    for value in json_data:
-        if "collision_code" in value["message"]:
-            number_of_cars = len(
-                value["message"]["collision_initial_conditions"]
-            )
-            if number_of_cars not in collision_dict:
-                collision_dict[number_of_cars] = 0
-            collision_dict[number_of_cars] += 1
+    with open(file_location) as reading_file:
+        for value in read_json_lines(reading_file):
+            if "collision_code" in value["message"]:
+                number_of_cars = len(
+                    value["message"]["collision_initial_conditions"]
+                )
+                if number_of_cars not in collision_dict:
+                    collision_dict[number_of_cars] = 0
+                collision_dict[number_of_cars] += 1
 
     for key in collision_dict:
         x.append(key)
@@ -37,3 +33,30 @@ def collisions_per_number_of_cars(file_location):
     trace0 = go.Scatter(x=x, y=y, mode='markers', name='cars in collition')
     data = [trace0]
     return py.plot(data, filename='prueba')
+
+
+def cars_at_intersection_per_tick(file_location, step=60):
+    """
+    Plot the number of cars at the intersection along a simulation, from the
+    log of the cars that left the intersection.
+    :param file_location: absolute path to the log of the cars that left the
+        intersection (see iterate_left_intersection_records).
+    :param step: <int> ticks between two points of the plot.
+    :return: url to plot.ly with the interactive graph
+    """
+    with open(file_location) as reading_file:
+        cars_index = car_interval_index(
+            iterate_left_intersection_records(reading_file)
+        )
+    if not len(cars_index):
+        return None
+    # the cars that never left are at the intersection until the last tick
+    last_tick = max(
+        [end for end in cars_index.ends if end != infinity] +
+        cars_index.starts[-1:]
+    )
+    x = range(0, int(last_tick) + 1, step)
+    y = cars_index.get_occupancy(x)
+    trace0 = go.Scatter(x=x, y=y, mode='lines', name='cars at intersection')
+    data = [trace0]
+    return py.plot(data, filename='occupancy')
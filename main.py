@@ -1,309 +1,727 @@
 import pygame
+from collections import OrderedDict
 from auxiliary_functions.auxiliary_functions import check_close_application,\
-    random_car, colliding_cars, display_info_on_car, create_logs, \
+    random_car, display_info_on_car, create_logs, \
     continue_simulation, show_caravan, init_graphic_environment, \
-    get_supervisor, coordinator_fail, coordinator_lies
+    coordinator_fail, coordinator_lies, get_log_paths
+from auxiliary_functions.checkpoint import save_checkpoint, load_checkpoint
+from auxiliary_functions.columnar_log import create_columnar_logs
+from auxiliary_functions.log_writer import AsyncLogWriter, format_cars, \
+    format_cars_simulated, format_collision, format_coordination
+from auxiliary_functions.collision_detection import CollisionRecord, \
+    SweptCollisionDetector
+from auxiliary_functions.random_streams import RandomStreams
+from auxiliary_functions.spatial_hash import SpatialHash
 from models.message import NewCarMessage
+from models.message_bus import MessageBus
+from models.message_queue import MessageQueue
 from models.car import Car, InfrastructureCar, SupervisorCar
-import numpy as np
+from models.role_registry import RoleRegistry
+from models.sprite_cache import car_sprites
+from models.state_table import StateTable
+from models.vehicle_engine import VehicleEngine
 import logging
+import os
 
 
-def main_simulation(graphic_environment, limit, stand_still_param=5, fix=True,
-                    *args, **kwargs):
-    distributed = "distributed" in args
-    log = "log" in kwargs
-    show_virtual_caravan = "show_caravan" in args
-    initial_speed = -1
-    if "initial_speed" in kwargs:
-        initial_speed = kwargs["initial_speed"]
-    if log:
-        log_name = kwargs["log"]
-        create_logs(log_name)
-        collision_log = logging.getLogger('collision{}'.format(log_name))
-        left_intersection_log = logging.getLogger(
-            'left_intersection{}'.format(log_name)
-        )
-        total_cars_log = logging.getLogger(
-            'numbers_of_cars{}'.format(log_name)
-        )
-        coordination_log = logging.getLogger('coordination{}'.format(log_name))
-    cars = {}
-    iteration = True
-    intersection_rect = pygame.Rect(280, 280, 210, 210)
-    collisions = 0
-    collision_list = []
-
-    if graphic_environment:
-        screen_width = 768
-        if show_virtual_caravan:
-            screen_width = 1468
-        screen, background, intersection_background, font = (
-            init_graphic_environment(screen_width, 768)
-        )
-
-    full_intersection_rect = pygame.Rect(0, 0, 768, 768)
-    counter = 0
-    car_name_counter = 0
+class Simulation(object):
+    """
+    Simulation of the intersection. The state of the simulation (the cars,
+    the pending messages, the arrivals of every lane, the counters, the
+    collisions and the random streams) is kept in the object, so the
+    simulation can be advanced tick by tick, written to a checkpoint and
+    restored from it.
+    A checkpoint can be used to resume a simulation that stopped, or as a
+    warm start for new simulations: the intersection is already full of cars,
+    and the new simulations may have other limit, logs, graphic environment
+    and seed. The cars of the checkpoint keep their parameters (stand still
+    distance, fix), the new ones are created with the parameters of the new
+    simulation. The distributed and vectorized options are the ones of the
+    checkpoint.
+    """
+    # attributes saved in a checkpoint
+    state_names = [
+        "cars", "messages", "new_messages", "lanes_waiting_time", "counter",
+        "car_name_counter", "not_created_vehicles", "collision",
+        "collision_wait", "display_time_counter", "print_collision_message",
+        "collision_record", "collision_detector", "state_table",
+        "role_registry", "vehicle_engine", "random_streams",
+        "infrastructure_supervisor"
+    ]
     cars_per_second = 4
-    collision = False
     min_speed = 20
     max_speed = 20
-    not_created_vehicles = 0
-    collision_wait = False
-    display_time_counter = 0
-    lanes_waiting_time = [(0, 0), (0, 0), (0, 0), (0, 0)]
     rate = 0.1
     number_of_lanes = 4
-
-    infrastructure_supervisor = InfrastructureCar(-1, fix=fix)
-    if not distributed:
-        infrastructure_supervisor.new_image()
-        cars[-1] = infrastructure_supervisor
-
-    for i in range(len(lanes_waiting_time)):
-        lane = lanes_waiting_time[i]
-        lanes_waiting_time[i] = (np.random.exponential(1.0/rate), lane[1])
-    print_collision_message = True
-
-    collided_car_surface = pygame.Surface((50, 50))
-    collided_car_surface.fill((255, 0, 0, 0))
-    messages = []
-    new_messages = []
-    creation_dummy_cars = []
     initial_coordinates_per_lane = [
         (435, 760, 0, 0),
         (760, 345, 90, 1),
         (345, 10, 180, 2),
         (10, 435, 270, 3)
     ]
-    for coordinates in initial_coordinates_per_lane:
-        dummy_car = Car(
-            -1,
-            coordinates[0],
-            coordinates[1],
-            direction=coordinates[2],
-            lane=coordinates[3]
+
+    def __init__(self, graphic_environment, limit, stand_still_param=5,
+                 fix=True, *args, **kwargs):
+        """
+        :param graphic_environment: <boolean> show the simulation.
+        :param limit: <int> number of cars to create.
+        :param stand_still_param: <int> stand still distance of the cars.
+        :param fix: <boolean> cars check the coordinations of the
+            supervisor.
+        :param args: "distributed", "show_caravan" and "vectorized" options.
+        :param kwargs: initial_speed of the cars, seed of the random streams,
+            log name, log_directory and log_format ("text" or "columnar", see
+            ColumnarLog), async_logs to write the text logs from a
+            background thread (see AsyncLogWriter), with log_queue_size and
+            drop_logs, results dict filled at the end of the simulation,
+            checkpoint to start from, and checkpoint_path and
+            checkpoint_interval (in ticks) to write checkpoints while
+            running.
+        """
+        self.graphic_environment = graphic_environment
+        self.limit = limit
+        self.stand_still_param = stand_still_param
+        self.fix = fix
+        self.distributed = "distributed" in args
+        self.log = "log" in kwargs
+        self.log_format = kwargs.get("log_format", "text")
+        self.async_logs = kwargs.get("async_logs", False)
+        self.log_queue_size = kwargs.get("log_queue_size", 10000)
+        self.drop_logs = kwargs.get("drop_logs", False)
+        self.log_writer = None
+        # size of the logs when the checkpoint the simulation resumes from
+        # was written, by path
+        self.log_sizes = {}
+        self.show_virtual_caravan = "show_caravan" in args
+        self.initial_speed = kwargs.get("initial_speed", -1)
+        # summary of the simulation, filled when it ends
+        self.results = kwargs.get("results", {})
+        self.checkpoint_path = kwargs.get("checkpoint_path")
+        self.checkpoint_interval = kwargs.get("checkpoint_interval")
+        self.iteration = True
+        self.intersection_rect = pygame.Rect(280, 280, 210, 210)
+        self.full_intersection_rect = pygame.Rect(0, 0, 768, 768)
+        if "checkpoint" in kwargs:
+            self.load_checkpoint(kwargs["checkpoint"], kwargs.get("seed"))
+        else:
+            self.new_state(
+                "vectorized" in args, RandomStreams(kwargs.get("seed"))
+            )
+        if self.log:
+            # a resumed simulation continues the logs from the checkpoint
+            self.start_logs(
+                kwargs["log"], kwargs.get("log_directory"),
+                "a" if "checkpoint" in kwargs else "w"
+            )
+        if self.graphic_environment:
+            self.screen_width = 768
+            if self.show_virtual_caravan:
+                self.screen_width = 1468
+            (self.screen, self.background, self.intersection_background,
+             self.font) = init_graphic_environment(self.screen_width, 768)
+            car_sprites.pre_render(Car.image_scale_rate)
+        self.collided_car_surface = pygame.Surface((50, 50))
+        self.collided_car_surface.fill((255, 0, 0, 0))
+        self.collided_cars = None
+        self.creation_dummy_cars = []
+        for coordinates in self.initial_coordinates_per_lane:
+            dummy_car = Car(
+                -1,
+                coordinates[0],
+                coordinates[1],
+                direction=coordinates[2],
+                lane=coordinates[3]
+            )
+            dummy_car.new_footprint(0.1)
+            self.creation_dummy_cars.append(dummy_car)
+        self.spatial_hash = SpatialHash()
+        self.spatial_hash.build(self.cars.values())
+
+    def new_state(self, vectorized, random_streams):
+        """
+        Creates the state of a new simulation: an empty intersection, with
+        the infrastructure supervisor if the simulation isn't distributed.
+        :param vectorized: <boolean> move the cars with a VehicleEngine. Only
+            faster with about 30 or more cars at the intersection.
+        :param random_streams: <RandomStreams> random streams of the
+            simulation.
+        """
+        self.vehicle_engine = VehicleEngine() if vectorized else None
+        self.state_table = StateTable()
+        self.role_registry = RoleRegistry()
+        self.random_streams = random_streams
+        # the cars are updated in the order they arrived, which is kept by a
+        # checkpoint (the order of a dict isn't)
+        self.cars = OrderedDict()
+        self.collision_record = CollisionRecord()
+        self.collision_detector = SweptCollisionDetector()
+        self.counter = 0
+        self.car_name_counter = 0
+        self.collision = False
+        self.not_created_vehicles = 0
+        self.collision_wait = False
+        self.display_time_counter = 0
+        self.print_collision_message = True
+        self.messages = []
+        self.new_messages = MessageQueue()
+
+        self.infrastructure_supervisor = InfrastructureCar(-1, fix=self.fix)
+        self.infrastructure_supervisor.attack_generator = (
+            random_streams.get("attacks")
         )
-        dummy_car.new_image(0.1)
-        creation_dummy_cars.append(dummy_car)
-
-    while iteration and car_name_counter < limit:
-        if not collision_wait or not graphic_environment:
-            display_time_counter += 1
-            counter += 1
-            for lane in range(len(lanes_waiting_time)):
-                if not creation_dummy_cars[lane].collide(cars.values()):
-                    lanes_waiting_time[lane] = (
-                        lanes_waiting_time[lane][0],
-                        lanes_waiting_time[lane][1] + 1
+        if not self.log:
+            self.infrastructure_supervisor.set_log_messages(None)
+        if not self.distributed:
+            if self.graphic_environment:
+                self.infrastructure_supervisor.new_image()
+            else:
+                self.infrastructure_supervisor.new_footprint()
+            self.cars[-1] = self.infrastructure_supervisor
+            self.role_registry.add(self.infrastructure_supervisor)
+
+        self.lanes_waiting_time = [(0, 0), (0, 0), (0, 0), (0, 0)]
+        for i in range(len(self.lanes_waiting_time)):
+            lane = self.lanes_waiting_time[i]
+            self.lanes_waiting_time[i] = (
+                random_streams.get("arrivals", i).expovariate(self.rate),
+                lane[1]
+            )
+
+    def start_logs(self, log_name, log_directory=None, mode="w"):
+        """
+        Creates the logs of the simulation and starts writing to them.
+        :param log_name: <string> name of the logs.
+        :param log_directory: <string> directory of the logs, ending with
+            "/". If None, the logs directory of the project is used.
+        :param mode: <string> "w" to overwrite the logs, "a" to append to
+            them, after truncating them to their size at the checkpoint the
+            simulation resumes from.
+        """
+        self.log_name = log_name
+        self.log_directory = log_directory
+        if mode == "a":
+            self.truncate_logs()
+        if self.log_format == "columnar":
+            logs = create_columnar_logs(log_name, log_directory, mode)
+            self.collision_log = logs["collision"]
+            self.left_intersection_log = logs["left_intersection"]
+            self.total_cars_log = logs["numbers_of_cars"]
+            self.coordination_log = logs["coordination"]
+            return
+        create_logs(log_name, log_directory, mode)
+        if self.async_logs:
+            # a new writer, as the thread of the writer of the simulation
+            # this one was forked from doesn't run in this process
+            self.log_writer = AsyncLogWriter(
+                self.log_queue_size, drop=self.drop_logs
+            )
+        self.collision_log = logging.getLogger(
+            'collision{}'.format(log_name)
+        )
+        self.left_intersection_log = logging.getLogger(
+            'left_intersection{}'.format(log_name)
+        )
+        self.total_cars_log = logging.getLogger(
+            'numbers_of_cars{}'.format(log_name)
+        )
+        self.coordination_log = logging.getLogger(
+            'coordination{}'.format(log_name)
+        )
+
+    def get_log_paths(self):
+        """
+        Returns the paths of the logs of the simulation.
+        :return: <dict> path of every log, by the name of its logger.
+        """
+        return get_log_paths(
+            self.log_name, self.log_directory,
+            "bin" if self.log_format == "columnar" else "log"
+        )
+
+    def get_log_sizes(self):
+        """
+        Returns the sizes of the logs of the simulation. The logs must be
+        flushed.
+        :return: <dict> size in bytes of every log, by path.
+        """
+        if not self.log:
+            return {}
+        return {
+            path: os.path.getsize(path)
+            for path in self.get_log_paths().values()
+            if os.path.exists(path)
+        }
+
+    def truncate_logs(self):
+        """
+        Truncates the logs to their size when the checkpoint the simulation
+        resumes from was written, so the records a stopped simulation wrote
+        after the checkpoint aren't written twice.
+        """
+        for path in self.get_log_paths().values():
+            size = self.log_sizes.get(path)
+            if (size is not None and os.path.exists(path) and
+                    os.path.getsize(path) > size):
+                with open(path, "r+b") as log_file:
+                    log_file.truncate(size)
+
+    def write_log(self, log, formatter, payload):
+        """
+        Writes a record to a text log, from the log writer if the logs are
+        asynchronous.
+        :param log: <Logger> text log.
+        :param formatter: <function> returns the message from the payload.
+        :param payload: data of the message (see log_writer).
+        """
+        if self.log_writer is not None:
+            self.log_writer.put(log, formatter, payload)
+        else:
+            log.info(formatter(payload))
+
+    def flush_logs(self):
+        """
+        Writes the rows of the columnar logs and the records of the log
+        writer that haven't been written yet.
+        """
+        if self.log and self.log_format == "columnar":
+            for log in [self.collision_log, self.left_intersection_log,
+                        self.total_cars_log, self.coordination_log]:
+                log.flush()
+        if self.log_writer is not None:
+            self.log_writer.flush()
+
+    def stop_logs(self):
+        """
+        Writes the rest of the columnar logs and closes them, and stops the
+        log writer once every record is written.
+        """
+        if self.log and self.log_format == "columnar":
+            for log in [self.collision_log, self.left_intersection_log,
+                        self.total_cars_log, self.coordination_log]:
+                log.close()
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.results.update(self.log_writer.get_counters())
+            print (
+                "\nLog writer: {log_records_written} records written, "
+                "{log_puts_blocked} blocked puts, {log_records_dropped} "
+                "records dropped"
+            ).format(**self.log_writer.get_counters())
+
+    def get_all_cars(self):
+        """
+        Returns the cars at the intersection and the infrastructure
+        supervisor, which isn't at the intersection in a distributed
+        simulation.
+        :return: <list of Cars>
+        """
+        cars = self.cars.values()
+        if self.infrastructure_supervisor.get_name() not in self.cars:
+            cars.append(self.infrastructure_supervisor)
+        return cars
+
+    def reseed(self, seed):
+        """
+        Replaces the random streams of the simulation, so the rest of the
+        simulation draws new random values.
+        :param seed: <int> seed of the new random streams.
+        """
+        self.random_streams = RandomStreams(seed)
+        for car in self.get_all_cars():
+            car.attack_generator = self.random_streams.get("attacks")
+
+    def set_fix(self, fix):
+        """
+        Makes the cars at the intersection and the new ones use the fix to
+        the algorithm or not.
+        :param fix: <boolean>
+        """
+        self.fix = fix
+        for car in self.get_all_cars():
+            car.fix = fix
+
+    def attack(self, attack_supervisor=False, supervisor_lies=False):
+        """
+        Makes the actual supervisor attack the intersection.
+        :param attack_supervisor: <boolean> the supervisor coordinates the
+            new cars badly.
+        :param supervisor_lies: <boolean> the supervisor lies about the
+            coordinations.
+        :return: <boolean> False if there isn't a supervisor.
+        """
+        supervisor_car = self.role_registry.get_supervisor()
+        if supervisor_car is None:
+            return False
+        if attack_supervisor:
+            supervisor_car.attack_supervisor = True
+        if supervisor_lies:
+            supervisor_car.supervisor_lies = True
+        supervisor_car.update_role()
+        return True
+
+    def save_checkpoint(self, path):
+        """
+        Writes the state of the simulation to a checkpoint, with the size of
+        its logs.
+        :param path: <string> path of the checkpoint.
+        """
+        self.flush_logs()
+        state = {name: getattr(self, name) for name in self.state_names}
+        state["log_sizes"] = self.get_log_sizes()
+        save_checkpoint(path, state)
+
+    def load_checkpoint(self, path, seed=None):
+        """
+        Replaces the state of the simulation with the state of a checkpoint.
+        :param path: <string> path of the checkpoint.
+        :param seed: <int> seed of new random streams for the rest of the
+            simulation. If None, the simulation continues with the random
+            streams of the checkpoint, as if it hadn't stopped.
+        """
+        state = load_checkpoint(path)
+        self.log_sizes = state.pop("log_sizes", {})
+        for name, value in state.items():
+            setattr(self, name, value)
+        if seed is not None:
+            self.reseed(seed)
+        for car in self.get_all_cars():
+            if (car.get_log_messages() is None) == self.log:
+                car.set_log_messages([] if self.log else None)
+        self.spatial_hash = SpatialHash()
+        self.spatial_hash.build(self.cars.values())
+
+    def create_cars(self):
+        """
+        Creates the cars that arrive at the intersection in the actual tick.
+        The arrival time of a lane only runs while the start of the lane is
+        free.
+        """
+        for lane in range(len(self.lanes_waiting_time)):
+            if not self.spatial_hash.collides(self.creation_dummy_cars[lane]):
+                self.lanes_waiting_time[lane] = (
+                    self.lanes_waiting_time[lane][0],
+                    self.lanes_waiting_time[lane][1] + 1
+                )
+            if (self.lanes_waiting_time[lane][0] <=
+                    self.lanes_waiting_time[lane][1]):
+                new_car = random_car(
+                    self.car_name_counter,
+                    self.min_speed,
+                    self.max_speed,
+                    self.counter,
+                    self.number_of_lanes,
+                    self.fix,
+                    self.stand_still_param,
+                    lane=lane,
+                    initial_speed=self.initial_speed,
+                    generator=self.random_streams.get("cars", lane)
+                )
+                new_car.attack_generator = self.random_streams.get("attacks")
+                if self.graphic_environment:
+                    new_car.new_image()
+                else:
+                    new_car.new_footprint()
+                if not self.log:
+                    new_car.set_log_messages(None)
+                self.state_table.add(new_car)
+                if self.vehicle_engine is not None:
+                    self.vehicle_engine.add(new_car)
+                self.lanes_waiting_time[lane] = (
+                    self.random_streams.get("arrivals", lane).expovariate(
+                        self.rate
+                    ),
+                    0
+                )
+                # not supervisor(cars) and
+                # not supervisor_message(messages):
+                if len(self.cars) == 0:
+                    new_car.__class__ = SupervisorCar
+                self.cars[self.car_name_counter] = new_car
+                self.role_registry.add(new_car)
+                self.spatial_hash.insert(new_car)
+                self.new_messages.append(NewCarMessage(new_car))
+                self.car_name_counter += 1
+                if self.car_name_counter % 500 == 0:
+                    print str(self.car_name_counter) + " cars created"
+
+    def update_cars(self):
+        """
+        Delivers the messages of the previous tick, updates the cars and
+        removes the ones that left the intersection.
+        :return: <list of Cars> cars that left the intersection.
+        """
+        left_intersection_cars = []
+        message_bus = MessageBus(self.messages)
+        if self.vehicle_engine is not None:
+            for car in self.cars.values():
+                message_bus.deliver(car)
+                car.start_update()
+            self.vehicle_engine.step()
+        for car in self.cars.values():
+            if self.vehicle_engine is not None:
+                car.finish_update()
+            else:
+                message_bus.deliver(car)
+                car.update()
+            self.new_messages.extend(car.get_new_messages())
+            car.set_new_messages([])
+            if not car.get_rect().colliderect(self.full_intersection_rect):
+                left_intersection_cars.append(car)
+                car.set_left_intersection_time(self.counter)
+                if car.get_left_intersection_messages() is not None:
+                    self.new_messages.append(
+                        car.get_left_intersection_messages()
                     )
-                if lanes_waiting_time[lane][0] <= lanes_waiting_time[lane][1]:
-                    new_car = random_car(
-                        car_name_counter,
-                        min_speed,
-                        max_speed,
-                        counter,
-                        number_of_lanes,
-                        fix,
-                        stand_still_param,
-                        lane=lane,
-                        initial_speed=initial_speed
+        for left_car in left_intersection_cars:
+            del self.cars[left_car.get_name()]
+            self.state_table.remove(left_car)
+            self.role_registry.remove(left_car)
+            if self.vehicle_engine is not None:
+                self.vehicle_engine.remove(left_car)
+        self.state_table.advance()
+        self.messages = self.new_messages.drain()
+        self.spatial_hash.build(self.cars.values())
+        return left_intersection_cars
+
+    def write_logs(self, collision_events, left_intersection_cars):
+        """
+        Logs the collisions, the coordinations of the supervisor, the number
+        of cars simulated and the cars that left the intersection in the
+        actual tick.
+        :param collision_events: <list of CollisionEvents> collisions of the
+            tick.
+        :param left_intersection_cars: <list of Cars> cars that left the
+            intersection in the tick.
+        """
+        cars = self.cars
+        for collision_event in collision_events:
+            pair = collision_event.get_cars()
+            if not pair[0].get_rect().colliderect(self.intersection_rect):
+                continue
+            collision_code = collision_event.get_code()
+            if self.collision_record.add(collision_event):
+                self.collision_wait = True
+                if not self.collision:
+                    self.collision = True
+                    self.collided_cars = pair
+                    collision_codes = []
+                    collision_groups = [cars.values(), list(pair)]
+                    collision = (
+                        collision_code, collision_event.get_time(),
+                        [car.get_log_state() for car in cars.values()],
+                        [car.get_log_state() for car in pair],
+                        collision_codes
                     )
-                    new_car.new_image()
-                    lanes_waiting_time[lane] = (
-                        np.random.exponential(1.0 / rate),
-                        0
+                collision_codes.append(collision_code)
+        supervisor_car = self.role_registry.get_supervisor()
+        if supervisor_car is not None:
+            for message in supervisor_car.get_log_messages():
+                try:
+                    message["coordinated_car"].set_x_position(
+                        cars[
+                            message["coordinated_car"].get_name()
+                        ].get_x_position()
                     )
-                    # not supervisor(cars) and
-                    # not supervisor_message(messages):
-                    if len(cars) == 0:
-                        new_car.__class__ = SupervisorCar
-                    cars[car_name_counter] = new_car
-                    new_messages.append(NewCarMessage(new_car))
-                    car_name_counter += 1
-                    if car_name_counter % 500 == 0:
-                        print str(car_name_counter) + " cars created"
-            left_intersection_cars = []
-            left_intersection_cars_log = []
-            messages.sort(
-                key=lambda not_sorted_message: not_sorted_message.get_value(),
-                reverse=True
-            )
-            for car in cars.values():
-                for message in messages:
-                    message.process(car)
-                car.update()
-                for new_message in car.get_new_messages():
-                    new_messages.append(new_message)
-                car.set_new_messages([])
-                if not car.screen_car.colliderect(full_intersection_rect):
-                    left_intersection_cars.append(car)
-                    car.set_left_intersection_time(counter)
-                    if car.get_left_intersection_messages() is not None:
-                        new_messages.append(
-                            car.get_left_intersection_messages()
-                        )
-                    if log:
-                        left_intersection_cars_log.append(car)
-            for left_car in left_intersection_cars:
-                del cars[left_car.get_name()]
-            messages = new_messages
-            new_messages = []
-            collided_cars, collide = colliding_cars(cars.values())
-            if log:
-                car_in_intersection = (
-                    collide and
-                    collided_cars[0].screen_car.colliderect(intersection_rect)
-                )
-                collision_message_dict = {}
-                if (collide and car_in_intersection):
-                    collision_code = "{}to{}".format(
-                        collided_cars[0].get_name(),
-                        collided_cars[1].get_name()
+                    message["coordinated_car"].set_y_position(
+                        cars[
+                            message["coordinated_car"].get_name()
+                        ].get_y_position()
                     )
-                    if collision_code not in collision_list:
-                        collision = True
-                        collision_wait = True
-                        collision_list.append(collision_code)
-                        collisions += 1
-                        collision_message_dict["collision_code"] = (
-                            collision_code
-                        )
-                        collision_message_dict[
-                            "collision_initial_conditions"
-                        ] = [car.to_json() for car in cars.values]
-                        # collision_message = (
-                        #     '{"collision_code":" {}", '
-                        #     '"collision_initial_conditions":['
-                        # ).format(collision_code)
-                        # for car in cars.values():
-                        #     collision_message += car.to_json() + ','
-                        collision_message_dict['collided_cars'] = [
-                            [car.to_json() for car in collided_cars]
-                        ]
-                        # collision_message = (
-                        #     '{}],"collided_cars":['.format(
-                        #         collision_message[
-                        #             :len(collision_message)-1
-                        #         ]
-                        #     )
-                        # )
-                        # for car in collided_cars:
-                        #     collision_message += car.to_json() + ','
-                        # collision_message = '{}]}'.format(
-                        #     collision_message[:len(collision_message) - 1]
-                        # )
-                supervisor_car = get_supervisor(cars.values())
-                if supervisor_car is not None:
-                    for message in supervisor_car.get_log_messages():
-                        try:
-                            message["coordinated_car"].set_x_position(
-                                cars[
-                                    message["coordinated_car"].get_name()
-                                ].get_x_position()
-                            )
-                            message["coordinated_car"].set_y_position(
-                                cars[
-                                    message["coordinated_car"].get_name()
-                                ].get_y_position()
-                            )
-                            message["coordinated_car"].set_direction(
-                                cars[
-                                    message["coordinated_car"].get_name()
-                                ].get_direction()
-                            )
-                            message["coordinated_car"].set_speed(
-                                cars[
-                                    message["coordinated_car"].get_name()
-                                ].get_speed()
-                            )
-                            log_message = {}
-                            log_message["coordinated_car"] = (
-                                message["coordinated_car"].to_json()
-                            )
-                            log_message["car_order"] = []
-                            for car in message["old_cars"]:
-                                for old_car in cars.values():
-                                    if old_car.get_name() == car.get_name():
-                                        car.set_x_position(
-                                            old_car.get_x_position())
-                                        car.set_y_position(
-                                            old_car.get_y_position())
-                                        car.set_direction(
-                                            old_car.get_direction())
-                                        car.set_speed(old_car.get_speed())
-                                        break
-                                log_message["car_order"].append(car.to_json())
-                            log_message["selected_car"] = (
-                                message["selected_car"].to_json()
-                            )
-                            coordination_log.info(log_message)
-                        except KeyError:
-                            pass
-                    supervisor_car.set_log_messages([])
-                if collision:
-                    collision_log.info(str(collision_message_dict))
-                    collision = False
-                    return -1
-                log_threshold_passed = (
-                    car_name_counter % 250.0 == 0
-                )
-                cars_passed = counter % (60.0 / cars_per_second) == 0
-                if log_threshold_passed and cars_passed:
-                    message_dict = {"cars_simulated": car_name_counter}
-                    total_cars_log.info(message_dict)
-                if len(left_intersection_cars_log) > 1:
-                    left_intersection_log.info(
-                        [car.to_json() for car in left_intersection_cars_log]
+                    message["coordinated_car"].set_direction(
+                        cars[
+                            message["coordinated_car"].get_name()
+                        ].get_direction()
                     )
-            if graphic_environment:
-                events = pygame.event.get()
-                supervisor_car = get_supervisor(cars.values())
-                if coordinator_fail(events) and supervisor_car:
-                    supervisor_car.attack_supervisor = True
-                if coordinator_lies(events) and supervisor_car:
-                    supervisor_car.supervisor_lies = True
-                iteration = not check_close_application(events)
-                collision_wait = continue_simulation(events) or collision_wait
-                screen.blit(background, (0, 0))
-                screen.blit(intersection_background, (0, 0))
-                for car in cars.values():
-                    screen.blit(car.rotated_image, car.screen_car)
-                    display_info_on_car(car, screen, font, 1)
-                if show_virtual_caravan:
-                    show_caravan(
-                        cars.values(),
-                        screen,
-                        font,
-                        collided_cars,
-                        screen_width
+                    message["coordinated_car"].set_speed(
+                        cars[
+                            message["coordinated_car"].get_name()
+                        ].get_speed()
                     )
-                pygame.display.update(screen.get_rect())
-        else:
-            if print_collision_message:
-                print_collision_message = False
-                supervisor_car = get_supervisor(cars.values())
-                # if supervisor_car is not None:
-                #     sys.stdout.write(
-                #         "\r{}".format(
-                #             supervisor_car.get_transmitter_receiver_dict()
-                #         )
-                #     )
-                # sys.stdout.flush()
-                display_time_counter = 0
-            events = pygame.event.get()
-            iteration = not check_close_application(events)
-            collision_wait = not continue_simulation(events)
-            if not collision_wait:
-                print_collision_message = True
-    if graphic_environment:
-        pygame.display.quit()
-    print (
-        "\nLast record. Total collisions: {}\nNot created vehicles: {}\nNumber"
-        " of ticks: {}"
-    ).format(collisions, not_created_vehicles, counter)
-    return 0
+                    for car in message["old_cars"]:
+                        for old_car in cars.values():
+                            if old_car.get_name() == car.get_name():
+                                car.set_x_position(
+                                    old_car.get_x_position())
+                                car.set_y_position(
+                                    old_car.get_y_position())
+                                car.set_direction(
+                                    old_car.get_direction())
+                                car.set_speed(old_car.get_speed())
+                                break
+                    if self.log_format == "columnar":
+                        self.coordination_log.write_cars(
+                            [[message["coordinated_car"]],
+                             message["old_cars"],
+                             [message["selected_car"]]],
+                            self.counter
+                        )
+                        continue
+                    coordination = (
+                        message["coordinated_car"].get_log_state(),
+                        [car.get_log_state() for car in message["old_cars"]],
+                        message["selected_car"].get_log_state()
+                    )
+                    self.write_log(self.coordination_log,
+                                   format_coordination, coordination)
+                except KeyError:
+                    pass
+            supervisor_car.set_log_messages([])
+        if self.collision:
+            if self.log_format == "columnar":
+                self.collision_log.write_cars(collision_groups, self.counter)
+            else:
+                self.write_log(self.collision_log, format_collision, collision)
+            return
+        log_threshold_passed = (
+            self.car_name_counter % 250.0 == 0
+        )
+        cars_passed = self.counter % (60.0 / self.cars_per_second) == 0
+        if log_threshold_passed and cars_passed:
+            if self.log_format == "columnar":
+                self.total_cars_log.append(
+                    (self.counter, self.car_name_counter)
+                )
+            else:
+                self.write_log(self.total_cars_log, format_cars_simulated,
+                               self.car_name_counter)
+        if len(left_intersection_cars) > 1:
+            if self.log_format == "columnar":
+                self.left_intersection_log.write_cars(
+                    [left_intersection_cars], self.counter
+                )
+            else:
+                self.write_log(self.left_intersection_log, format_cars, [
+                    car.get_log_state() for car in left_intersection_cars
+                ])
+
+    def draw(self):
+        """
+        Handles the events of the graphic environment and draws the actual
+        tick.
+        """
+        events = pygame.event.get()
+        attack_supervisor = coordinator_fail(events)
+        supervisor_lies = coordinator_lies(events)
+        if attack_supervisor or supervisor_lies:
+            self.attack(attack_supervisor, supervisor_lies)
+        self.iteration = not check_close_application(events)
+        self.collision_wait = (
+            continue_simulation(events) or self.collision_wait
+        )
+        screen = self.screen
+        screen.blit(self.background, (0, 0))
+        screen.blit(self.intersection_background, (0, 0))
+        for car in self.cars.values():
+            car.draw_car()
+            screen.blit(car.rotated_image, car.get_rect())
+            display_info_on_car(car, screen, self.font, 1)
+        if self.show_virtual_caravan:
+            show_caravan(
+                self.cars.values(),
+                screen,
+                self.font,
+                self.collided_cars,
+                self.screen_width
+            )
+        pygame.display.update(screen.get_rect())
+
+    def tick(self):
+        """
+        Advances the simulation one tick.
+        :return: <boolean> False if the simulation stopped at a collision.
+        """
+        self.display_time_counter += 1
+        self.counter += 1
+        self.create_cars()
+        left_intersection_cars = self.update_cars()
+        collision_events = []
+        if self.log or self.graphic_environment:
+            collision_events = self.collision_detector.detect(
+                self.cars.values(), self.counter
+            )
+        self.collided_cars = (
+            collision_events[0].get_cars() if collision_events else None
+        )
+        if self.log:
+            self.write_logs(collision_events, left_intersection_cars)
+            if self.collision:
+                self.collision = False
+                return False
+        if self.graphic_environment:
+            self.draw()
+        return True
+
+    def wait(self):
+        """
+        Waits for the user to continue the simulation after a collision.
+        """
+        if self.print_collision_message:
+            self.print_collision_message = False
+            supervisor_car = self.role_registry.get_supervisor()
+            # if supervisor_car is not None:
+            #     sys.stdout.write(
+            #         "\r{}".format(
+            #             supervisor_car.get_transmitter_receiver_dict()
+            #         )
+            #     )
+            # sys.stdout.flush()
+            self.display_time_counter = 0
+        events = pygame.event.get()
+        self.iteration = not check_close_application(events)
+        self.collision_wait = not continue_simulation(events)
+        if not self.collision_wait:
+            self.print_collision_message = True
+
+    def set_results(self):
+        """
+        Fills the results dict of the simulation.
+        """
+        self.results.update(
+            collisions=len(self.collision_record),
+            not_created_vehicles=self.not_created_vehicles,
+            ticks=self.counter, seed=self.random_streams.seed
+        )
+
+    def run(self):
+        """
+        Runs the simulation until the limit of cars is created, the window is
+        closed or, if the simulation is logged, a collision happens. A
+        checkpoint is written every checkpoint_interval ticks.
+        :return: <int> -1 if the simulation stopped at a collision, 0
+            otherwise.
+        """
+        while self.iteration and self.car_name_counter < self.limit:
+            if not self.collision_wait or not self.graphic_environment:
+                if not self.tick():
+                    self.stop_logs()
+                    self.set_results()
+                    return -1
+                if (self.checkpoint_interval and
+                        self.counter % self.checkpoint_interval == 0):
+                    self.save_checkpoint(self.checkpoint_path)
+            else:
+                self.wait()
+        if self.graphic_environment:
+            pygame.display.quit()
+        self.stop_logs()
+        print (
+            "\nLast record. Total collisions: {}\nNot created vehicles: {}"
+            "\nNumber of ticks: {}\nSeed: {}"
+        ).format(len(self.collision_record), self.not_created_vehicles,
+                 self.counter, self.random_streams.seed)
+        self.set_results()
+        return 0
+
+
+def main_simulation(graphic_environment, limit, stand_still_param=5, fix=True,
+                    *args, **kwargs):
+    """
+    Runs a simulation (see Simulation).
+    :return: <int> -1 if the simulation stopped at a collision, 0 otherwise.
+    """
+    return Simulation(
+        graphic_environment, limit, stand_still_param, fix, *args, **kwargs
+    ).run()
 
 
 car_limit = 10000
@@ -317,6 +735,8 @@ stand_still_distances = [5, 7, 9, 11, 13, 15]
 initial_speed_values = {5: [0], 7: [0, 5, 10, 20], 9: [0], 11: [20]}
 fix_booleans = [False, True, False, True]
 distributed_param = ["", "", "distributed", "distributed"]
+# simulations/parameter_sweep.py runs the sweep over these parameters in
+# parallel
 
 # for i in range(15, 30, 5):
 #     print "Starting simulation for standstill distance " + str(i)
@@ -333,15 +753,16 @@ distributed_param = ["", "", "distributed", "distributed"]
 #             "Standstill distance {} presented no collisions in {} cars."
 #         ).format(i, car_limit)
 
-main_simulation(
-    False,
-    car_limit,
-    5,
-    True,
-    "",
-    "show_caravan",
-    log="_standstill_distance_5"
-)
+if __name__ == "__main__":
+    main_simulation(
+        False,
+        car_limit,
+        5,
+        True,
+        "",
+        "show_caravan",
+        log="_standstill_distance_5"
+    )
 # for stand_still_value in stand_still_distances:
 #     for initial_speed in initial_speed_values[stand_still_value]:
 #         print (
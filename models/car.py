@@ -1,15 +1,29 @@
-import os
-from math import pi, cos, sin, atan, ceil
-from pygame import image, transform
+from math import pi, cos, sin, ceil
 from time import time
 import random
 from car_controllers import default_controller, follower_controller
+from models.car_registry import CarRegistry
+from models.footprint import Footprint
+from models.sprite_cache import car_sprites
+from models import virtual_caravan
 from models.message import Message, InfoMessage, FollowingCarMessage, \
     LeftIntersectionMessage, SupervisorLeftIntersectionMessage, \
     SecondAtChargeMessage, NewSupervisorMessage, FaultyCoordinationMessage, \
     CorrectedCoordinationMessage
 
-images_directory = os.path.dirname(os.path.abspath(__file__)) + "/../images/"
+
+def car_length(width, height, direction_sin, direction_cos):
+    """
+    Length of a car along its direction, from the size of its rectangle at
+    the screen. Works with floats, for one car, and with NumPy arrays, for
+    many cars at once (see VehicleEngine).
+    :param width: <int> width of the rectangle of the car.
+    :param height: <int> height of the rectangle of the car.
+    :param direction_sin: <float> sine of the direction of the car.
+    :param direction_cos: <float> cosine of the direction of the car.
+    :return: <float>
+    """
+    return abs(width * direction_sin - height * direction_cos)
 
 
 class Car(object):
@@ -19,12 +33,41 @@ class Car(object):
     will be escalated into x and y with the direction. Also, the car has a
     fixed acceleration and maximum speed.
     """
+    # Subclasses don't add slots, so the class of a car can be changed
+    # between Car, SupervisorCar, InfrastructureCar and SecondAtChargeCar.
+    __slots__ = (
+        "absolute_speed", "acceleration_rate", "actual_coordinates",
+        "attack_generator", "attack_supervisor", "cars_at_intersection",
+        "control_law_value",
+        "controller", "coordination_counter_dict", "coordination_messages",
+        "corrected_coordinated_car_name", "corrected_coordination_message",
+        "corrected_following_car_name", "creation_time", "faulty_cars_names",
+        "faulty_coordinated_car_name",
+        "faulty_coordination_second_at_charge_message",
+        "faulty_coordination_supervisor_message", "faulty_coordinator_name",
+        "faulty_following_car_name", "fix", "following",
+        "following_car_counter", "following_car_message", "footprint",
+        "has_alternate_second_at_charge", "has_second_at_charge", "image",
+        "initial_coordinates", "initial_speed", "intention", "lane",
+        "last_virtual_distance", "left_intersection_time",
+        "liar_supervisor_names", "log_messages", "name", "new_car",
+        "new_cars_at_intersection_counter", "new_messages",
+        "new_supervisor_name", "registered_caravan_depth", "registries",
+        "role_registry", "rotated_image", "screen_car",
+        "second_at_charge_name",
+        "stand_still_param", "state_table", "supervisor_counter",
+        "supervisor_is_lying",
+        "supervisor_left_intersection", "supervisor_lies",
+        "total_cars_at_faulty_coordination", "transmitter_receiver_dict",
+        "update_cars_at_intersection_counter", "vehicle_engine"
+    )
     TIME_STEP = 0.1
     SPEED_FACTOR = 2
     max_forward_speed = 20.0  # meters/seconds.
-    acceleration_rate = 3.0  # meters/seconds*seconds.
-    following_car_message = Message()
+    default_acceleration_rate = 3.0  # meters/seconds*seconds.
+    default_following_car_message = Message()
     image_scale_rate = 0.05
+    role = "car"  # see RoleRegistry
     maximum_acceleration = 4.2
     minimum_acceleration = -5.0
 
@@ -52,13 +95,20 @@ class Car(object):
         self.initial_coordinates = (pos_x, pos_y, direction, lane)
         self.actual_coordinates = (pos_x, pos_y, direction, lane)
         self.absolute_speed = absolute_speed
+        self.acceleration_rate = self.default_acceleration_rate
         self.lane = lane
         self.intention = intention
 
         self.image = None
         self.rotated_image = None
         self.screen_car = None
+        self.footprint = None
+        # engine that moves the car, if any (see VehicleEngine)
+        self.vehicle_engine = None
+        self.state_table = None
+        self.role_registry = None
         self.following = False  # True if the car is following some other car
+        self.following_car_message = self.default_following_car_message
         self.new_car = True
         self.has_second_at_charge = False
         self.supervisor_left_intersection = False
@@ -66,6 +116,9 @@ class Car(object):
         self.has_alternate_second_at_charge = False
         self.supervisor_lies = False
         self.supervisor_is_lying = False
+        # random generator used to choose the bad coordinations of a lying
+        # supervisor
+        self.attack_generator = random
         self.fix = fix
 
         self.stand_still_param = stand_still_param
@@ -81,7 +134,8 @@ class Car(object):
 
         self.transmitter_receiver_dict = {}
         self.coordination_messages = {}
-        self.cars_at_intersection = {}
+        self.cars_at_intersection = CarRegistry()
+        self.registries = []  # registries of other cars with this car
         self.update_cars_at_intersection_counter = {}
         self.new_messages = []
         self.log_messages = []
@@ -137,25 +191,53 @@ class Car(object):
         Returns a dictionary representing a car in json format.
         :return: dictionary of json representation of a car.
         """
+        return self.log_state_to_json(self.get_log_state())
+
+    def get_log_state(self):
+        """
+        Returns the state of the car written to the logs, as a tuple that can
+        be turned into json later (see log_state_to_json).
+        :return: <tuple>
+        """
+        return (
+            self.get_name(), self.get_following_car_message().get_name(),
+            self.get_lane(), self.get_speed(), self.get_creation_time(),
+            self.get_left_intersection_time(), self.get_intention(),
+            self.get_x_position(), self.get_y_position(),
+            self.get_direction(), self.get_origin_x_position(),
+            self.get_origin_y_position(), self.get_origin_direction(),
+            self.get_caravan_depth()
+        )
+
+    @staticmethod
+    def log_state_to_json(state):
+        """
+        Returns the json representation of a car from its log state.
+        :param state: <tuple> log state of a car (see get_log_state).
+        :return: dictionary of json representation of a car.
+        """
+        (name, following, lane, speed, creation_time, left_intersection_time,
+         intention, x_position, y_position, direction, origin_x_position,
+         origin_y_position, origin_direction, caravan_depth) = state
         json = {
-            "name": self.get_name(),
-            "following": self.get_following_car_message().get_name(),
-            "lane": self.get_lane(),
-            "speed": self.get_speed(),
-            "creation_time": self.get_creation_time(),
-            "left_intersection_time": self.get_left_intersection_time(),
-            "intention": self.get_intention(),
+            "name": name,
+            "following": following,
+            "lane": lane,
+            "speed": speed,
+            "creation_time": creation_time,
+            "left_intersection_time": left_intersection_time,
+            "intention": intention,
             "actual_coordinates": {
-                "x_coordinate": self.get_x_position(),
-                "y_coordinate": self.get_y_position(),
-                "direction": self.get_direction()
+                "x_coordinate": x_position,
+                "y_coordinate": y_position,
+                "direction": direction
             },
             "initial_coordinates": {
-                "x_coordinate": self.get_origin_x_position(),
-                "y_coordinate": self.get_origin_y_position(),
-                "direction": self.get_origin_direction()
+                "x_coordinate": origin_x_position,
+                "y_coordinate": origin_y_position,
+                "direction": origin_direction
             },
-            "actual_caravan_depth": self.get_caravan_depth()
+            "actual_caravan_depth": caravan_depth
         }
         return json
 
@@ -180,17 +262,16 @@ class Car(object):
         """
         Turns the car to the direction it intends to turn.
         """
-        path_width = 172.0
-        conflict_zone_radio = 384.0
-        initial_straight_section = conflict_zone_radio - path_width / 2.0
-        if (self.get_virtual_x_position() > initial_straight_section and
+        virtual_x, virtual_y = self.get_virtual_position()
+        initial_straight_section = virtual_caravan.initial_straight_section
+        if (virtual_x > initial_straight_section and
                 self.get_controller() is
                 not default_controller.default_controller):
             self.set_controller(default_controller.default_controller)
         if self.get_intention() == "r":
-            right_turn_radio = path_width / 4.0
-            if self.get_virtual_y_position() > -right_turn_radio and \
-                    self.get_virtual_x_position() > initial_straight_section:
+            right_turn_radio = virtual_caravan.right_turn_radio
+            if virtual_y > -right_turn_radio and \
+                    virtual_x > initial_straight_section:
                 direction_change = (
                     90.0 * (
                         self.get_speed() * self.TIME_STEP * self.SPEED_FACTOR
@@ -198,9 +279,9 @@ class Car(object):
                 )
                 self.set_direction(self.get_direction() - direction_change)
         elif self.get_intention() == "l":
-            left_turn_radio = 3 * path_width / 4.0
-            if self.get_virtual_y_position() < left_turn_radio and \
-                    self.get_virtual_x_position() > initial_straight_section:
+            left_turn_radio = virtual_caravan.left_turn_radio
+            if virtual_y < left_turn_radio and \
+                    virtual_x > initial_straight_section:
                 direction_change = (
                     90.0 * (
                         self.get_speed() * self.TIME_STEP * self.SPEED_FACTOR
@@ -226,37 +307,65 @@ class Car(object):
 
     def draw_car(self):
         """
-        Prepares the image of the car to be drawn. The image is rotated,
-        re-escalated and moved.
-        """
-        self.rotated_image = transform.rotate(self.image, self.get_direction())
-        self.rotated_image = transform.scale(
-            self.rotated_image,
-            (
-                int(
-                    self.rotated_image.get_rect().w *
-                    self.get_image_scale_rate()
-                ),
-                int(
-                    self.rotated_image.get_rect().h *
-                    self.get_image_scale_rate()))
-                )
-        self.screen_car = self.rotated_image.get_rect()
-        self.screen_car.center = self.get_position()
+        Prepares the image of the car to be drawn. The rotated and scaled
+        image is taken from the sprite atlas. Only needed when the car is
+        rendered, the screen representation of the car is kept by its
+        footprint.
+        """
+        self.update_footprint()
+        self.rotated_image = car_sprites.get_rotated_image(
+            self.get_direction(), self.footprint.scale_rate
+        )
+
+    def update_footprint(self):
+        """
+        Moves the footprint of the car to its actual coordinates and updates
+        the screen representation of the car.
+        """
+        self.footprint.move(
+            self.get_x_position(), self.get_y_position(), self.get_direction()
+        )
+        self.screen_car = self.footprint.get_rect()
 
     def update(self):
         """
         Updates the speed, position and images of the car.
         """
+        self.start_update()
+        self.update_kinematics()
+        self.finish_update()
+
+    def start_update(self):
+        """
+        First part of the update of a car, done before it moves. Drops the
+        following car if no information of it has been received.
+        """
         if self.following_car_counter == 0:
             self.set_controller(default_controller.default_controller)
         self.following_car_counter -= 1
+
+    def update_kinematics(self):
+        """
+        Updates the speed, direction and position of the car and its footprint.
+        When the simulation uses a VehicleEngine this part of the update is
+        done by the engine for all the cars at once.
+        """
         self.accelerate()
         self.get_controller()(self)
         self.turn()
         self.move()
-        self.draw_car()
-        self.get_new_messages().append(InfoMessage(self))
+        self.update_footprint()
+
+    def finish_update(self):
+        """
+        Last part of the update of a car, done after it moves. Informs the
+        other cars of its new state. If the car is in a StateTable, the state
+        is published there instead of creating a new InfoMessage.
+        """
+        if self.state_table is not None:
+            self.get_new_messages().append(self.state_table.publish(self))
+        else:
+            self.get_new_messages().append(InfoMessage(self))
 
     def cross_path(self, other_car_lane, other_car_intention):
         """
@@ -267,106 +376,19 @@ class Car(object):
         :param other_car_lane: the lane at which the other car star its way.
         :return: True if the paths does not crosses, False otherwise.
         """
-        self_lane = self.get_lane()
-        self_intention = self.get_intention()
-        lane_to_int_dict = {"l": 0, "s": 1, "r": 2}
-        table0 = [[True, True, True], [True, True, True], [True, True, True]]
-        table1 = [
-            [True, True, False], [True, True, False], [False, True, False]
-        ]
-        table2 = [
-            [True, True, True], [True, False, False], [True, False, False]
-        ]
-        table3 = [
-            [True, True, False], [True, True, True], [False, False, False]
-        ]
-        all_tables = [table0, table1, table2, table3]
-        cross_paths = all_tables[
-            (self_lane - other_car_lane) % 4
-        ][lane_to_int_dict[self_intention]][
-            lane_to_int_dict[other_car_intention]
-        ]
-        return cross_paths
+        return virtual_caravan.cross_path(
+            self.get_lane(), self.get_intention(), other_car_lane,
+            other_car_intention
+        )
 
     def virtual_distance(self):
         """
         Gets the virtual position of the car.
         :return: <int> virtual position of the car
         """
-        conflict_zone_radio = 384.0
-        path_width = 172.0
-        right_turn_radio = path_width / 4.0
-        left_turn_radio = 3 * path_width / 4.0
-        initial_straight_section = conflict_zone_radio - path_width / 2.0
-        if self.get_intention() == "s":
-            virtual_distance_value = self.get_virtual_x_position()
-        elif self.get_intention() == "r":
-            # Calculate real virtual distance
-            if self.get_virtual_x_position() <= initial_straight_section:
-                virtual_distance_value = self.get_virtual_x_position()
-            elif self.get_virtual_y_position() > -right_turn_radio:
-                virtual_distance_value = (
-                    initial_straight_section +
-                    atan(
-                        (self.get_virtual_x_position() -
-                            initial_straight_section) /
-                        (right_turn_radio + self.get_virtual_y_position())
-                    ) * right_turn_radio
-                )
-            else:
-                virtual_distance_value = (
-                    initial_straight_section + pi * right_turn_radio / 2.0 -
-                    self.get_virtual_y_position() - right_turn_radio
-                )
-
-            a = path_width / 2.0
-            b = right_turn_radio + path_width / 4.0
-            c = pi * right_turn_radio / 2.0
-            # Scale virtual distance
-            if virtual_distance_value <= initial_straight_section + c:
-                virtual_distance_value *= (
-                    (initial_straight_section + a + b) /
-                    (initial_straight_section + c)
-                )
-            else:
-                virtual_distance_value += a + b - c
-
-        else:
-            # Calculate real virtual distance
-            if self.get_virtual_x_position() <= initial_straight_section:
-                virtual_distance_value = self.get_virtual_x_position()
-            elif self.get_virtual_y_position() < left_turn_radio:
-                virtual_distance_value = (
-                    initial_straight_section +
-                    atan(
-                            (
-                                self.get_virtual_x_position() -
-                                initial_straight_section
-                            ) / (
-                                left_turn_radio -
-                                self.get_virtual_y_position()
-                            )
-                        ) * left_turn_radio
-                )
-            else:
-                virtual_distance_value = (
-                    initial_straight_section + pi * left_turn_radio / 2 +
-                    self.get_virtual_y_position() - left_turn_radio
-                )
-
-            a = path_width / 2
-            b = left_turn_radio - path_width / 4
-            c = pi * left_turn_radio / 2
-            # Scale virtual distance
-            if virtual_distance_value <= initial_straight_section + c:
-                virtual_distance_value *= (
-                    (initial_straight_section + a + b) /
-                    (initial_straight_section + c)
-                )
-            else:
-                virtual_distance_value += a + b - c
-
-        return virtual_distance_value
+        return virtual_caravan.virtual_distance(
+            *self.get_virtual_position() + (self.get_intention(),)
+        )
 
     def supervisor_level(self, new_car, attack=False):
         """
@@ -380,36 +402,33 @@ class Car(object):
         :param new_car: information of the new car at the intersection
         :param fix: <boolean> use the fix to the algorithm or not.
         """
-        log_string = {"coordinated_car": new_car}
         if not attack:
-            old_cars = self.get_cars_at_intersection().values()
-            old_cars.sort(key=lambda car: car.get_name(), reverse=True)
-            if self.fix:
-                old_cars.sort(
-                    key=lambda car: car.get_caravan_depth(), reverse=True
-                )
-            log_string["old_cars"] = old_cars
+            cars_at_intersection = self.get_cars_at_intersection()
             following_car_message = None
-            for old_car in old_cars:
-                if (new_car.cross_path(
-                        old_car.get_lane(), old_car.get_intention()
-                        ) and new_car.get_name() > old_car.get_name()):
-                    log_string["selected_car"] = old_car
-                    self.get_log_messages().append(log_string)
-                    if self.supervisor_lies:
-                        bad_follower = old_cars[
-                            random.randint(0, len(old_cars) - 1)
-                        ]
-                        following_car_message = FollowingCarMessage(
-                            bad_follower, new_car.get_name(), self.get_name()
-                        )
-                    else:
-                        following_car_message = FollowingCarMessage(
-                            old_car, new_car.get_name(), self.get_name()
-                        )
-                    new_car.start_following(following_car_message)
-                    self.get_new_messages().append(following_car_message)
-                    break
+            old_car = cars_at_intersection.get_car_to_follow(new_car, self.fix)
+            if old_car is not None:
+                # the ordered cars are only needed for the log and by a lying
+                # supervisor
+                if self.get_log_messages() is not None or self.supervisor_lies:
+                    old_cars = cars_at_intersection.get_sorted_cars(self.fix)
+                if self.get_log_messages() is not None:
+                    self.get_log_messages().append({
+                        "coordinated_car": new_car, "old_cars": old_cars,
+                        "selected_car": old_car
+                    })
+                if self.supervisor_lies:
+                    bad_follower = old_cars[
+                        self.attack_generator.randint(0, len(old_cars) - 1)
+                    ]
+                    following_car_message = FollowingCarMessage(
+                        bad_follower, new_car.get_name(), self.get_name()
+                    )
+                else:
+                    following_car_message = FollowingCarMessage(
+                        old_car, new_car.get_name(), self.get_name()
+                    )
+                new_car.start_following(following_car_message)
+                self.get_new_messages().append(following_car_message)
             if not new_car.get_following():
                 following_car_message = FollowingCarMessage(
                     None, new_car.get_name(), self.get_name()
@@ -442,23 +461,27 @@ class Car(object):
     def new_image(self, scale_rate=image_scale_rate):
         """
         Creates the image representation of a car, with his rotated image and
-        his screen representation (with the rect).
-        """
-        self.image = image.load(images_directory + "car.png")
-        # image of the car rotated
-        self.rotated_image = transform.rotate(self.image, self.get_direction())
-        # reduction of the size of the image
-        self.rotated_image = transform.scale(
-            self.rotated_image,
-            (
-                int(self.rotated_image.get_rect().w * scale_rate),
-                int(self.rotated_image.get_rect().h * scale_rate)
-            )
+        his screen representation (with the rect). The images are shared by
+        all the cars through the sprite cache.
+        """
+        self.new_footprint(scale_rate)
+        self.image = car_sprites.get_image()
+        self.rotated_image = car_sprites.get_rotated_image(
+            self.get_direction(), scale_rate
         )
-        # rectangle representation of the car
-        self.screen_car = self.rotated_image.get_rect()
-        # add the position to the rectangle
-        self.screen_car.center = self.get_position()
+
+    def new_footprint(self, scale_rate=image_scale_rate):
+        """
+        Creates the footprint of the car and its screen representation (the
+        rect) without loading or transforming any image. Used when the
+        simulation runs without graphic environment.
+        :param scale_rate: rate at which the car image is scaled.
+        """
+        self.footprint = Footprint(
+            self.get_x_position(), self.get_y_position(),
+            self.get_direction(), scale_rate
+        )
+        self.screen_car = self.footprint.get_rect()
 
     def collide(self, list_of_cars):
         """
@@ -507,34 +530,24 @@ class Car(object):
         :param left_intersection_message: message of the car that left the
             intersection
         """
-        cars_at_intersection = self.get_cars_at_intersection().values()
-        cars_at_intersection.sort(
-            key=lambda car_at_intersection: car_at_intersection.get_name()
-        )
+        cars_at_intersection = self.get_cars_at_intersection()
         # update car information
-        for car in cars_at_intersection:
-            if (left_intersection_message.get_name() ==
-                    car.get_following_car_message().get_name()):
-                car.set_controller(default_controller.default_controller)
-                car.set_following(False)
-        if (left_intersection_message.get_name() in
-                self.get_cars_at_intersection()):
-            del self.get_cars_at_intersection()[
+        for name in cars_at_intersection.get_follower_names(
+                left_intersection_message.get_name()):
+            car = cars_at_intersection[name]
+            car.set_controller(default_controller.default_controller)
+            car.set_following(False)
+        left_car = None
+        if left_intersection_message.get_name() in cars_at_intersection:
+            left_car = cars_at_intersection.pop(
                 left_intersection_message.get_name()
-            ]
+            )
 
         if left_intersection_message.get_name() in self.faulty_cars_names:
             self.faulty_cars_names.remove(left_intersection_message.get_name())
 
         # update following car information
-        for car in cars_at_intersection:
-            following_car_name = car.get_following_car_message().get_name()
-            if following_car_name in self.get_cars_at_intersection():
-                car.set_following_car_message(
-                    InfoMessage(
-                        self.get_cars_at_intersection()[following_car_name]
-                    )
-                )
+        cars_at_intersection.refresh_following_car_messages(left_car)
 
         if (left_intersection_message.get_name() ==
                 self.get_following_car_message().get_name()):
@@ -553,6 +566,9 @@ class Car(object):
         process of coordination of all the cars at the intersection. For the
         last car coordinated, the car will generate a message with the results
         of the full coordination process.
+        The result of the replay is kept in the message, with the log entries
+        it produced, so the cars that would replay the coordination in the
+        same way reuse it instead of replaying it again (see get_replay_key).
         :param faulty_coordination_message: <FaultyCoordinationMessage>
             Message with the information required to check if the coordination
             is correct.
@@ -563,23 +579,56 @@ class Car(object):
         self.set_faulty_coordination_second_at_charge_message(
             faulty_coordination_message.get_second_at_charge_message()
         )
-        cars_at_intersection = {}
         actual_cars_at_intersection = (
-            faulty_coordination_message.get_cars_at_intersection().values()
+            faulty_coordination_message.get_cars_at_intersection()
+            .get_cars_by_name()
         )
         self.set_total_cars_at_faulty_coordination(
             len(actual_cars_at_intersection)
         )
-        actual_cars_at_intersection.sort(
-            key=lambda old_car: old_car.get_name()
+        faulty_coordinated_car_name = (
+            faulty_coordination_message.get_faulty_coordinated_car_name()
         )
+        replays = faulty_coordination_message.get_replays()
+        replay_key = self.get_replay_key(faulty_coordination_message)
+        if replay_key in replays:
+            corrected_following_car_name, log_messages = replays[replay_key]
+            self.reuse_log_messages(log_messages)
+        else:
+            first_log_message = len(self.get_log_messages() or [])
+            corrected_following_car_name = self.replay_coordination(
+                actual_cars_at_intersection, faulty_coordinated_car_name
+            )
+            if replay_key is not None:
+                replays[replay_key] = (
+                    corrected_following_car_name,
+                    (self.get_log_messages() or [])[first_log_message:]
+                )
+        self.set_faulty_coordinator_name(
+            faulty_coordination_message.get_coordinator_name()
+        )
+        self.set_second_at_charge_name(
+            faulty_coordination_message.get_second_at_charge_name()
+        )
+        self.set_corrected_coordinated_car_name(faulty_coordinated_car_name)
+        self.set_corrected_following_car_name(corrected_following_car_name)
+        self.get_new_messages().append(CorrectedCoordinationMessage(self))
+
+    def replay_coordination(self, actual_cars_at_intersection,
+                            faulty_coordinated_car_name):
+        """
+        Recreates the coordination of the cars at the intersection, from the
+        oldest car to the faulty coordinated car.
+        :param actual_cars_at_intersection: <list of Cars> cars at the
+            intersection when the faulty coordination was detected, ordered by
+            name.
+        :param faulty_coordinated_car_name: <int> name of the faulty
+            coordinated car.
+        :return: <int> name of the car the faulty coordinated car must follow,
+            or -1 if it mustn't follow a car.
+        """
         faulty_coordinated_car = None
-        total_cars = 0
         for car in actual_cars_at_intersection:
-            total_cars += 1
-            faulty_coordinated_car_name = (
-                faulty_coordination_message.get_faulty_coordinated_car_name()
-            )
             if car.get_name() == faulty_coordinated_car_name:
                 faulty_coordinated_car = Car(
                     car.get_name(), lane=car.get_lane(),
@@ -595,26 +644,60 @@ class Car(object):
             following_car_message = self.supervisor_level(new_car, False)
             if following_car_message in self.get_new_messages():
                 self.get_new_messages().remove(following_car_message)
-            cars_at_intersection[new_car.get_name()] = new_car
         corrected_following_car_message = self.supervisor_level(
             faulty_coordinated_car, False
         )
         if corrected_following_car_message in self.get_new_messages():
             self.get_new_messages().remove(corrected_following_car_message)
-        self.set_faulty_coordinator_name(
-            faulty_coordination_message.get_coordinator_name()
-        )
-        self.set_second_at_charge_name(
-            faulty_coordination_message.get_second_at_charge_name()
-        )
-        self.set_corrected_coordinated_car_name(
-            faulty_coordinated_car.get_name()
-        )
-        self.set_corrected_following_car_name(
-            corrected_following_car_message.get_name()
-            if corrected_following_car_message is not None else -1
+        if corrected_following_car_message is None:
+            return -1
+        return corrected_following_car_message.get_name()
+
+    def reuse_log_messages(self, log_messages):
+        """
+        Logs the coordinations of a replay done by another car as if this car
+        had done it. The cars of the log messages are replaced by the ones of
+        this car, which has the same cars at the intersection.
+        :param log_messages: <list of dicts> log messages of the replay (see
+            supervisor_level).
+        """
+        if self.get_log_messages() is None:
+            return
+        cars_at_intersection = self.get_cars_at_intersection()
+        for message in log_messages:
+            self.get_log_messages().append({
+                "coordinated_car": message["coordinated_car"],
+                "old_cars": [cars_at_intersection[car.get_name()]
+                             for car in message["old_cars"]],
+                "selected_car": cars_at_intersection[
+                    message["selected_car"].get_name()
+                ]
+            })
+
+    def get_replay_key(self, faulty_coordination_message):
+        """
+        Returns the key of the replay of a faulty coordination by this car.
+        Cars with the same key get the same result from replay_coordination:
+        the key holds the cars of the message, the faulty coordinated car, the
+        use of the fix, the state of the cars at the intersection known by
+        this car and if the car logs its coordinations.
+        The cars that must do the replay by themselves have no key: the lying
+        supervisors and the second at charge cars, whose supervisory level has
+        side effects.
+        :param faulty_coordination_message: <FaultyCoordinationMessage>
+        :return: <tuple> key of the replay, or None if the car can't reuse the
+            replay of another car.
+        """
+        if self.supervisor_lies or isinstance(self, SecondAtChargeCar):
+            return None
+        return (
+            tuple(faulty_coordination_message.get_cars_at_intersection()
+                  .name_order),
+            faulty_coordination_message.get_faulty_coordinated_car_name(),
+            self.fix,
+            self.get_cars_at_intersection().get_state(),
+            self.get_log_messages() is not None
         )
-        self.get_new_messages().append(CorrectedCoordinationMessage(self))
 
     def check_faulty_coordination(self, message):
         """
@@ -637,7 +720,7 @@ class Car(object):
             correct_following_car_name, number_of_votes = sorted(
                 [
                     (car_name, correct_coordination_counter[car_name])
-                    for car_name in correct_coordination_counter
+                    for car_name in sorted(correct_coordination_counter)
                 ],
                 key=lambda pair: pair[1], reverse=True)[0]
             if (number_of_votes >=
@@ -681,6 +764,7 @@ class Car(object):
             new_supervisor_message.get_transmitter_receiver_dict()
         )
         self.faulty_cars_names = new_supervisor_message.faulty_cars_names
+        self.update_role()
 
     def make_second_at_charge(self, second_at_charge_message):
         """
@@ -695,12 +779,22 @@ class Car(object):
         self.set_transmitter_receiver_dict(
             second_at_charge_message.get_transmitter_receiver_dict()
         )
+        self.update_role()
 
     def make_car(self):
         """
         Change the class of this car to Car
         """
         self.__class__ = Car
+        self.update_role()
+
+    def update_role(self):
+        """
+        Informs the role registry of the simulation, if the car has one, that
+        the role of the car may have changed.
+        """
+        if self.role_registry is not None:
+            self.role_registry.update(self)
 
     def is_new(self):
         """
@@ -740,6 +834,7 @@ class Car(object):
         :param following: <boolean>
         """
         self.following = following
+        self.update_registries()
 
     def get_acceleration(self):
         """
@@ -831,9 +926,12 @@ class Car(object):
 
     def get_rect(self):
         """
-        Returns the rectangle which represents the car.
+        Returns the rectangle which represents the car. The rectangle of a
+        car moved by a VehicleEngine is only created when it's asked for.
         :return: rectangle of the car
         """
+        if self.screen_car is None and self.vehicle_engine is not None:
+            self.screen_car = self.vehicle_engine.get_rect(self)
         return self.screen_car
 
     def get_speed(self):
@@ -873,6 +971,8 @@ class Car(object):
         :param controller: new controller of the car.
         """
         self.controller = controller
+        if self.vehicle_engine is not None:
+            self.vehicle_engine.set_controller(self, controller)
 
     def get_controller(self):
         """
@@ -888,6 +988,15 @@ class Car(object):
         """
         self.following_car_counter = 4
         self.following_car_message = message
+        self.update_registries()
+
+    def update_registries(self):
+        """
+        Informs the registries with this car that its caravan depth may have
+        changed, so they keep their order.
+        """
+        for registry in self.registries:
+            registry.update_depth(self)
 
     def get_following_car_message(self):
         """
@@ -990,11 +1099,10 @@ class Car(object):
         Get the length of the car based on it's screen representation.
         :return: <int> length of a car.
         """
-        return abs(
-            (self.get_rect().right - self.get_rect().left) *
-            sin(self.get_direction() * pi / 180) +
-            (self.get_rect().top - self.get_rect().bottom) *
-            cos(self.get_direction() * pi / 180)
+        radians = self.get_direction() * pi / 180
+        return car_length(
+            self.get_rect().width, self.get_rect().height, sin(radians),
+            cos(radians)
         )
 
     def get_actual_coordinates(self):
@@ -1062,32 +1170,31 @@ class Car(object):
         """
         return self.intention
 
+    def get_virtual_position(self):
+        """
+        Returns the position of the car at the virtual caravan environment.
+        :return: (<float>, <float>) x and y position at the virtual environment
+        """
+        origin_direction = self.get_origin_direction() * pi / 180
+        return virtual_caravan.virtual_position(
+            self.get_x_position(), self.get_y_position(),
+            self.get_origin_x_position(), self.get_origin_y_position(),
+            sin(origin_direction), cos(origin_direction)
+        )
+
     def get_virtual_x_position(self):
         """
         Returns the x position of the virtual caravan environment.
         :return: <float> x position at the virtual environment
         """
-        x_real = (
-            self.get_x_position() - self.get_origin_x_position()
-        ) * sin(self.get_origin_direction() * pi / 180)
-        y_real = (
-            self.get_y_position() - self.get_origin_y_position()
-        ) * cos(self.get_origin_direction() * pi / 180)
-        return abs(x_real + y_real)
+        return self.get_virtual_position()[0]
 
     def get_virtual_y_position(self):
         """
-        Returns the x position of the virtual caravan environment.
-        :return: <float> x position at the virtual environment
+        Returns the y position of the virtual caravan environment.
+        :return: <float> y position at the virtual environment
         """
-        x_real = (
-            - 1 * (self.get_x_position() - self.get_origin_x_position()) *
-            cos(self.get_origin_direction() * pi / 180)
-        )
-        y_real = (
-            self.get_y_position() - self.get_origin_y_position()
-        ) * sin(self.get_origin_direction() * pi / 180)
-        return x_real + y_real
+        return self.get_virtual_position()[1]
 
     def set_intention(self, intention):
         """
@@ -1215,7 +1322,8 @@ class Car(object):
 
     def set_log_messages(self, log_messages):
         """
-        Sets the log messages.
+        Sets the log messages. If they are set to None, the coordinations of
+        the supervisory level aren't recorded.
         :param log_messages:  <list of Messages> messages to set.
         """
         self.log_messages = log_messages
@@ -1459,9 +1567,15 @@ class SupervisorCar(Car):
     """
     SupervisorCar class with the methods of the supervisor.
     """
+    __slots__ = ()
+    role = "supervisor"
 
-    def update(self):
-        super(SupervisorCar, self).update()
+    def finish_update(self):
+        """
+        Besides informing its state, the supervisor forgets the cars from
+        which no information has been received.
+        """
+        super(SupervisorCar, self).finish_update()
         deleted_cars = []
         for key in self.update_cars_at_intersection_counter:
             self.update_cars_at_intersection_counter[key] -= 1
@@ -1533,6 +1647,7 @@ class InfrastructureCar(SupervisorCar):
     InfrastructureCar that do the same as the supervisor, but doesn't moves or
     generates updates info.
     """
+    __slots__ = ()
 
     def update(self):
         """
@@ -1540,6 +1655,18 @@ class InfrastructureCar(SupervisorCar):
         """
         pass
 
+    def start_update(self):
+        """
+        An infrastructure car isn't updated, so pass
+        """
+        pass
+
+    def finish_update(self):
+        """
+        An infrastructure car isn't updated, so pass
+        """
+        pass
+
     def add_new_car(self, new_car_message):
         """
         Overwrites add_new_car of Car class to execute supervisor level without
@@ -1570,6 +1697,8 @@ class SecondAtChargeCar(SupervisorCar):
     SecondAtChargeCar in charge of supplying SupervisorCar chores while
     assigning a new one.
     """
+    __slots__ = ()
+    role = "second_at_charge"
 
     def supervisor_level(self, new_car, attack=False):
         """
@@ -1594,14 +1723,14 @@ class SecondAtChargeCar(SupervisorCar):
             following_car_message.get_following_car_name()
         ] = following_car_message
 
-    def update(self):
+    def finish_update(self):
         """
-        Update the car.Besides of moving it and generate the
+        Finish the update of the car. Besides of generating the
         InformationMessage, the SecondAtCharge will check if the
         supervisor is still active and, if it isn't, will create a
         NewSupervisorMessage for the new supervisor.
         """
-        super(SecondAtChargeCar, self).update()
+        super(SecondAtChargeCar, self).finish_update()
         new_cars_at_intersection = self.get_new_cars_at_intersection()
         if self.get_supervisor_left_intersection():
             for car_name in new_cars_at_intersection:
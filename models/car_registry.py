@@ -0,0 +1,304 @@
+from bisect import bisect_left, insort
+from heapq import heappop, heappush
+from models.message import Message, InfoMessage
+from models.virtual_caravan import crossing_paths
+
+
+class CarRegistry(dict):
+    """
+    Dictionary of the cars at the intersection known by a car, with the name
+    of the car as key. Besides the dictionary, the registry keeps the cars
+    ordered as the supervisory level checks them, by (caravan depth, name) and
+    by name, for all the cars and for the cars of every path (lane and
+    intention). The orders are updated when a car is added or deleted and when
+    the caravan depth of a car of the registry changes, so a coordination
+    doesn't sort the cars.
+    A car can be in many registries. It informs all of them when it starts or
+    stops following a car (see Car.update_registries).
+    The registry also knows the followers of every car, and which cars may have
+    an outdated following car message: the ones whose leader changed its
+    caravan depth since the message was set. When a car leaves the
+    intersection, only the followers and the outdated cars are updated (see
+    refresh_following_car_messages).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CarRegistry, self).__init__()
+        self.depths = {}
+        self.depth_order = []
+        self.name_order = []
+        self.path_depth_order = {}
+        self.path_name_order = {}
+        self.depth_version = Message.depth_version
+        self.leader_names = {}
+        self.follower_names = {}
+        self.outdated_names = set()
+        self.refresh_position = None
+        self.refresh_queue = []
+        self.queued_names = set()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, name, car):
+        if name in self:
+            del self[name]
+        super(CarRegistry, self).__setitem__(name, car)
+        car.registries.append(self)
+        path = self.get_path(car)
+        insort(self.name_order, name)
+        insort(self.path_name_order.setdefault(path, []), name)
+        self.insert_key(name, car.get_caravan_depth(), path)
+        self.link(name, car.get_following_car_name())
+        self.mark_outdated(name)
+        self.mark_followers_outdated(name)
+
+    def __delitem__(self, name):
+        car = self[name]
+        super(CarRegistry, self).__delitem__(name)
+        car.registries.remove(self)
+        path = self.get_path(car)
+        self.remove_from(self.name_order, name)
+        self.remove_from(self.path_name_order[path], name)
+        self.remove_key(name, path)
+        self.unlink(name)
+        self.outdated_names.discard(name)
+
+    def __reduce__(self):
+        # the cars and the orders are restored as they are, without adding
+        # the cars again, as the cars may not be restored yet when their
+        # registries are
+        return self.__class__, (), (dict(self), self.__dict__)
+
+    def __setstate__(self, state):
+        cars, attributes = state
+        super(CarRegistry, self).update(cars)
+        self.__dict__.update(attributes)
+
+    @staticmethod
+    def get_path(car):
+        """
+        Returns the path of a car.
+        :param car: <Car>
+        :return: (<int>, <string>) lane and intention of the car.
+        """
+        return car.get_lane() % 4, car.get_intention()
+
+    @staticmethod
+    def remove_from(order, value):
+        """
+        Removes a value from a sorted list.
+        :param order: <list> sorted list.
+        :param value: value of the list.
+        """
+        del order[bisect_left(order, value)]
+
+    def insert_key(self, name, depth, path):
+        """
+        Adds a car to the orders by caravan depth.
+        :param name: <int> name of the car.
+        :param depth: <int> caravan depth of the car.
+        :param path: (<int>, <string>) path of the car.
+        """
+        self.depths[name] = depth
+        insort(self.depth_order, (depth, name))
+        insort(self.path_depth_order.setdefault(path, []), (depth, name))
+
+    def remove_key(self, name, path):
+        """
+        Removes a car from the orders by caravan depth.
+        :param name: <int> name of the car.
+        :param path: (<int>, <string>) path of the car.
+        """
+        key = (self.depths.pop(name), name)
+        self.remove_from(self.depth_order, key)
+        self.remove_from(self.path_depth_order[path], key)
+
+    def link(self, name, leader_name):
+        """
+        Registers the car a car of the registry follows.
+        :param name: <int> name of the follower.
+        :param leader_name: <int> name of the car it follows.
+        """
+        self.leader_names[name] = leader_name
+        self.follower_names.setdefault(leader_name, set()).add(name)
+
+    def unlink(self, name):
+        """
+        Forgets the car a car of the registry follows.
+        :param name: <int> name of the follower.
+        """
+        leader_name = self.leader_names.pop(name)
+        follower_names = self.follower_names[leader_name]
+        follower_names.remove(name)
+        if not follower_names:
+            del self.follower_names[leader_name]
+
+    def get_follower_names(self, leader_name):
+        """
+        Returns the names of the cars of the registry whose following car
+        message is from a car.
+        :param leader_name: <int> name of the followed car.
+        :return: <list of ints>
+        """
+        return list(self.follower_names.get(leader_name, ()))
+
+    def mark_outdated(self, name):
+        """
+        Marks the following car message of a car as outdated. During a refresh,
+        the cars after the actual one are refreshed in the same refresh.
+        :param name: <int> name of the car.
+        """
+        if self.refresh_position is not None and name > self.refresh_position:
+            if name not in self.queued_names:
+                self.queued_names.add(name)
+                heappush(self.refresh_queue, name)
+        else:
+            self.outdated_names.add(name)
+
+    def mark_followers_outdated(self, leader_name):
+        """
+        Marks the following car messages of the followers of a car as
+        outdated.
+        :param leader_name: <int> name of the followed car.
+        """
+        for name in self.follower_names.get(leader_name, ()):
+            self.mark_outdated(name)
+
+    def update_depth(self, car):
+        """
+        Moves a car of the registry to the position of its actual caravan
+        depth. As the car may have a new following car message, its message
+        is marked as outdated, and so are the messages of its followers if the
+        depth changed.
+        :param car: <Car> car of the registry.
+        """
+        name = car.get_name()
+        depth = car.get_caravan_depth()
+        leader_name = car.get_following_car_name()
+        if self.leader_names[name] != leader_name:
+            self.unlink(name)
+            self.link(name, leader_name)
+        self.mark_outdated(name)
+        if self.depths[name] != depth:
+            path = self.get_path(car)
+            self.remove_key(name, path)
+            self.insert_key(name, depth, path)
+            self.mark_followers_outdated(name)
+
+    def refresh_following_car_messages(self, left_car=None):
+        """
+        Sets the following car message of the outdated cars to an InfoMessage
+        of their leader, if the leader is at the registry, so their caravan
+        depth is the depth of their leader plus 1. The cars are refreshed from
+        the oldest to the newest; a car outdated by the refresh of a newer car
+        is refreshed the next time.
+        The result is the same as refreshing every car of the registry, as the
+        message of a car that isn't outdated has the depth of its leader.
+        :param left_car: <Car> car that has just been deleted from the
+            registry, refreshed in its turn as if it were still in it.
+        """
+        self.check_depths()
+        queue = sorted(self.outdated_names)
+        if left_car is not None:
+            insort(queue, left_car.get_name())
+        self.refresh_queue = queue
+        self.queued_names = set(queue)
+        self.outdated_names = set()
+        while queue:
+            name = heappop(queue)
+            self.queued_names.remove(name)
+            self.refresh_position = name
+            car = self[name] if name in self else left_car
+            leader_name = car.get_following_car_name()
+            if leader_name in self:
+                car.set_following_car_message(InfoMessage(self[leader_name]))
+            self.outdated_names.discard(name)
+        self.refresh_position = None
+
+    def check_depths(self):
+        """
+        Reorders all the cars if the depth of a message has been changed with
+        Message.set_depth, as that changes the depth of every car following
+        the car of the message.
+        """
+        if self.depth_version != Message.depth_version:
+            self.depth_version = Message.depth_version
+            for car in self.values():
+                self.update_depth(car)
+
+    def get_state(self):
+        """
+        Returns the state of the registry the supervisory level depends on:
+        the name, caravan depth and path of every car. Two registries with the
+        same state coordinate a new car in the same way.
+        :return: <tuple> ((depth, name), path) for every car, ordered by depth
+            and name.
+        """
+        self.check_depths()
+        return tuple(
+            (key, self.get_path(self[key[1]])) for key in self.depth_order
+        )
+
+    def update(self, *args, **kwargs):
+        for name, car in dict(*args, **kwargs).items():
+            self[name] = car
+
+    def pop(self, name, *default):
+        if name not in self:
+            return super(CarRegistry, self).pop(name, *default)
+        car = self[name]
+        del self[name]
+        return car
+
+    def clear(self):
+        for name in self.keys():
+            del self[name]
+
+    def get_cars_by_name(self):
+        """
+        Returns the cars ordered by name, from the oldest to the newest.
+        :return: <list of Cars>
+        """
+        return [self[name] for name in self.name_order]
+
+    def get_sorted_cars(self, by_depth):
+        """
+        Returns the cars ordered as the supervisory level checks them: from the
+        deepest car of the caravan to the shallowest one if by_depth is True,
+        and from the newest car to the oldest one for cars with the same
+        depth.
+        :param by_depth: <boolean> order first by caravan depth.
+        :return: <list of Cars>
+        """
+        if by_depth:
+            self.check_depths()
+            return [self[name] for _, name in reversed(self.depth_order)]
+        return [self[name] for name in reversed(self.name_order)]
+
+    def get_car_to_follow(self, new_car, by_depth):
+        """
+        Finds the car a new car must follow: the first car of
+        get_sorted_cars that is older than the new car and whose path crosses
+        its path. Only the first older car of every crossing path is looked
+        for.
+        :param new_car: <Car> new car at the intersection.
+        :param by_depth: <boolean> order first by caravan depth.
+        :return: <Car> car to follow, or None if there isn't one.
+        """
+        name = new_car.get_name()
+        best_key = None
+        if by_depth:
+            self.check_depths()
+        for path in crossing_paths[self.get_path(new_car)]:
+            if by_depth:
+                for key in reversed(self.path_depth_order.get(path, ())):
+                    if key[1] < name:
+                        best_key = max(best_key, key)
+                        break
+            else:
+                names = self.path_name_order.get(path, ())
+                index = bisect_left(names, name)
+                if index:
+                    best_key = max(best_key, names[index - 1])
+        if best_key is None:
+            return None
+        return self[best_key[1] if by_depth else best_key]
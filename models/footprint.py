@@ -0,0 +1,122 @@
+import os
+import struct
+from math import sin, cos, fabs
+from pygame import Rect
+
+images_directory = os.path.dirname(os.path.abspath(__file__)) + "/../images/"
+
+
+def read_image_size(image_path):
+    """
+    Reads the size of a png image from its header, without decoding it.
+    :param image_path: absolute path to the png image.
+    :return: (<int>, <int>) width and height of the image.
+    """
+    with open(image_path, "rb") as image_file:
+        header = image_file.read(24)
+    return struct.unpack(">II", header[16:24])
+
+
+car_image_size = read_image_size(images_directory + "car.png")
+
+
+def rotated_size(width, height, angle):
+    """
+    Size of the bounding box of a width x height rectangle rotated by angle
+    degrees. Gives the same result as the size of the surface returned by
+    pygame.transform.rotate.
+    :param width: <int> width of the rectangle.
+    :param height: <int> height of the rectangle.
+    :param angle: <float> rotation in degrees.
+    :return: (<int>, <int>) width and height of the bounding box.
+    """
+    if not angle % 90:
+        if int(angle / 90) % 2 == 0:
+            return width, height
+        return height, width
+    radians = angle * .01745329251994329
+    cos_width = cos(radians) * width
+    cos_height = cos(radians) * height
+    sin_width = sin(radians) * width
+    sin_height = sin(radians) * height
+    return (
+        int(max(fabs(cos_width + sin_height), fabs(cos_width - sin_height))),
+        int(max(fabs(sin_width + cos_height), fabs(sin_width - cos_height)))
+    )
+
+
+class Footprint(object):
+    """
+    Analytic representation of the space a car takes at the intersection: its
+    center, heading and the length and width of the car. The screen rectangle
+    used for collision and exit checks is computed from it, so no surface has
+    to be rotated or scaled unless the car is going to be drawn.
+    """
+
+    def __init__(self, center_x, center_y, heading, scale_rate,
+                 image_size=car_image_size):
+        """
+        :param center_x: x position of the center of the car.
+        :param center_y: y position of the center of the car.
+        :param heading: direction of the car. Represented in degrees.
+        :param scale_rate: rate at which the car image is scaled.
+        :param image_size: (<int>, <int>) size of the unscaled car image.
+        """
+        self.center_x = center_x
+        self.center_y = center_y
+        self.heading = heading
+        self.scale_rate = scale_rate
+        self.image_width, self.image_height = image_size
+        self.bounding_heading = None
+        self.bounding_size = None
+
+    def move(self, center_x, center_y, heading):
+        """
+        Moves the footprint to a new position and heading.
+        :param center_x: new x position of the center of the car.
+        :param center_y: new y position of the center of the car.
+        :param heading: new direction of the car in degrees.
+        """
+        self.center_x = center_x
+        self.center_y = center_y
+        self.heading = heading
+
+    def get_length(self):
+        """
+        Length of the car, measured along its heading.
+        :return: <float>
+        """
+        return self.image_height * self.scale_rate
+
+    def get_width(self):
+        """
+        Width of the car, measured across its heading.
+        :return: <float>
+        """
+        return self.image_width * self.scale_rate
+
+    def get_bounding_size(self):
+        """
+        Size of the axis aligned box that contains the car, the same as the
+        size of the rotated and scaled car image. The size is only recomputed
+        when the heading changes.
+        :return: (<int>, <int>) width and height.
+        """
+        if self.heading != self.bounding_heading:
+            width, height = rotated_size(
+                self.image_width, self.image_height, self.heading
+            )
+            self.bounding_size = (
+                int(width * self.scale_rate), int(height * self.scale_rate)
+            )
+            self.bounding_heading = self.heading
+        return self.bounding_size
+
+    def get_rect(self):
+        """
+        Returns the axis aligned rectangle of the car at the screen.
+        :return: <pygame.Rect>
+        """
+        rect = Rect((0, 0), self.get_bounding_size())
+        rect.center = (self.center_x, self.center_y)
+        return rect
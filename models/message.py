@@ -1,4 +1,5 @@
-from math import pi, cos, sin, atan
+from math import pi, cos, sin
+from models import virtual_caravan
 
 
 class Message(object):
@@ -8,6 +9,13 @@ class Message(object):
     The message can give the distance to the center of the car from it was
     created (based on the information given).
     """
+    __slots__ = (
+        "actual_coordinates", "origin_coordinates", "acceleration", "speed",
+        "name", "lane", "creation_time", "new", "intention", "caravan_depth",
+        "supervisor", "receiver", "follower", "follow", "value"
+    )
+    # changes every time the depth of a message is set, see CarRegistry
+    depth_version = 0
     value_dict = {
         "SupervisorLeftIntersectionMessage": 5,
         "LeftIntersectionMessage": 2,
@@ -69,79 +77,9 @@ class Message(object):
         Gets the virtual position of the car.
         :return: <int> virtual position of the car
         """
-        conflict_zone_radio = 384.0
-        path_width = 172.0
-        right_turn_radio = path_width / 4.0
-        left_turn_radio = 3 * path_width / 4.0
-        initial_straight_section = conflict_zone_radio - path_width / 2.0
-        if self.get_intention() == "s":
-            virtual_distance_value = self.get_virtual_x_position()
-        elif self.get_intention() == "r":
-            # Calculate real virtual distance
-            if self.get_virtual_x_position() <= initial_straight_section:
-                virtual_distance_value = self.get_virtual_x_position()
-            elif self.get_virtual_y_position() > -right_turn_radio:
-                virtual_distance_value = (
-                    initial_straight_section + atan(
-                        (
-                            self.get_virtual_x_position() -
-                            initial_straight_section
-                        ) / (right_turn_radio + self.get_virtual_y_position())
-                    ) * right_turn_radio
-                )
-            else:
-                virtual_distance_value = (
-                    initial_straight_section + pi * right_turn_radio / 2.0 -
-                    self.get_virtual_y_position() - right_turn_radio
-                )
-
-            a = path_width / 2.0
-            b = right_turn_radio + path_width / 4.0
-            c = pi * right_turn_radio / 2.0
-            # Scale virtual distance
-            if virtual_distance_value <= initial_straight_section + c:
-                virtual_distance_value *= (
-                    (initial_straight_section + a + b) /
-                    (initial_straight_section + c)
-                )
-            else:
-                virtual_distance_value += a + b - c
-
-        else:
-            # Calculate real virtual distance
-            if self.get_virtual_x_position() <= initial_straight_section:
-                virtual_distance_value = self.get_virtual_x_position()
-            elif self.get_virtual_y_position() < left_turn_radio:
-                virtual_distance_value = (
-                    initial_straight_section + atan(
-                        (
-                            self.get_virtual_x_position() -
-                            initial_straight_section
-                        ) / (
-                            left_turn_radio -
-                            self.get_virtual_y_position()
-                            )
-                        ) * left_turn_radio
-                    )
-            else:
-                virtual_distance_value = (
-                    initial_straight_section + pi * left_turn_radio / 2 +
-                    self.get_virtual_y_position() - left_turn_radio
-                )
-
-            a = path_width / 2
-            b = right_turn_radio + path_width / 4
-            c = pi * left_turn_radio / 2
-            # Scale virtual distance
-            if virtual_distance_value <= initial_straight_section + c:
-                virtual_distance_value *= (
-                    (initial_straight_section + a + b) /
-                    (initial_straight_section + c)
-                )
-            else:
-                virtual_distance_value += a + b - c
-
-        return virtual_distance_value
+        return virtual_caravan.virtual_distance(
+            *self.get_virtual_position() + (self.get_intention(),)
+        )
 
     def is_new(self):
         """
@@ -200,6 +138,22 @@ class Message(object):
         """
         return self.follow
 
+    def get_actual_coordinates(self):
+        """
+        Return the tuple containing the actual coordinates of the car who
+        created this message.
+        :return: (<int>, <int>, <int>, <int>) actual coordinates of a car.
+        """
+        return self.actual_coordinates
+
+    def get_origin_coordinates(self):
+        """
+        Return the tuple containing the origin coordinates of the car who
+        created this message.
+        :return: (<int>, <int>, <int>, <int>) origin coordinates of a car.
+        """
+        return self.origin_coordinates
+
     def get_origin_x_position(self):
         """
         Get the origin x position of the car who created this message
@@ -249,36 +203,31 @@ class Message(object):
         """
         return self.intention
 
+    def get_virtual_position(self):
+        """
+        Returns the position of the car at the virtual caravan environment.
+        :return: (<float>, <float>) x and y position at the virtual environment
+        """
+        origin_direction = self.get_origin_direction() * pi / 180
+        return virtual_caravan.virtual_position(
+            self.get_x_position(), self.get_y_position(),
+            self.get_origin_x_position(), self.get_origin_y_position(),
+            sin(origin_direction), cos(origin_direction)
+        )
+
     def get_virtual_x_position(self):
         """
         Returns the x position of the virtual caravan environment.
         :return: <float> x position at the virtual environment
         """
-        x_real = (
-            (self.get_x_position() - self.get_origin_x_position()) *
-            sin(self.get_origin_direction() * pi / 180)
-        )
-        y_real = (
-            (self.get_y_position() - self.get_origin_y_position()) *
-            cos(self.get_origin_direction() * pi / 180)
-        )
-        return abs(x_real + y_real)
+        return self.get_virtual_position()[0]
 
     def get_virtual_y_position(self):
         """
-        Returns the x position of the virtual caravan environment.
-        :return: <float> x position at the virtual environment
+        Returns the y position of the virtual caravan environment.
+        :return: <float> y position at the virtual environment
         """
-        x_real = (
-            - 1 * (self.get_x_position() - self.get_origin_x_position()) * cos(
-                self.get_origin_direction() * pi / 180
-            )
-        )
-        y_real = (
-            (self.get_y_position() - self.get_origin_y_position()) *
-            sin(self.get_origin_direction() * pi / 180)
-        )
-        return x_real + y_real
+        return self.get_virtual_position()[1]
 
     def get_origin_direction(self):
         """
@@ -301,6 +250,7 @@ class Message(object):
         :param new_depth: new depth of the car at the caravan.
         """
         self.caravan_depth = new_depth
+        Message.depth_version += 1
 
     def get_lane(self):
         """
@@ -318,25 +268,10 @@ class Message(object):
         :param other_car_lane: the lane at which the other car star its way.
         :return: True if the paths does not crosses, False otherwise.
         """
-        self_lane = self.get_lane()
-        self_intention = self.get_intention()
-        lane_to_int_dict = {"l": 0, "s": 1, "r": 2}
-        table0 = [[True, True, True], [True, True, True], [True, True, True]]
-        table1 = [
-            [True, True, False], [True, True, False], [False, True, False]
-        ]
-        table2 = [
-            [True, True, True], [True, False, False], [True, False, False]
-        ]
-        table3 = [
-            [True, True, False], [True, True, True], [False, False, False]
-        ]
-        all_tables = [table0, table1, table2, table3]
-        return all_tables[
-            (self_lane - other_car_lane) % 4
-        ][lane_to_int_dict[self_intention]][
-            lane_to_int_dict[other_car_intention]
-        ]
+        return virtual_caravan.cross_path(
+            self.get_lane(), self.get_intention(), other_car_lane,
+            other_car_intention
+        )
 
     def get_value(self):
         """
@@ -359,18 +294,14 @@ class Message(object):
         """
         pass
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
-        Transmit the message to all the cars that should receive this message
-        :param car_dict: list of cars as a dictionary with the name of the car
-        as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        Transmit the message to all the cars that should receive this message:
+        the cars following the car that created it.
+        :param message_bus: <MessageBus> bus that delivers the message.
         :return: None
         """
-        for car_name in transmitter_to_receiver_dict[self.get_name()]:
-            self.process(car_dict[car_name])
+        message_bus.send(self, followers=True)
 
 
 class InfoMessage(Message):
@@ -378,6 +309,8 @@ class InfoMessage(Message):
     Message used to update the info of the car that is being followed by
     another car.
     """
+    __slots__ = ()
+
     def process(self, car):
         """
         Process the message. Sets the old message to be this new one, so the
@@ -393,12 +326,25 @@ class InfoMessage(Message):
             if self.get_name() in car.update_cars_at_intersection_counter:
                 car.update_cars_at_intersection_counter[self.get_name()] = 4
 
+    def transmit(self, message_bus):
+        """
+        Overrides transmit of generic message. The message is received by the
+        followers of the car that created it and by the supervisors, which
+        keep track of the cars that are still alive. Messages of a supervisor
+        are also received by the second at charge.
+        :param message_bus: <MessageBus> bus that delivers the message.
+        """
+        message_bus.send(self, followers=True, supervisors=True,
+                         second_at_charge=self.supervisor)
+
 
 class NewCarMessage(Message):
     """
     Message used to inform all the other cars that a new car has arrived at
     the intersection.
     """
+    __slots__ = ()
+
     def __init__(self, car):
         """
         Initializer for this message. The only new information needed is the
@@ -418,18 +364,13 @@ class NewCarMessage(Message):
         super(self.__class__, self).process(car)
         car.add_new_car(self)
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
         Overrides transmit of generic message. For this message class, all cars
         must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        for car in car_dict.values():
-            self.process(car)
+        message_bus.broadcast(self)
 
 
 class LeftIntersectionMessage(Message):
@@ -437,6 +378,8 @@ class LeftIntersectionMessage(Message):
     Message used to inform all the other cars that a car has left the
     intersection.
     """
+    __slots__ = ()
+
     def process(self, car):
         """
         Process the message. Deletes the car that created this message from the
@@ -446,24 +389,20 @@ class LeftIntersectionMessage(Message):
         super(LeftIntersectionMessage, self).process(car)
         car.delete_car_at_intersection(self)
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
         Overrides transmit of generic message. For this message class, all cars
         must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        for car in car_dict.values():
-            self.process(car)
+        message_bus.broadcast(self)
 
 
 class SupervisorLeftIntersectionMessage(LeftIntersectionMessage):
     """
     Message created by a car that was supervisor and has left the intersection.
     """
+    __slots__ = ()
 
     def process(self, car):
         """
@@ -478,24 +417,21 @@ class SupervisorLeftIntersectionMessage(LeftIntersectionMessage):
         elif self.get_name() in car.get_liar_supervisor_names():
             car.get_liar_supervisor_names().remove(self.get_name())
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
         Overrides transmit of generic message. For this message class, all cars
         must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        for car in car_dict.values():
-            self.process(car)
+        message_bus.broadcast(self)
 
 
 class FollowingCarMessage(Message):
     """
     Message used to inform a specific car which car it must follow.
     """
+    __slots__ = ("following_car_name", "coordinator_name")
+
     def __init__(self, car, following_car_name, coordinator_name):
         """
         Initializer for this message. The only new information needed is the
@@ -524,18 +460,13 @@ class FollowingCarMessage(Message):
         """
         return self.following_car_name
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
         Overrides transmit of generic message. For this message class, all cars
         must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        for car in car_dict.values():
-            self.process(car)
+        message_bus.broadcast(self)
 
     def get_coordinator_name(self):
         """
@@ -547,6 +478,11 @@ class FollowingCarMessage(Message):
 
 
 class SecondAtChargeMessage(Message):
+    __slots__ = (
+        "second_at_charge_name", "cars_at_intersection",
+        "transmitter_receiver_dict", "faulty_cars_names"
+    )
+
     def __init__(self, car, second_at_charge_name):
         """
         Initializer for SecondAtChargeMessage. The info needes for the second
@@ -596,23 +532,26 @@ class SecondAtChargeMessage(Message):
         """
         return self.transmitter_receiver_dict
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
-        Overrides transmit of generic message. For this message class, all
-        cars must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        Overrides transmit of generic message. The message is received by the
+        new second at charge and by the old one, which stops being second at
+        charge.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        self.process(car_dict[self.get_second_at_charge_name()])
+        message_bus.send(self, names=[self.get_second_at_charge_name()],
+                         second_at_charge=True)
 
 
 class NewSupervisorMessage(Message):
     """
     Message class to inform a car that it's the new supervisor.
     """
+    __slots__ = (
+        "cars_at_intersection", "new_supervisor_name",
+        "transmitter_receiver_dict", "faulty_cars_names"
+    )
+
     def __init__(self, car):
         """
         Gets the information to send this message to the new supervisor car.
@@ -657,18 +596,13 @@ class NewSupervisorMessage(Message):
         """
         return self.transmitter_receiver_dict
 
-    def transmit(self, car_dict, transmitter_to_receiver_dict):
+    def transmit(self, message_bus):
         """
-        Overrides transmit of generic message. For this message class, all cars
-        must receive the message.
-        :param car_dict: list of cars as a dictionary with the name of the car
-            as the key and the car as the value.
-        :param transmitter_to_receiver_dict: dictionary with the name of the
-            transmitter as key and a list with the names of the receivers as
-            value.
+        Overrides transmit of generic message. Only the new supervisor must
+        receive the message.
+        :param message_bus: <MessageBus> bus that delivers the message.
         """
-        self.process(car_dict[self.get_new_supervisor_name()])
-        self.process(car_dict[self.get_name()])
+        message_bus.send(self, names=[self.get_new_supervisor_name()])
 
 
 class FaultyCoordinationMessage(Message):
@@ -678,6 +612,12 @@ class FaultyCoordinationMessage(Message):
     process of adding and coordinating cars as if there where no cars at the
     intersection.
     """
+    __slots__ = (
+        "coordinator_name", "second_at_charge_name", "cars_at_intersection",
+        "coordinated_car_name", "following_car_name", "supervisor_message",
+        "second_at_charge_message", "replays"
+    )
+
     def __init__(self, car, supervisor_message, second_at_charge_message):
         """
         The information required for the other cars to do the process of
@@ -692,6 +632,9 @@ class FaultyCoordinationMessage(Message):
         self.following_car_name = car.get_faulty_following_car_name()
         self.supervisor_message = supervisor_message
         self.second_at_charge_message = second_at_charge_message
+        # results of the replays of the coordination, shared by the cars that
+        # receive the message in the same tick (see Car.check_coordination)
+        self.replays = {}
 
     def process(self, car):
         """
@@ -700,6 +643,14 @@ class FaultyCoordinationMessage(Message):
         """
         car.check_coordination(self)
 
+    def transmit(self, message_bus):
+        """
+        Overrides transmit of generic message. For this message class, all cars
+        must receive the message.
+        :param message_bus: <MessageBus> bus that delivers the message.
+        """
+        message_bus.broadcast(self)
+
     def get_coordinator_name(self):
         """
         Gets the name of the car that did the coordination.
@@ -755,6 +706,16 @@ class FaultyCoordinationMessage(Message):
         """
         return self.second_at_charge_message
 
+    def get_replays(self):
+        """
+        Returns the results of the replays of the coordination done by the
+        cars that received the message.
+        :return: <dict> name of the corrected following car (-1 if there isn't
+            one) and log messages of the replay, by replay key (see
+            Car.get_replay_key).
+        """
+        return self.replays
+
 
 class CorrectedCoordinationMessage(Message):
     """
@@ -763,6 +724,10 @@ class CorrectedCoordinationMessage(Message):
     name of the (possible faulty) coordinator and second at charge, the name of
     the "bad" coordinated car and the "correct" result.
     """
+    __slots__ = (
+        "coordinator_name", "second_at_charge_name", "coordinated_car_name",
+        "following_car_name"
+    )
 
     def __init__(self, car):
         """
@@ -783,6 +748,14 @@ class CorrectedCoordinationMessage(Message):
         """
         car.check_faulty_coordination(self)
 
+    def transmit(self, message_bus):
+        """
+        Overrides transmit of generic message. For this message class, all cars
+        must receive the message.
+        :param message_bus: <MessageBus> bus that delivers the message.
+        """
+        message_bus.broadcast(self)
+
     def get_coordinator_name(self):
         """
         Gets the name of the car that did the coordination.
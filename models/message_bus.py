@@ -0,0 +1,128 @@
+class MessageBus(object):
+    """
+    Delivers the messages of a tick only to the cars they affect. Every
+    message is routed by its transmit method: it can be broadcast to all the
+    cars, or sent to the cars with a given name, to the followers of the car
+    that created it, to the supervisors and to the second at charge.
+    Cars keep processing their messages in the order of the message list, so
+    the result is the same as making every car process every message.
+    Consecutive messages routed only to followers and roles (InfoMessages) are
+    indexed by the name of the car that created them, so a car finds its
+    messages without going over all of them. Those messages must not change
+    the following car or the role of the cars that process them.
+    """
+
+    def __init__(self, messages=()):
+        """
+        :param messages: <list of Messages> messages of the tick, ordered by
+            priority.
+        """
+        self.segments = []
+        for message in messages:
+            message.transmit(self)
+
+    def broadcast(self, message):
+        """
+        Sends a message to all the cars.
+        :param message: <Message>
+        """
+        self.segments.append(BroadcastSegment(message))
+
+    def send(self, message, names=(), followers=False, supervisors=False,
+             second_at_charge=False):
+        """
+        Sends a message to some of the cars. The receivers are decided when
+        every car gets its messages, with the state the car has at that moment.
+        :param message: <Message>
+        :param names: <list of ints> names of the receivers.
+        :param followers: <boolean> send to the cars following the car that
+            created the message.
+        :param supervisors: <boolean> send to the supervisor cars.
+        :param second_at_charge: <boolean> send to the second at charge cars.
+        """
+        if names:
+            self.segments.append(AddressedSegment(
+                message, names, followers, supervisors, second_at_charge
+            ))
+            return
+        if not self.segments or not isinstance(self.segments[-1],
+                                               RoutedSegment):
+            self.segments.append(RoutedSegment())
+        self.segments[-1].add(message, followers, supervisors,
+                              second_at_charge)
+
+    def deliver(self, car):
+        """
+        Makes a car process all the messages sent to it, in order.
+        :param car: <Car> receiver car.
+        """
+        for segment in self.segments:
+            segment.deliver(car)
+
+
+class BroadcastSegment(object):
+    """
+    Message that every car must process.
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+    def deliver(self, car):
+        self.message.process(car)
+
+
+class AddressedSegment(object):
+    """
+    Message sent to some cars by name, and possibly to the cars with a role.
+    """
+
+    def __init__(self, message, names, followers, supervisors,
+                 second_at_charge):
+        self.message = message
+        self.names = set(names)
+        self.followers = followers
+        self.supervisors = supervisors
+        self.second_at_charge = second_at_charge
+
+    def deliver(self, car):
+        if (car.get_name() in self.names or
+                self.followers and car.get_following_car_name() ==
+                self.message.get_name() or
+                self.supervisors and car.is_supervisor or
+                self.second_at_charge and car.is_second_at_charge):
+            self.message.process(car)
+
+
+class RoutedSegment(object):
+    """
+    Consecutive messages sent to the followers of their creators and to the
+    cars with a role, indexed so every car only goes over its own messages.
+    """
+
+    def __init__(self):
+        self.followers = {}
+        self.supervisors = []
+        self.second_at_charge = []
+        self.size = 0
+
+    def add(self, message, followers, supervisors, second_at_charge):
+        entry = (self.size, message)
+        self.size += 1
+        if followers:
+            self.followers.setdefault(message.get_name(), []).append(entry)
+        if supervisors:
+            self.supervisors.append(entry)
+        if second_at_charge:
+            self.second_at_charge.append(entry)
+
+    def deliver(self, car):
+        entries = self.followers.get(car.get_following_car_name(), [])
+        if car.is_supervisor:
+            entries = entries + self.supervisors
+        if car.is_second_at_charge:
+            entries = entries + self.second_at_charge
+        if len(entries) > 1:
+            entries = sorted(set(entries))
+        for position, message in entries:
+            message.process(car)
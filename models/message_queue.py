@@ -0,0 +1,59 @@
+from models.message import Message
+
+
+class MessageQueue(object):
+    """
+    Queue of the messages created during a tick. It has one FIFO bucket for
+    every priority of Message.value_dict, so messages are added in constant
+    time and taken out in priority order without sorting them. Messages with
+    the same priority keep the order in which they were added, as with a
+    stable sort.
+    """
+    max_priority = max(Message.value_dict.values())
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(self.max_priority + 1)]
+
+    def __len__(self):
+        """
+        Number of messages in the queue.
+        :return: <int>
+        """
+        return sum(len(bucket) for bucket in self.buckets)
+
+    def append(self, message):
+        """
+        Adds a message to the bucket of its priority.
+        :param message: <Message>
+        """
+        self.buckets[message.get_value()].append(message)
+
+    def extend(self, messages):
+        """
+        Adds a list of messages, in order.
+        :param messages: <list of Messages>
+        """
+        for message in messages:
+            self.buckets[message.get_value()].append(message)
+
+    def get_counts(self):
+        """
+        Returns the number of messages of every priority, for instrumentation.
+        :return: <dict> priority as key and number of messages as value.
+        """
+        return dict(
+            (priority, len(bucket))
+            for priority, bucket in enumerate(self.buckets)
+        )
+
+    def drain(self):
+        """
+        Takes all the messages out of the queue, from the highest priority to
+        the lowest one. The queue is left empty.
+        :return: <list of Messages>
+        """
+        messages = []
+        for bucket in reversed(self.buckets):
+            messages.extend(bucket)
+            del bucket[:]
+        return messages
@@ -0,0 +1,127 @@
+class RoleRegistry(object):
+    """
+    Role of every car of the simulation: "car", "supervisor" or
+    "second_at_charge" as given by the class of the car, or "attacker" for a
+    car flagged as an attacking or lying supervisor. Replaces the scans of all
+    the cars looking for the supervisor.
+    Cars added to the registry inform it when they change their class
+    (see Car.update_role), and the simulation does it when it flags a car as
+    an attacker. Every change of role is sent to the listeners of the
+    registry.
+    """
+    roles_names = ("car", "supervisor", "second_at_charge", "attacker")
+
+    def __init__(self):
+        self.roles = {}
+        self.cars_by_role = {role: {} for role in self.roles_names}
+        self.listeners = []
+
+    def __len__(self):
+        """
+        Number of cars in the registry.
+        :return: <int>
+        """
+        return len(self.roles)
+
+    @staticmethod
+    def get_role(car):
+        """
+        Returns the actual role of a car.
+        :param car: <Car>
+        :return: <string> "attacker" if the car attacks or lies, the role of
+            its class otherwise.
+        """
+        if car.attack_supervisor or car.supervisor_lies:
+            return "attacker"
+        return car.role
+
+    def add_listener(self, listener):
+        """
+        Adds a function to be called at every change of role.
+        :param listener: <function> called with the car, its old role and its
+            new role. The old role is None for a new car and the new role is
+            None for a removed car.
+        """
+        self.listeners.append(listener)
+
+    def set_role(self, car, role):
+        """
+        Moves a car to a role and informs the listeners.
+        :param car: <Car>
+        :param role: <string> new role, or None to remove the car.
+        """
+        name = car.get_name()
+        old_role = self.roles.pop(name, None)
+        if old_role == role:
+            if role is not None:
+                self.roles[name] = role
+            return
+        if old_role is not None:
+            del self.cars_by_role[old_role][name]
+        if role is not None:
+            self.roles[name] = role
+            self.cars_by_role[role][name] = car
+        for listener in self.listeners:
+            listener(car, old_role, role)
+
+    def add(self, car):
+        """
+        Adds a car to the registry. After this, the car informs the registry
+        when its role changes.
+        :param car: <Car> new car.
+        """
+        car.role_registry = self
+        self.set_role(car, self.get_role(car))
+
+    def remove(self, car):
+        """
+        Removes a car from the registry.
+        :param car: <Car> car that left the intersection.
+        """
+        self.set_role(car, None)
+        car.role_registry = None
+
+    def update(self, car):
+        """
+        Updates the role of a car of the registry.
+        :param car: <Car>
+        """
+        self.set_role(car, self.get_role(car))
+
+    def get_cars(self, role):
+        """
+        Returns the cars with a role, from the oldest to the newest.
+        :param role: <string>
+        :return: <list of Cars>
+        """
+        cars = self.cars_by_role[role]
+        return [cars[name] for name in sorted(cars)]
+
+    def get_supervisor(self):
+        """
+        Returns the supervisor of the intersection: the oldest car with the
+        supervisor role, as there is usually only one.
+        :return: <SupervisorCar> or None if there isn't a supervisor.
+        """
+        supervisors = self.cars_by_role["supervisor"]
+        if supervisors:
+            return supervisors[min(supervisors)]
+        return None
+
+    def get_second_at_charge(self):
+        """
+        Returns the second at charge of the intersection.
+        :return: <SecondAtChargeCar> or None if there isn't a second at
+            charge.
+        """
+        seconds_at_charge = self.cars_by_role["second_at_charge"]
+        if seconds_at_charge:
+            return seconds_at_charge[min(seconds_at_charge)]
+        return None
+
+    def get_attackers(self):
+        """
+        Returns the cars flagged as attacking or lying supervisors.
+        :return: <list of Cars>
+        """
+        return self.get_cars("attacker")
@@ -0,0 +1,86 @@
+from pygame import image, transform, display
+from models.footprint import images_directory, rotated_size
+
+
+class SpriteCache(object):
+    """
+    Process wide cache of a sprite. The image is loaded from disk only once
+    and every rotated and scaled version of it is stored in an atlas keyed by
+    the heading, quantized in steps of heading_step degrees, and the scale
+    rate. Drawing a car becomes a dictionary lookup.
+    """
+
+    def __init__(self, image_path, heading_step=1.0):
+        """
+        :param image_path: absolute path to the image of the sprite.
+        :param heading_step: <float> size in degrees of the quantization of
+            the headings.
+        """
+        self.image_path = image_path
+        self.heading_step = heading_step
+        self.image = None
+        self.atlas = {}
+
+    def get_image(self):
+        """
+        Returns the unrotated image of the sprite, loading it the first time.
+        :return: <pygame.Surface>
+        """
+        if self.image is None:
+            self.image = image.load(self.image_path)
+        return self.image
+
+    def quantize(self, heading):
+        """
+        Gets the index of the atlas entry closest to a heading.
+        :param heading: <float> heading in degrees.
+        :return: <int>
+        """
+        steps = int(round(360.0 / self.heading_step))
+        return int(round(heading / self.heading_step)) % steps
+
+    def get_rotated_image(self, heading, scale_rate):
+        """
+        Returns the sprite rotated to the quantized heading and scaled by the
+        scale rate. The sprite is rendered the first time it's requested.
+        :param heading: <float> heading in degrees.
+        :param scale_rate: <float> rate at which the image is scaled.
+        :return: <pygame.Surface>
+        """
+        key = (self.quantize(heading), scale_rate)
+        if key not in self.atlas:
+            self.atlas[key] = self.render(key[0] * self.heading_step,
+                                          scale_rate)
+        return self.atlas[key]
+
+    def render(self, heading, scale_rate):
+        """
+        Rotates and scales the image of the sprite. If a display is available,
+        the result is converted to its pixel format so it blits faster.
+        :param heading: <float> heading in degrees.
+        :param scale_rate: <float> rate at which the image is scaled.
+        :return: <pygame.Surface>
+        """
+        sprite = self.get_image()
+        width, height = rotated_size(
+            sprite.get_width(), sprite.get_height(), heading
+        )
+        rotated_image = transform.scale(
+            transform.rotate(sprite, heading),
+            (int(width * scale_rate), int(height * scale_rate))
+        )
+        if display.get_init() and display.get_surface() is not None:
+            rotated_image = rotated_image.convert_alpha()
+        return rotated_image
+
+    def pre_render(self, scale_rate):
+        """
+        Renders every heading of the atlas for a scale rate, so no rotation is
+        done while the simulation is being displayed.
+        :param scale_rate: <float> rate at which the image is scaled.
+        """
+        for index in range(int(round(360.0 / self.heading_step))):
+            self.get_rotated_image(index * self.heading_step, scale_rate)
+
+
+car_sprites = SpriteCache(images_directory + "car.png")
@@ -0,0 +1,185 @@
+from models.message import Message, InfoMessage
+
+
+def _field(index):
+    """
+    Property of an InfoView that reads and writes a column of its row.
+    :param index: <int> index of the column.
+    :return: <property>
+    """
+    def getter(view):
+        return view.row[index]
+
+    def setter(view, value):
+        view.row[index] = value
+    return property(getter, setter)
+
+
+class InfoView(InfoMessage):
+    """
+    InfoMessage that doesn't copy the state of its car: it reads it from a row
+    of a StateTable. It has the same getters as any Message, so followers,
+    controllers and the supervisors use it as an InfoMessage.
+    """
+    __slots__ = ("row",)
+    actual_coordinates = _field(0)
+    origin_coordinates = _field(1)
+    acceleration = _field(2)
+    speed = _field(3)
+    lane = _field(4)
+    creation_time = _field(5)
+    new = _field(6)
+    intention = _field(7)
+    caravan_depth = _field(8)
+    supervisor = _field(9)
+
+    def __init__(self, name, row):
+        """
+        :param name: <int> name of the car.
+        :param row: <list> row of the state table with the state of the car.
+        """
+        self.name = name
+        self.row = row
+        self.receiver = None
+        self.follower = None
+        self.follow = False
+        self.value = Message.value_dict["InfoMessage"]
+
+    def __getstate__(self):
+        """
+        State of the view for pickling. The fields of the state of the car are
+        properties reading the row, so they are kept in the row.
+        :return: <dict>
+        """
+        return {
+            name: getattr(self, name)
+            for name in ["row", "name", "receiver", "follower", "follow",
+                         "value"]
+            if hasattr(self, name)
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def freeze(self):
+        """
+        Keeps a copy of the row, so the view doesn't change when the row is
+        given to another car.
+        """
+        self.row = list(self.row)
+
+
+class StateTable(object):
+    """
+    Table with the state the cars publish every tick. Replaces the InfoMessage
+    each car created at every update: a car writes its state in its row and
+    sends a view of that row, which the followers keep as following car
+    message.
+    The table keeps the state of the last ticks in a ring of buffers, and every
+    car has one view per buffer. A view gives the state of the tick it was
+    sent at, as a new InfoMessage would, until its buffer is written again.
+    Three buffers are needed because the cars are updated one by one: when a
+    car publishes, its followers may still use the state it sent two ticks
+    before.
+    """
+    size = 10
+    buffers_number = 3
+
+    def __init__(self, capacity=64):
+        """
+        :param capacity: <int> initial number of rows. The table grows when
+            more cars are added.
+        """
+        self.capacity = 0
+        self.tick = 0
+        self.buffers = [[] for _ in range(self.buffers_number)]
+        self.views = [[] for _ in range(self.buffers_number)]
+        self.slots = {}
+        self.free_slots = []
+        self.grow(capacity)
+
+    def __len__(self):
+        """
+        Number of cars in the table.
+        :return: <int>
+        """
+        return len(self.slots)
+
+    def grow(self, capacity):
+        """
+        Increases the number of rows of the table. Existing rows aren't moved.
+        :param capacity: <int> new number of rows.
+        """
+        extra = capacity - self.capacity
+        for buffer, views in zip(self.buffers, self.views):
+            buffer.extend([None] * self.size for _ in range(extra))
+            views.extend([None] * extra)
+        self.free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def add(self, car):
+        """
+        Adds a car to the table. After this, the car publishes its state
+        instead of creating InfoMessages.
+        :param car: <Car> new car.
+        :return: <int> slot of the car.
+        """
+        if not self.free_slots:
+            self.grow(2 * self.capacity)
+        slot = self.free_slots.pop()
+        for buffer, views in zip(self.buffers, self.views):
+            views[slot] = InfoView(car.get_name(), buffer[slot])
+        self.slots[car.get_name()] = slot
+        car.state_table = self
+        return slot
+
+    def remove(self, car):
+        """
+        Removes a car from the table. The views of the car keep its last
+        state, as the InfoMessages it created would.
+        :param car: <Car> car that left the intersection.
+        """
+        slot = self.slots.pop(car.get_name())
+        for views in self.views:
+            views[slot].freeze()
+            views[slot] = None
+        self.free_slots.append(slot)
+        car.state_table = None
+
+    def publish(self, car):
+        """
+        Writes the state of a car in the buffer of the actual tick.
+        :param car: <Car> car that has been updated.
+        :return: <InfoView> view of the state, to be sent as InfoMessage.
+        """
+        index = self.tick % self.buffers_number
+        slot = self.slots[car.get_name()]
+        row = self.buffers[index][slot]
+        row[0] = car.get_actual_coordinates()
+        row[1] = car.get_origin_coordinates()
+        row[2] = car.get_acceleration()
+        row[3] = car.get_speed()
+        row[4] = car.get_lane()
+        row[5] = car.get_creation_time()
+        row[6] = car.is_new()
+        row[7] = car.get_intention()
+        row[8] = car.get_caravan_depth()
+        row[9] = car.is_supervisor
+        return self.views[index][slot]
+
+    def get_view(self, name, ticks_ago=1):
+        """
+        Returns the view of the state published by a car.
+        :param name: <int> name of the car.
+        :param ticks_ago: <int> 1 for the state published at the previous tick.
+        :return: <InfoView>
+        """
+        index = (self.tick - ticks_ago) % self.buffers_number
+        return self.views[index][self.slots[name]]
+
+    def advance(self):
+        """
+        Starts a new tick. Must be called once all the cars have been updated.
+        """
+        self.tick += 1
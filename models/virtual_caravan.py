@@ -0,0 +1,178 @@
+from math import pi, atan
+import numpy as np
+
+conflict_zone_radio = 384.0
+path_width = 172.0
+right_turn_radio = path_width / 4.0
+left_turn_radio = 3 * path_width / 4.0
+initial_straight_section = conflict_zone_radio - path_width / 2.0
+intention_codes = {"l": 0, "s": 1, "r": 2}
+
+
+def _conflict_mask(table):
+    """
+    Packs a 3x3 table of booleans in an int. The bit of a pair of intentions
+    is 3 * own intention code + other intention code.
+    :param table: <list> table indexed by the codes of the intentions.
+    :return: <int>
+    """
+    return sum(
+        1 << (3 * own + other)
+        for own in range(3) for other in range(3) if table[own][other]
+    )
+
+# Paths that cross, indexed by the difference between the lanes (modulo 4).
+conflict_masks = tuple(_conflict_mask(table) for table in [
+    [[True, True, True], [True, True, True], [True, True, True]],
+    [[True, True, False], [True, True, False], [False, True, False]],
+    [[True, True, True], [True, False, False], [True, False, False]],
+    [[True, True, False], [True, True, True], [False, False, False]]
+])
+
+
+def cross_path(lane, intention, other_lane, other_intention):
+    """
+    Check if the path of a car crosses the path of another one.
+    :param lane: <int> lane of the car.
+    :param intention: <string> intention of the car.
+    :param other_lane: <int> lane of the other car.
+    :param other_intention: <string> intention of the other car.
+    :return: <boolean> True if the paths cross.
+    """
+    return bool(
+        conflict_masks[(lane - other_lane) % 4] >>
+        (3 * intention_codes[intention] + intention_codes[other_intention]) & 1
+    )
+
+# Paths (lane, intention) that cross every path.
+crossing_paths = dict(
+    ((lane, intention), [
+        (other_lane, other_intention)
+        for other_lane in range(4) for other_intention in "lsr"
+        if cross_path(lane, intention, other_lane, other_intention)
+    ])
+    for lane in range(4) for intention in "lsr"
+)
+
+
+def virtual_position(x, y, origin_x, origin_y, origin_sin, origin_cos):
+    """
+    Position of a car at the virtual caravan environment: the x axis goes
+    along the lane at which the car started and the y axis across it.
+    :param x: <float> x position of the car.
+    :param y: <float> y position of the car.
+    :param origin_x: <float> x position at which the car started.
+    :param origin_y: <float> y position at which the car started.
+    :param origin_sin: <float> sine of the direction at which the car started.
+    :param origin_cos: <float> cosine of the direction at which the car
+        started.
+    :return: (<float>, <float>) x and y position at the virtual environment.
+    """
+    x_difference = x - origin_x
+    y_difference = y - origin_y
+    virtual_x = abs(x_difference * origin_sin + y_difference * origin_cos)
+    virtual_y = -1 * x_difference * origin_cos + y_difference * origin_sin
+    return virtual_x, virtual_y
+
+
+def virtual_distance(virtual_x, virtual_y, intention):
+    """
+    Distance traveled by a car at the virtual caravan. For cars that turn,
+    the distance is measured along their path and scaled so all the paths have
+    the same length.
+    :param virtual_x: <float> x position at the virtual environment.
+    :param virtual_y: <float> y position at the virtual environment.
+    :param intention: <string> intention of the car.
+    :return: <float> virtual distance of the car.
+    """
+    if intention == "s":
+        return virtual_x
+    if intention == "r":
+        radio = right_turn_radio
+        # the right turn bends to negative virtual y
+        side = -1
+    else:
+        radio = left_turn_radio
+        side = 1
+    # Calculate real virtual distance
+    if virtual_x <= initial_straight_section:
+        virtual_distance_value = virtual_x
+    elif side * virtual_y < radio:
+        virtual_distance_value = (
+            initial_straight_section + atan(
+                (virtual_x - initial_straight_section) /
+                (radio - side * virtual_y)
+            ) * radio
+        )
+    else:
+        virtual_distance_value = (
+            initial_straight_section + pi * radio / 2.0 + side * virtual_y -
+            radio
+        )
+    a = path_width / 2.0
+    b = right_turn_radio + path_width / 4.0
+    c = pi * radio / 2.0
+    # Scale virtual distance
+    if virtual_distance_value <= initial_straight_section + c:
+        virtual_distance_value *= (
+            (initial_straight_section + a + b) /
+            (initial_straight_section + c)
+        )
+    else:
+        virtual_distance_value += a + b - c
+    return virtual_distance_value
+
+
+def virtual_positions(x, y, origin_x, origin_y, origin_sin, origin_cos):
+    """
+    Batched version of virtual_position. Every parameter is a NumPy array with
+    one value per car.
+    :return: (<array>, <array>) x and y positions at the virtual environment.
+    """
+    x_difference = x - origin_x
+    y_difference = y - origin_y
+    virtual_x = np.abs(x_difference * origin_sin + y_difference * origin_cos)
+    virtual_y = -1 * x_difference * origin_cos + y_difference * origin_sin
+    return virtual_x, virtual_y
+
+
+def virtual_distances(virtual_x, virtual_y, intention):
+    """
+    Batched version of virtual_distance. Computes the virtual distances of
+    many cars in one pass, without branching per car.
+    :param virtual_x: <array> x positions at the virtual environment.
+    :param virtual_y: <array> y positions at the virtual environment.
+    :param intention: <array> intention codes of the cars, as given by
+        intention_codes.
+    :return: <array> virtual distances of the cars.
+    """
+    right = intention == intention_codes["r"]
+    radio = np.where(right, right_turn_radio, left_turn_radio)
+    side = np.where(right, -1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        arc = (
+            initial_straight_section + np.arctan(
+                (virtual_x - initial_straight_section) /
+                (radio - side * virtual_y)
+            ) * radio
+        )
+    values = np.where(
+        virtual_x <= initial_straight_section, virtual_x,
+        np.where(
+            side * virtual_y < radio, arc,
+            initial_straight_section + pi * radio / 2.0 + side * virtual_y -
+            radio
+        )
+    )
+    a = path_width / 2.0
+    b = right_turn_radio + path_width / 4.0
+    c = pi * radio / 2.0
+    values = np.where(
+        values <= initial_straight_section + c,
+        values * (
+            (initial_straight_section + a + b) /
+            (initial_straight_section + c)
+        ),
+        values + (a + b - c)
+    )
+    return np.where(intention == intention_codes["s"], virtual_x, values)
@@ -0,0 +1,180 @@
+import csv
+import os
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+
+from main import main_simulation, car_limit, simulation_params, \
+    stand_still_distances, initial_speed_values, fix_booleans, \
+    distributed_param
+from simulations.result_cache import ResultCache
+
+sweep_directory = os.path.dirname(os.path.abspath(__file__)) + "/../logs/"
+summary_fields = [
+    "name", "limit", "stand_still_param", "initial_speed", "fix",
+    "distributed", "seed", "return_code", "collisions", "ticks", "elapsed",
+    "log_directory", "cached"
+]
+
+
+def cell_seed(name, base_seed=0):
+    """
+    Seed of a cell of the sweep. It depends only on the name of the cell, so
+    it doesn't change when cells are added to or removed from the grid.
+    :param name: <string> name of the cell.
+    :param base_seed: <int> seed of the sweep.
+    :return: <int>
+    """
+    return (zlib.crc32(name) ^ base_seed) & 0xffffffff
+
+
+def expand_grid(limit=car_limit, base_seed=0):
+    """
+    Expands the parameters of main.py into the cells of the sweep: every
+    simulation type (distributed or not, with or without the fix) for every
+    stand still distance and its initial speeds.
+    :param limit: <int> number of cars of every simulation.
+    :param base_seed: <int> seed of the sweep.
+    :return: <list of dicts> parameters of every cell.
+    """
+    cells = []
+    for params_name, fix, distributed in zip(
+            simulation_params, fix_booleans, distributed_param):
+        for stand_still_value in stand_still_distances:
+            for initial_speed in initial_speed_values.get(
+                    stand_still_value, [-1]):
+                name = "{}distance_{}_speed_{}".format(
+                    params_name.lstrip("_"), stand_still_value, initial_speed
+                )
+                cells.append({
+                    "name": name,
+                    "limit": limit,
+                    "stand_still_param": stand_still_value,
+                    "initial_speed": initial_speed,
+                    "fix": fix,
+                    "distributed": distributed == "distributed",
+                    "seed": cell_seed(name, base_seed)
+                })
+    return cells
+
+
+def cell_config(cell):
+    """
+    Full configuration of the simulation of a cell: the arguments given to
+    main_simulation, besides the logs. It's the key of the cell in the result
+    cache.
+    :param cell: <dict> parameters of the cell.
+    :return: <dict>
+    """
+    return {
+        "graphic_environment": False,
+        "limit": cell["limit"],
+        "stand_still_param": cell["stand_still_param"],
+        "fix": cell["fix"],
+        "args": ["distributed"] if cell["distributed"] else [],
+        "initial_speed": cell["initial_speed"],
+        "seed": cell["seed"]
+    }
+
+
+def run_cell(cell):
+    """
+    Runs the simulation of a cell, with its seed and its own log directory. The
+    output of the simulation is written to output.log in that directory.
+    :param cell: <dict> parameters of the cell, with the "directory" where
+        the directory of the cell is created.
+    :return: <dict> the parameters of the cell with the return code, the
+        number of collisions and ticks and the elapsed seconds of the
+        simulation and its log directory.
+    """
+    log_directory = "{}{}/".format(cell["directory"], cell["name"])
+    if not os.path.isdir(log_directory):
+        os.makedirs(log_directory)
+    config = cell_config(cell)
+    results = {}
+    stdout = sys.stdout
+    sys.stdout = open(log_directory + "output.log", "w")
+    start = time.time()
+    try:
+        return_code = main_simulation(
+            config["graphic_environment"], config["limit"],
+            config["stand_still_param"], config["fix"], *config["args"],
+            initial_speed=config["initial_speed"], seed=config["seed"],
+            log="", log_directory=log_directory, results=results
+        )
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    result = dict(cell)
+    del result["directory"]
+    result["return_code"] = return_code
+    result["collisions"] = results["collisions"]
+    result["ticks"] = results["ticks"]
+    result["elapsed"] = round(time.time() - start, 2)
+    result["log_directory"] = log_directory
+    result["cached"] = False
+    return result
+
+
+def run_sweep(cells, processes=None, directory=sweep_directory,
+              summary_name="summary.csv", cache=None):
+    """
+    Runs the cells of a sweep in a pool of processes. Every cell runs in a new
+    process, as the loggers of a simulation are global. The results are
+    written to the summary table and printed as they complete.
+    With a cache, the cells with a cached result aren't run, and the result
+    of every cell is stored as soon as it completes, so an interrupted sweep
+    resumes from the cells that weren't completed.
+    :param cells: <list of dicts> cells of the sweep (see expand_grid).
+    :param processes: <int> number of processes. The number of cpus if None.
+    :param directory: <string> directory for the logs of the cells and the
+        summary, ending with "/".
+    :param summary_name: <string> name of the summary table.
+    :param cache: <ResultCache> cache of the results, or None to run every
+        cell.
+    :return: <list of dicts> results of the cells, in the order of cells.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    cells = [dict(cell, directory=directory) for cell in cells]
+    results = {}
+    pending_cells = []
+    for cell in cells:
+        cached_result = None
+        if cache is not None:
+            cached_result = cache.get(cell_config(cell))
+        if cached_result is None:
+            pending_cells.append(cell)
+        else:
+            results[cell["name"]] = dict(cached_result, cached=True)
+    pool = Pool(processes, maxtasksperchild=1)
+    try:
+        with open(directory + summary_name, "wb") as summary_file:
+            summary = csv.DictWriter(summary_file, summary_fields)
+            summary.writeheader()
+            for cell in cells:
+                if cell["name"] in results:
+                    summary.writerow(results[cell["name"]])
+            summary_file.flush()
+            for result in pool.imap_unordered(run_cell, pending_cells):
+                if cache is not None:
+                    cache.put(cell_config(result), result)
+                summary.writerow(result)
+                summary_file.flush()
+                print "{name}: return code {return_code} in {elapsed}s".format(
+                    **result
+                )
+                results[result["name"]] = result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    return [results[cell["name"]] for cell in cells]
+
+
+if __name__ == "__main__":
+    run_sweep(
+        expand_grid(), directory=sweep_directory + "sweep/",
+        cache=ResultCache(sweep_directory + "cache/")
+    )
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+
+project_directory = os.path.dirname(os.path.abspath(__file__)) + "/../"
+source_packages = ["auxiliary_functions", "car_controllers", "models"]
+
+
+def get_code_version(directory=project_directory):
+    """
+    Stamp of the code of the simulation: a hash of main.py and the modules
+    of the packages used by the simulation. Any change of the code gives a
+    new stamp.
+    :param directory: <string> directory of the project, ending with "/".
+    :return: <string> hexadecimal hash.
+    """
+    paths = [directory + "main.py"]
+    for package in source_packages:
+        package_directory = directory + package + "/"
+        paths.extend(
+            package_directory + file_name
+            for file_name in os.listdir(package_directory)
+            if file_name.endswith(".py")
+        )
+    code_hash = hashlib.sha256()
+    for path in sorted(paths):
+        code_hash.update(os.path.relpath(path, directory))
+        with open(path, "rb") as source_file:
+            code_hash.update(source_file.read())
+    return code_hash.hexdigest()
+
+
+class ResultCache(object):
+    """
+    Results of simulations stored on disk, addressed by a hash of the full
+    configuration of main_simulation (with its seed) and the version of the
+    code, so a simulation that has already been run isn't run again. Every
+    entry is a json file with the configuration, the code version and the
+    result: return code, number of collisions and ticks, and the directory
+    of the logs.
+    Entries of another code version are never returned, and they can be
+    deleted with prune.
+    """
+
+    def __init__(self, directory, code_version=None):
+        """
+        :param directory: <string> directory of the cache, ending with "/".
+        :param code_version: <string> stamp of the code. If None, it's
+            computed from the sources (see get_code_version).
+        """
+        if code_version is None:
+            code_version = get_code_version()
+        self.directory = directory
+        self.code_version = code_version
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get_key(self, config):
+        """
+        Returns the key of a configuration for the actual code version.
+        :param config: <dict> json serializable arguments of main_simulation,
+            including the seed.
+        :return: <string> hexadecimal hash.
+        """
+        return hashlib.sha256(json.dumps(
+            {"config": config, "code_version": self.code_version},
+            sort_keys=True
+        )).hexdigest()
+
+    def get_path(self, key):
+        """
+        Returns the path of the file of an entry.
+        :param key: <string> key of the entry.
+        :return: <string>
+        """
+        return "{}{}.json".format(self.directory, key)
+
+    def get(self, config):
+        """
+        Returns the result of a configuration, if it's in the cache and its
+        logs still exist.
+        :param config: <dict> configuration of the simulation.
+        :return: <dict> stored result, or None if there isn't a valid one.
+        """
+        path = self.get_path(self.get_key(config))
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, ValueError):
+            return None
+        log_directory = entry["result"].get("log_directory")
+        if log_directory and not os.path.isdir(log_directory):
+            return None
+        return entry["result"]
+
+    def put(self, config, result):
+        """
+        Stores the result of a configuration. The file is written under a
+        temporary name and then renamed, so an interrupted write doesn't
+        leave a broken entry.
+        :param config: <dict> configuration of the simulation.
+        :param result: <dict> json serializable result.
+        """
+        path = self.get_path(self.get_key(config))
+        temporary_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary_path, "w") as entry_file:
+            json.dump(
+                {"config": config, "code_version": self.code_version,
+                 "result": result},
+                entry_file, sort_keys=True
+            )
+        os.rename(temporary_path, path)
+
+    def invalidate(self, config):
+        """
+        Deletes the entry of a configuration.
+        :param config: <dict> configuration of the simulation.
+        :return: <boolean> True if there was an entry.
+        """
+        path = self.get_path(self.get_key(config))
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+    def prune(self):
+        """
+        Deletes the stale entries: the ones of other code versions and the
+        unreadable ones.
+        :return: <int> number of deleted entries.
+        """
+        deleted = 0
+        for file_name in os.listdir(self.directory):
+            path = self.directory + file_name
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(path) as entry_file:
+                    code_version = json.load(entry_file)["code_version"]
+            except (IOError, ValueError, KeyError):
+                code_version = None
+            if code_version != self.code_version:
+                os.remove(path)
+                deleted += 1
+        return deleted
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from main import Simulation
+
+# simulation forked by the processes of run_variants
+warm_simulation = None
+
+
+def apply_variant(simulation, variant):
+    """
+    Applies the settings of a variant to a simulation.
+    :param simulation: <Simulation>
+    :param variant: <dict> "name" of the variant and the settings to change:
+        "attack_supervisor" and "supervisor_lies" (the actual supervisor
+        attacks), "fix", "seed" (new random streams) and "limit" (number of
+        cars of the simulation).
+    """
+    if variant.get("attack_supervisor") or variant.get("supervisor_lies"):
+        simulation.attack(
+            variant.get("attack_supervisor", False),
+            variant.get("supervisor_lies", False)
+        )
+    if "fix" in variant:
+        simulation.set_fix(variant["fix"])
+    if "seed" in variant:
+        simulation.reseed(variant["seed"])
+    if "limit" in variant:
+        simulation.limit = variant["limit"]
+
+
+def run_variant(variant):
+    """
+    Runs a variant of the simulation forked by the process, until the end.
+    The output of the simulation is written to output.log in the directory
+    of the variant, and so are its logs if the simulation is logged.
+    :param variant: <dict> variant (see apply_variant), with the "directory"
+        where the directory of the variant is created.
+    :return: <dict> the variant with the return code, the number of
+        collisions and ticks and the elapsed seconds of the simulation.
+    """
+    simulation = warm_simulation
+    log_directory = "{}{}/".format(variant["directory"], variant["name"])
+    if not os.path.isdir(log_directory):
+        os.makedirs(log_directory)
+    if simulation.log:
+        simulation.start_logs(
+            "{}_{}".format(simulation.log_name, variant["name"]),
+            log_directory
+        )
+    results = {}
+    simulation.results = results
+    apply_variant(simulation, variant)
+    stdout = sys.stdout
+    sys.stdout = open(log_directory + "output.log", "w")
+    start = time.time()
+    try:
+        return_code = simulation.run()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    result = dict(variant)
+    del result["directory"]
+    result.update(results)
+    result["return_code"] = return_code
+    result["elapsed"] = round(time.time() - start, 2)
+    result["log_directory"] = log_directory
+    return result
+
+
+def run_variants(simulation, variants, directory, processes=None):
+    """
+    Runs variants of a simulation from its actual state. Every variant runs
+    in a process forked from this one, which shares the memory of the
+    simulation until the variant changes it, so the state is neither copied
+    nor simulated again. The simulation itself isn't changed.
+    :param simulation: <Simulation> simulation without graphic environment,
+        usually run until the intersection is full of cars.
+    :param variants: <list of dicts> variants (see apply_variant), with
+        different names.
+    :param directory: <string> directory for the output and logs of the
+        variants, ending with "/".
+    :param processes: <int> number of processes. The number of cpus if None.
+    :return: <list of dicts> results of the variants, in the order of
+        variants (see run_variant).
+    """
+    global warm_simulation
+    if simulation.graphic_environment:
+        raise ValueError("Simulations with graphic environment can't fork")
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    variants = [dict(variant, directory=directory) for variant in variants]
+    warm_simulation = simulation
+    # so the logs of the warm up are complete while the variants run
+    simulation.flush_logs()
+    # every variant runs in a new process, forked from this one
+    pool = Pool(processes, maxtasksperchild=1)
+    try:
+        results = pool.map(run_variant, variants, chunksize=1)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        warm_simulation = None
+    return results
+
+
+if __name__ == "__main__":
+    from main import car_limit
+    from simulations.parameter_sweep import sweep_directory
+    simulation = Simulation(False, car_limit, 5, True, seed=0,
+                            log="_variants")
+    while simulation.counter < 2000:
+        simulation.tick()
+    for result in run_variants(simulation, [
+            {"name": "no_attack"},
+            {"name": "attack_supervisor", "attack_supervisor": True},
+            {"name": "supervisor_lies", "supervisor_lies": True},
+            {"name": "no_fix_supervisor_lies", "supervisor_lies": True,
+             "fix": False}], sweep_directory + "variants/"):
+        print "{name}: return code {return_code}, {collisions} collisions " \
+              "in {ticks} ticks".format(**result)
@@ -0,0 +1,14 @@
+from models.car import Car
+
+
+def log_cars(number_of_cars, intention="r"):
+    """
+    Creates the cars written to the logs by the log tests. The name of a car
+    is also its creation time and, modulo 4, its lane.
+    :param number_of_cars: <int>
+    :param intention: <string> intention of the cars.
+    :return: <list of Cars>
+    """
+    return [Car(name, 10.0 * name, 5.0, 3.0, lane=name % 4,
+                intention=intention, creation_time=name)
+            for name in range(number_of_cars)]
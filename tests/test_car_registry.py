@@ -0,0 +1,141 @@
+import unittest
+import random
+from models.car import Car
+from models.car_registry import CarRegistry
+from models.message import FollowingCarMessage, InfoMessage, \
+    LeftIntersectionMessage
+
+
+class TestCarRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = self.new_registry()
+
+    @staticmethod
+    def new_registry():
+        random.seed(3)
+        registry = CarRegistry()
+        for name in range(40):
+            car = Car(name, lane=random.randint(0, 3),
+                      intention=random.choice("lsr"))
+            if name > 0 and random.random() < 0.7:
+                leader = registry[random.randint(0, name - 1)]
+                car.start_following(FollowingCarMessage(leader, name, -1))
+            registry[name] = car
+        del registry[7]
+        del registry[12]
+        return registry
+
+    @staticmethod
+    def delete_and_refresh_all(registry, name):
+        cars = registry.get_cars_by_name()
+        for car in cars:
+            if car.get_following_car_name() == name:
+                car.set_following(False)
+        del registry[name]
+        for car in cars:
+            if car.get_following_car_name() in registry:
+                car.set_following_car_message(
+                    InfoMessage(registry[car.get_following_car_name()])
+                )
+
+    @staticmethod
+    def get_following_state(registry):
+        return [
+            (car.get_name(), car.get_following(),
+             car.get_following_car_name(), car.get_caravan_depth())
+            for car in registry.get_cars_by_name()
+        ]
+
+    def scan(self, new_car, by_depth):
+        old_cars = self.registry.values()
+        old_cars.sort(key=lambda car: car.get_name(), reverse=True)
+        if by_depth:
+            old_cars.sort(key=lambda car: car.get_caravan_depth(),
+                          reverse=True)
+        for old_car in old_cars:
+            if (new_car.cross_path(old_car.get_lane(), old_car.get_intention())
+                    and new_car.get_name() > old_car.get_name()):
+                return old_car
+        return None
+
+    def test_index(self):
+        self.assertEqual(len(self.registry.depth_order), 38)
+        self.registry[5] = Car(5, lane=2, intention="r")
+        self.assertIn(5, self.registry.path_name_order[(2, "r")])
+        self.assertEqual(self.registry.pop(5).get_name(), 5)
+        self.assertEqual(len(self.registry.depth_order), 37)
+        self.assertEqual(
+            sum(len(names)
+                for names in self.registry.path_name_order.values()), 37
+        )
+
+    def test_orders(self):
+        names = sorted(self.registry.keys())
+        self.assertEqual(
+            [car.get_name() for car in self.registry.get_cars_by_name()],
+            names
+        )
+        self.assertEqual(
+            [car.get_name()
+             for car in self.registry.get_sorted_cars(False)],
+            names[::-1]
+        )
+        by_depth = self.registry.get_sorted_cars(True)
+        self.assertEqual(
+            by_depth,
+            sorted(self.registry.values(),
+                   key=lambda car: (car.get_caravan_depth(), car.get_name()),
+                   reverse=True)
+        )
+
+    def test_depth_change_reorders(self):
+        deepest = self.registry.get_sorted_cars(True)[0]
+        car = self.registry[0]
+        car.start_following(FollowingCarMessage(deepest, 0, -1))
+        self.assertEqual(self.registry.depths[0],
+                         deepest.get_caravan_depth() + 1)
+        self.assertIs(self.registry.get_sorted_cars(True)[0], car)
+
+    def test_follower_names(self):
+        for name, car in self.registry.items():
+            self.assertIn(
+                name,
+                self.registry.get_follower_names(
+                    car.get_following_car_name()
+                )
+            )
+        leader = self.registry[3]
+        new_car = Car(50)
+        new_car.start_following(FollowingCarMessage(leader, 50, -1))
+        self.registry[50] = new_car
+        self.assertIn(50, self.registry.get_follower_names(3))
+        new_car.start_following(FollowingCarMessage(self.registry[4], 50, -1))
+        self.assertNotIn(50, self.registry.get_follower_names(3))
+        self.assertIn(50, self.registry.get_follower_names(4))
+
+    def test_departures_match_full_refresh(self):
+        reference = self.new_registry()
+        owner = Car(100)
+        owner.cars_at_intersection = self.registry
+        for name in [0, 5, 2, 20, 13, 1, 30]:
+            owner.delete_car_at_intersection(
+                LeftIntersectionMessage(self.registry[name])
+            )
+            self.delete_and_refresh_all(reference, name)
+            self.assertEqual(self.get_following_state(self.registry),
+                             self.get_following_state(reference))
+
+    def test_car_to_follow_matches_scan(self):
+        for name in [0, 10, 25, 40]:
+            for lane in range(4):
+                for intention in "lsr":
+                    new_car = Car(name, lane=lane, intention=intention)
+                    for by_depth in [True, False]:
+                        self.assertIs(
+                            self.registry.get_car_to_follow(new_car, by_depth),
+                            self.scan(new_car, by_depth)
+                        )
+
+if __name__ == '__main__':
+    unittest.main()
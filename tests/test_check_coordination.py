@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+import unittest
+import random
+from main import Simulation
+from models.car import Car, SupervisorCar
+from models.message import FaultyCoordinationMessage, \
+    CorrectedCoordinationMessage
+
+
+class TestCheckCoordination(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        self.cars = [
+            Car(name, lane=random.randint(0, 3),
+                intention=random.choice("lsr"))
+            for name in range(12)
+        ]
+        second_at_charge = Car(20)
+        for car in self.cars:
+            second_at_charge.get_cars_at_intersection()[car.get_name()] = car
+        second_at_charge.set_faulty_coordinator_name(0)
+        second_at_charge.set_faulty_coordinated_car_name(9)
+        second_at_charge.set_faulty_following_car_name(3)
+        self.message = FaultyCoordinationMessage(second_at_charge, None, None)
+        self.replays = 0
+        self.replay_coordination = Car.replay_coordination
+
+        def replay_coordination(car, *args):
+            self.replays += 1
+            return self.replay_coordination(car, *args)
+        Car.replay_coordination = replay_coordination
+
+    def tearDown(self):
+        Car.replay_coordination = self.replay_coordination
+
+    def new_checker(self, name, log=False):
+        checker = Car(name)
+        if not log:
+            checker.set_log_messages(None)
+        for car in self.cars:
+            checker.get_cars_at_intersection()[car.get_name()] = car
+        return checker
+
+    def check(self, checker):
+        checker.check_coordination(self.message)
+        messages = checker.get_new_messages()
+        self.assertEqual(len(messages), 1)
+        self.assertIsInstance(messages[0], CorrectedCoordinationMessage)
+        self.assertEqual(checker.get_corrected_coordinated_car_name(), 9)
+        self.assertEqual(checker.get_total_cars_at_faulty_coordination(), 12)
+        return checker.get_corrected_following_car_name()
+
+    def test_honest_cars_share_the_replay(self):
+        logger = self.new_checker(30, log=True)
+        expected = self.check(logger)
+        self.assertEqual(self.replays, 1)
+        for name in range(31, 36):
+            self.assertEqual(self.check(self.new_checker(name)), expected)
+        self.assertEqual(self.replays, 2)
+        other_logger = self.new_checker(36, log=True)
+        self.assertEqual(self.check(other_logger), expected)
+        self.assertEqual(self.replays, 2)
+        self.assertEqual(len(self.message.get_replays()), 2)
+        self.assertGreater(len(logger.get_log_messages()), 0)
+        self.assertEqual(
+            [(message["coordinated_car"].get_name(),
+              [car.get_name() for car in message["old_cars"]],
+              message["selected_car"].get_name())
+             for message in other_logger.get_log_messages()],
+            [(message["coordinated_car"].get_name(),
+              [car.get_name() for car in message["old_cars"]],
+              message["selected_car"].get_name())
+             for message in logger.get_log_messages()]
+        )
+
+    def test_logged_simulation_shares_replays(self):
+        directory = tempfile.mkdtemp() + "/"
+        checks = [0]
+        check_coordination = Car.check_coordination
+
+        def count_checks(car, message):
+            checks[0] += 1
+            return check_coordination(car, message)
+        Car.check_coordination = count_checks
+        try:
+            simulation = Simulation(False, 1000, 5, True, "distributed",
+                                    seed=1, log="_replays",
+                                    log_directory=directory)
+            for _ in range(1500):
+                simulation.tick()
+                if simulation.counter % 300 == 0:
+                    simulation.attack(supervisor_lies=True)
+        finally:
+            Car.check_coordination = check_coordination
+            shutil.rmtree(directory)
+        self.assertGreater(checks[0], 0)
+        self.assertLess(self.replays, checks[0])
+
+    def test_different_state_replays_again(self):
+        self.check(self.new_checker(30))
+        checker = self.new_checker(31)
+        del checker.get_cars_at_intersection()[8]
+        self.check(checker)
+        self.assertEqual(self.replays, 2)
+
+    def test_lying_supervisor_replays_by_itself(self):
+        self.check(self.new_checker(30))
+        liar = self.new_checker(31)
+        liar.__class__ = SupervisorCar
+        liar.supervisor_lies = True
+        self.check(liar)
+        self.assertEqual(self.replays, 2)
+        self.assertEqual(len(self.message.get_replays()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import shutil
+import tempfile
+import json
+import unittest
+from main import Simulation
+from auxiliary_functions.columnar_log import read_columnar_log
+from auxiliary_functions.checkpoint import save_checkpoint, load_checkpoint
+from models.car import Car
+from models.car_registry import CarRegistry
+from models.state_table import StateTable
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+        self.path = self.directory + "simulation.ckpt"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def get_state(simulation):
+        return [
+            (name, car.__class__.__name__, car.get_actual_coordinates(),
+             car.get_speed(), car.get_following_car_name(),
+             car.get_caravan_depth())
+            for name, car in simulation.cars.items()
+        ]
+
+    def test_resume(self):
+        for args in [(), ("distributed", "vectorized")]:
+            simulation = Simulation(False, 1000, 5, True, *args, seed=2)
+            for _ in range(400):
+                simulation.tick()
+            simulation.save_checkpoint(self.path)
+            resumed = Simulation(False, 1000, 5, True, checkpoint=self.path)
+            self.assertEqual(self.get_state(resumed),
+                             self.get_state(simulation))
+            for _ in range(300):
+                simulation.tick()
+                resumed.tick()
+                self.assertEqual(self.get_state(resumed),
+                                 self.get_state(simulation))
+            self.assertEqual(resumed.counter, 700)
+
+    def test_warm_start(self):
+        simulation = Simulation(False, 1000, 5, True, seed=2)
+        for _ in range(400):
+            simulation.tick()
+        simulation.save_checkpoint(self.path)
+        results = {}
+        warm_start = Simulation(False, simulation.car_name_counter + 3, 5,
+                                True, checkpoint=self.path, seed=4,
+                                results=results)
+        self.assertEqual(warm_start.run(), 0)
+        self.assertEqual(results["seed"], 4)
+        self.assertGreater(results["ticks"], 400)
+
+    def test_periodic_checkpoints(self):
+        simulation = Simulation(False, 10, 5, True, seed=2,
+                                checkpoint_path=self.path,
+                                checkpoint_interval=20)
+        simulation.run()
+        self.assertGreater(simulation.counter, 20)
+        resumed = Simulation(False, 10, 5, True, checkpoint=self.path)
+        self.assertEqual(resumed.counter, simulation.counter // 20 * 20)
+
+    def read_logs(self, simulation):
+        logs = {}
+        for name, path in simulation.get_log_paths().items():
+            if simulation.log_format == "columnar":
+                logs[name] = {
+                    column: list(values)
+                    for column, values in read_columnar_log(path).items()
+                }
+            else:
+                with open(path) as log_file:
+                    logs[name] = [json.loads(line)["message"]
+                                  for line in log_file]
+        return logs
+
+    def test_resume_logs(self):
+        for log_format in ["text", "columnar"]:
+            simulation = Simulation(False, 40, 5, True, seed=11,
+                                    log="_full", log_directory=self.directory,
+                                    log_format=log_format)
+            simulation.run()
+            stopped = Simulation(False, 40, 5, True, seed=11,
+                                 log="_resumed", log_directory=self.directory,
+                                 log_format=log_format)
+            # the simulation stops between two checkpoints, after writing
+            # the logs of some ticks after the last one
+            while stopped.counter < 1500:
+                stopped.tick()
+                if stopped.counter % 600 == 0:
+                    stopped.save_checkpoint(self.path)
+            stopped.flush_logs()
+            resumed = Simulation(False, 40, 5, True, checkpoint=self.path,
+                                 log="_resumed", log_directory=self.directory,
+                                 log_format=log_format)
+            resumed.run()
+            logs = self.read_logs(simulation)
+            self.assertTrue(logs["coordination"])
+            self.assertEqual(self.read_logs(resumed), logs)
+
+    def test_shared_objects(self):
+        registry = CarRegistry()
+        table = StateTable()
+        for name in range(3):
+            car = Car(name, lane=name)
+            car.cars_at_intersection = registry
+            registry[name] = car
+            table.add(car)
+        table.publish(registry[0])
+        view = table.get_view(0, 0)
+        registry[1].set_following_car_message(view)
+        save_checkpoint(self.path, {"cars": registry, "table": table})
+        state = load_checkpoint(self.path)
+        cars = state["cars"]
+        self.assertEqual(cars.name_order, [0, 1, 2])
+        self.assertEqual(cars.get_follower_names(0), [1])
+        self.assertIs(cars[2].cars_at_intersection, cars)
+        self.assertEqual(cars[0].registries, [cars])
+        self.assertIs(cars[2].get_following_car_message(),
+                      Car.default_following_car_message)
+        view = cars[1].get_following_car_message()
+        self.assertEqual(view.get_lane(), 0)
+        state["table"].publish(cars[0])
+        self.assertIs(state["table"].get_view(0, 0), view)
+
+if __name__ == '__main__':
+    unittest.main()
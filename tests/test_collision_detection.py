@@ -0,0 +1,77 @@
+import unittest
+import random
+from auxiliary_functions.auxiliary_functions import random_car, \
+    colliding_pairs
+from auxiliary_functions.collision_detection import CollisionRecord, \
+    SweptCollisionDetector
+from models.car import Car
+
+
+class TestCollisionDetection(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = SweptCollisionDetector()
+
+    @staticmethod
+    def move(car, x, y):
+        car.set_position((x, y))
+        car.update_footprint()
+
+    def new_car(self, name, x, y, direction=0):
+        car = Car(name, pos_x=x, pos_y=y, direction=direction)
+        car.new_footprint()
+        return car
+
+    def test_static_cars_match_overlaps(self):
+        random.seed(3)
+        cars = []
+        for name in range(80):
+            car = random_car(name, 10, 10, 0, 4, True, 5,
+                             lane=random.randint(0, 3))
+            car.set_position(
+                (random.uniform(-20, 788), random.uniform(-20, 788))
+            )
+            car.set_direction(random.uniform(0, 360))
+            car.new_footprint()
+            cars.append(car)
+        events = self.detector.detect(cars, 1)
+        self.assertEqual([event.get_cars() for event in events],
+                         colliding_pairs(cars))
+        for event in events:
+            self.assertEqual(event.time_of_impact, 0)
+
+    def test_crossing_between_ticks(self):
+        first = self.new_car(0, 100, 300)
+        second = self.new_car(1, 300, 300)
+        self.assertEqual(self.detector.detect([first, second], 1), [])
+        self.move(first, 400, 300)
+        self.move(second, 0, 300)
+        self.assertFalse(first.get_rect().colliderect(second.get_rect()))
+        events = self.detector.detect([first, second], 2)
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual(event.get_cars(), (first, second))
+        self.assertEqual(event.get_code(), "0to1")
+        self.assertTrue(0 < event.time_of_impact < 0.5)
+        self.assertAlmostEqual(event.get_time(), 1 + event.time_of_impact)
+
+    def test_parallel_cars_dont_collide(self):
+        first = self.new_car(0, 100, 100)
+        second = self.new_car(1, 100, 300)
+        self.detector.detect([first, second], 1)
+        self.move(first, 500, 100)
+        self.move(second, 500, 300)
+        self.assertEqual(self.detector.detect([first, second], 2), [])
+
+    def test_record_keeps_first_collision(self):
+        first = self.new_car(0, 100, 100)
+        second = self.new_car(1, 101, 101)
+        record = CollisionRecord()
+        for tick in range(3):
+            for event in self.detector.detect([first, second], tick):
+                record.add(event)
+        self.assertEqual(len(record), 1)
+        self.assertEqual(record.events[0].tick, 0)
+
+if __name__ == '__main__':
+    unittest.main()
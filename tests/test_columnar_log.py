@@ -0,0 +1,96 @@
+import json
+import shutil
+import tempfile
+import unittest
+from auxiliary_functions.columnar_log import ColumnarLog, CarLog, \
+    read_columnar_log, total_cars_columns, intention_names
+from main import Simulation
+from tests.cars import log_cars
+
+
+class TestColumnarLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_chunks(self):
+        path = self.directory + "total_cars.bin"
+        log = ColumnarLog(path, total_cars_columns, chunk_size=3)
+        for tick in range(7):
+            log.append((tick, 2 * tick))
+        self.assertEqual(len(log), 1)
+        log.close()
+        columns = read_columnar_log(path)
+        self.assertEqual(list(columns["tick"]), range(7))
+        self.assertEqual(list(columns["cars_simulated"]), range(0, 14, 2))
+        log = ColumnarLog(path, total_cars_columns, "a")
+        log.append((7, 14))
+        log.close()
+        self.assertEqual(list(read_columnar_log(path)["tick"]), range(8))
+        with open(path, "ab") as log_file:
+            log_file.write("\x05\x00\x00\x00\x01")
+        self.assertEqual(len(read_columnar_log(path)["tick"]), 8)
+        self.assertRaises(ValueError, CarLog, path, "a")
+        # the rows appended after a chunk that was being written are read
+        log = ColumnarLog(path, total_cars_columns, "a")
+        for tick in range(8, 11):
+            log.append((tick, 2 * tick))
+        log.close()
+        self.assertEqual(list(read_columnar_log(path)["tick"]), range(11))
+
+    def test_cars(self):
+        path = self.directory + "cars.bin"
+        log = CarLog(path)
+        cars = log_cars(3)
+        log.write_cars([cars[:1], cars[1:]], 4)
+        log.write_cars([cars[2:]], 5)
+        log.close()
+        columns = read_columnar_log(path)
+        self.assertEqual(list(columns["record"]), [0, 0, 0, 1])
+        self.assertEqual(list(columns["group"]), [0, 1, 1, 0])
+        self.assertEqual(list(columns["tick"]), [4, 4, 4, 5])
+        self.assertEqual(list(columns["name"]), [0, 1, 2, 2])
+        self.assertEqual(list(columns["x"]), [0.0, 10.0, 20.0, 20.0])
+        self.assertEqual(intention_names[columns["intention"][0]], "r")
+        self.assertEqual(list(columns["following"]), [-1] * 4)
+        log = CarLog(path, "a")
+        log.write_cars([cars], 6)
+        log.close()
+        self.assertEqual(read_columnar_log(path)["record"][-1], 2)
+        with open(path, "ab") as log_file:
+            log_file.write("\x05\x00\x00\x00\x01")
+        log = CarLog(path, "a")
+        self.assertEqual(log.records, 3)
+        log.write_cars([cars[:1]], 7)
+        log.close()
+        columns = read_columnar_log(path)
+        self.assertEqual(list(columns["record"]), [0, 0, 0, 1, 2, 2, 2, 3])
+        self.assertEqual(list(columns["tick"]), [4, 4, 4, 5, 6, 6, 6, 7])
+
+    def test_simulation_logs(self):
+        for log_format in ["text", "columnar"]:
+            Simulation(False, 20, 5, True, seed=3, log="_test",
+                       log_directory=self.directory,
+                       log_format=log_format).run()
+        coordinated_names = []
+        with open(self.directory + "coordination_test.log") as log_file:
+            for line in log_file:
+                message = json.loads(line)["message"]
+                coordinated_names.append(
+                    message["coordinated_car"]["name"]
+                )
+        columns = read_columnar_log(
+            self.directory + "coordination_test.bin"
+        )
+        self.assertTrue(coordinated_names)
+        coordinated = columns["group"] == 0
+        self.assertEqual(list(columns["name"][coordinated]),
+                         coordinated_names)
+        self.assertEqual(len(set(columns["record"])),
+                         len(coordinated_names))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from pygame import image, transform
+from models.footprint import Footprint, car_image_size, images_directory
+
+
+class TestFootprint(unittest.TestCase):
+
+    def setUp(self):
+        self.image = image.load(images_directory + "car.png")
+
+    def test_image_size(self):
+        self.assertEqual(car_image_size, self.image.get_size())
+
+    def test_rect_matches_rotated_image(self):
+        for heading in [0, 12.5, 45, 90, 133.3, 180, 270, 301.7, -90, -33]:
+            rotated_image = transform.rotate(self.image, heading)
+            rotated_image = transform.scale(
+                rotated_image,
+                (
+                    int(rotated_image.get_rect().w * 0.05),
+                    int(rotated_image.get_rect().h * 0.05)
+                )
+            )
+            rect = rotated_image.get_rect()
+            rect.center = (435.7, 640.2)
+            footprint = Footprint(435.7, 640.2, heading, 0.05)
+            self.assertEqual(footprint.get_rect(), rect)
+
+    def test_move(self):
+        footprint = Footprint(0, 0, 0, 0.1)
+        footprint.move(100, 200, 90)
+        self.assertEqual(footprint.get_rect().center, (100, 200))
+        self.assertEqual(
+            footprint.get_rect().size,
+            (int(car_image_size[1] * 0.1), int(car_image_size[0] * 0.1))
+        )
+        self.assertAlmostEqual(footprint.get_length(), car_image_size[1] * 0.1)
+        self.assertAlmostEqual(footprint.get_width(), car_image_size[0] * 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
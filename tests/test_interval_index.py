@@ -0,0 +1,70 @@
+import random
+import unittest
+from analisys.interval_index import IntervalIndex, car_interval_index
+from analisys.log_files_process import CarRecord
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(3)
+        self.intervals = []
+        for item in range(300):
+            start = generator.randint(0, 1000)
+            self.intervals.append(
+                (start, start + generator.randint(0, 80), item)
+            )
+        self.index = IntervalIndex(self.intervals)
+
+    def test_at(self):
+        for time in range(-5, 1100, 7):
+            expected = [item for start, end, item in self.intervals
+                        if start <= time < end]
+            self.assertEqual(sorted(self.index.at(time)), expected)
+            self.assertEqual(self.index.count_at(time), len(expected))
+        self.assertEqual(
+            self.index.get_occupancy([10, 500]),
+            [self.index.count_at(10), self.index.count_at(500)]
+        )
+
+    def test_overlapping(self):
+        for start in range(-5, 1100, 13):
+            for length in [1, 5, 60]:
+                expected = [
+                    item for interval_start, interval_end, item
+                    in self.intervals
+                    if interval_start < start + length and
+                    interval_end > max(start, interval_start)
+                ]
+                self.assertEqual(
+                    sorted(self.index.overlapping(start, start + length)),
+                    expected
+                )
+
+    def test_empty(self):
+        index = IntervalIndex([(3, 3, 0)])
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.at(3), [])
+        self.assertEqual(index.overlapping(0, 10), [])
+
+    def test_cars(self):
+        records = [
+            CarRecord(name, -1, 0, 0.0, creation_time, left_time, "s", 0.0,
+                      0.0, 0.0, 0)
+            for name, creation_time, left_time in [
+                (0, 0, 40), (1, 10, -1), (2, -1, 30), (3, 20, -1),
+                (4, 35, 50)
+            ]
+        ]
+        index = car_interval_index(records)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(
+            sorted(record.name for record in index.at(38)), [0, 1, 3, 4]
+        )
+        self.assertEqual(
+            sorted(record.name for record in index.at(1000)), [1, 3]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+from auxiliary_functions.auxiliary_functions import setup_logger
+from auxiliary_functions.json_lines import read_json_lines
+from analisys.log_files_process import iterate_left_intersection_records
+from tests.cars import log_cars
+
+
+class TestJsonLines(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_records(self):
+        path = self.directory + "left_intersection.log"
+        setup_logger("json_lines_test", path)
+        cars = log_cars(3)
+        cars[0].creation_time = None
+        logger = logging.getLogger("json_lines_test")
+        logger.info([car.to_json() for car in cars])
+        logger.info({"cars_simulated": 250})
+        with open(path) as log_file:
+            lines = log_file.readlines()
+        self.assertEqual(len(lines), 2)
+        for line in lines:
+            self.assertEqual(sorted(json.loads(line)), ["message", "time"])
+        with open(path) as log_file:
+            records = list(read_json_lines(log_file))
+        self.assertEqual(records[0]["message"][0]["creation_time"], None)
+        self.assertEqual(records[1]["message"], {"cars_simulated": 250})
+        with open(path) as log_file:
+            records = read_json_lines(log_file, null=-1)
+            self.assertEqual(
+                next(records)["message"][0]["creation_time"], -1
+            )
+        records = list(iterate_left_intersection_records(lines[:1]))
+        self.assertEqual([record.name for record in records], [0, 1, 2])
+        self.assertEqual(records[2].x_coordinate, 20.0)
+
+    def test_old_records(self):
+        lines = [
+            '{"time":"2018-01-01 00:00:00,000", "message":'
+            '{\'cars_simulated\': 250}},\n',
+            '\n',
+            '{"time":"2018-01-01 00:00:01,000", "message":'
+            '[{\'name\': 3, \'creation_time\': None}]},\n'
+        ]
+        records = list(read_json_lines(lines, null=-1))
+        self.assertEqual(records[0]["message"], {"cars_simulated": 250})
+        self.assertEqual(records[1]["message"],
+                         [{"name": 3, "creation_time": -1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
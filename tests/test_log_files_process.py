@@ -0,0 +1,104 @@
+import logging
+import shutil
+import tempfile
+import unittest
+from auxiliary_functions.auxiliary_functions import setup_logger
+from auxiliary_functions.log_writer import format_cars, format_collision, \
+    format_coordination
+from analisys.log_files_process import CarRecord, CollisionLogRecord, \
+    iterate_left_intersection_records, iterate_collision_records, \
+    generate_collision_cars_from_file, generate_coordination_info_from_file, \
+    coordination_cars
+from models.message import Message
+from tests.cars import log_cars
+
+
+class TestLogFilesProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+        self.cars = log_cars(4, "s")
+        for leader, follower in zip(self.cars, self.cars[1:]):
+            follower.set_following_car_message(Message(leader))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_log(self, name, formatter, payload):
+        path = self.directory + name + ".log"
+        setup_logger("log_files_process_" + name, path)
+        logger = logging.getLogger("log_files_process_" + name)
+        logger.info(formatter(payload))
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        return open(path)
+
+    def test_left_intersection_records(self):
+        with self.write_log("left", format_cars, [
+                car.get_log_state() for car in self.cars]) as log_file:
+            records = list(iterate_left_intersection_records(log_file))
+        self.assertEqual(len(records), 4)
+        self.assertIsInstance(records[0], CarRecord)
+        self.assertEqual(records[0].following, -1)
+        self.assertEqual(records[3].name, 3)
+        self.assertEqual(records[3].following, 2)
+        self.assertEqual(records[3].x_coordinate, 30.0)
+        self.assertIsInstance(records[3].intention, str)
+
+    def test_collisions(self):
+        with self.write_log("left", format_cars, [
+                self.cars[0].get_log_state()]) as log_file:
+            all_cars = {
+                record.name: record
+                for record in iterate_left_intersection_records(log_file)
+            }
+        collision = ("1234", 7, [car.get_log_state() for car in
+                                 self.cars[1:]],
+                     [self.cars[3].get_log_state(),
+                      self.cars[2].get_log_state()], ["1234"])
+        with self.write_log("collisions", format_collision,
+                            collision) as log_file:
+            records = list(iterate_collision_records(log_file))
+        self.assertEqual(len(records), 1)
+        self.assertIsInstance(records[0], CollisionLogRecord)
+        self.assertEqual(records[0].collided_names, (3, 2))
+        self.assertEqual(len(records[0].cars), 3)
+        with open(self.directory + "collisions.log") as log_file:
+            collisions_cars, collided_cars = (
+                generate_collision_cars_from_file(log_file, all_cars)
+            )
+        self.assertEqual(sorted(collisions_cars[0]), [1, 2, 3])
+        self.assertEqual(
+            sorted(car.get_name() for car in collided_cars[0]), [2, 3]
+        )
+        self.assertEqual(
+            collisions_cars[0][1].get_following_car_message().get_name(), 0
+        )
+        self.assertEqual(
+            collisions_cars[0][3].get_following_car_message().get_name(), 2
+        )
+
+    def test_coordinations(self):
+        coordination = (
+            self.cars[3].get_log_state(),
+            [car.get_log_state() for car in self.cars[:3]],
+            self.cars[2].get_log_state()
+        )
+        with self.write_log("coordination", format_coordination,
+                            coordination) as log_file:
+            coordination_info = generate_coordination_info_from_file(
+                log_file
+            )
+        self.assertEqual(list(coordination_info), [3])
+        self.assertEqual(coordination_info[3].selected_car.name, 2)
+        cars = coordination_cars(coordination_info[3])
+        self.assertEqual([car.get_name() for car in cars], [0, 1, 2, 3])
+        self.assertEqual(
+            [car.get_registered_caravan_depth() for car in cars],
+            [car.get_caravan_depth() for car in self.cars]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
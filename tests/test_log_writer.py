@@ -0,0 +1,141 @@
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import unittest
+from auxiliary_functions.auxiliary_functions import setup_logger
+from auxiliary_functions.log_writer import AsyncLogWriter, format_cars, \
+    format_cars_simulated
+from main import Simulation
+from tests.cars import log_cars
+
+
+def read_messages(path):
+    with open(path) as log_file:
+        return [json.loads(line)["message"] for line in log_file]
+
+
+class OddHandler(logging.Handler):
+    """
+    Handler that fails with the odd numbers of cars simulated.
+    """
+
+    def emit(self, record):
+        if record.msg["cars_simulated"] % 2:
+            raise ValueError(record.msg)
+
+
+class TestAsyncLogWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def wait_release(self, payload):
+        self.started.set()
+        self.release.wait()
+        return format_cars_simulated(payload)
+
+    def test_records(self):
+        setup_logger("sync_writer_test", self.directory + "sync.log")
+        setup_logger("async_writer_test", self.directory + "async.log")
+        writer = AsyncLogWriter(max_size=16, batch_size=5)
+        cars = log_cars(3)
+        for name in range(100):
+            logging.getLogger("sync_writer_test").info(
+                format_cars_simulated(name)
+            )
+            writer.put(logging.getLogger("async_writer_test"),
+                       format_cars_simulated, name)
+        logging.getLogger("sync_writer_test").info(
+            [car.to_json() for car in cars]
+        )
+        writer.put(logging.getLogger("async_writer_test"), format_cars,
+                   [car.get_log_state() for car in cars])
+        writer.flush()
+        self.assertEqual(read_messages(self.directory + "async.log"),
+                         read_messages(self.directory + "sync.log"))
+        writer.close()
+        writer.close()
+        self.assertEqual(writer.get_counters()["log_records_written"], 101)
+
+    def test_full_queue(self):
+        setup_logger("full_writer_test", self.directory + "full.log")
+        logger = logging.getLogger("full_writer_test")
+        for drop in [True, False]:
+            self.started.clear()
+            self.release.clear()
+            writer = AsyncLogWriter(max_size=1, drop=drop)
+            writer.put(logger, self.wait_release, 0)
+            self.started.wait()
+            writer.put(logger, format_cars_simulated, 1)
+            if not drop:
+                threading.Timer(0.1, self.release.set).start()
+            writer.put(logger, format_cars_simulated, 2)
+            self.release.set()
+            writer.close()
+            self.assertEqual(writer.get_counters(), {
+                "log_records_written": 2 + (not drop),
+                "log_puts_blocked": int(not drop),
+                "log_records_dropped": int(drop)
+            })
+
+    def test_failing_handler(self):
+        setup_logger("failing_writer_test", self.directory + "failing.log")
+        logger = logging.getLogger("failing_writer_test")
+        logger.handlers[0].stream.close()
+        raise_exceptions = logging.raiseExceptions
+        logging.raiseExceptions = False
+        try:
+            writer = AsyncLogWriter(max_size=4, batch_size=2)
+            for name in range(10):
+                writer.put(logger, format_cars_simulated, name)
+            writer.flush()
+            self.assertTrue(writer.thread.is_alive())
+            writer.close()
+        finally:
+            logging.raiseExceptions = raise_exceptions
+        counters = writer.get_counters()
+        self.assertEqual(counters["log_records_written"], 0)
+        self.assertEqual(counters["log_records_dropped"], 10)
+
+    def test_failing_other_handler(self):
+        setup_logger("other_writer_test", self.directory + "other.log")
+        logger = logging.getLogger("other_writer_test")
+        logger.addHandler(OddHandler())
+        raise_exceptions = logging.raiseExceptions
+        logging.raiseExceptions = False
+        try:
+            writer = AsyncLogWriter(max_size=4, batch_size=3)
+            for name in range(10):
+                writer.put(logger, format_cars_simulated, name)
+            writer.close()
+        finally:
+            logging.raiseExceptions = raise_exceptions
+        self.assertEqual(len(read_messages(self.directory + "other.log")), 10)
+        counters = writer.get_counters()
+        self.assertEqual(counters["log_records_written"], 5)
+        self.assertEqual(counters["log_records_dropped"], 5)
+
+    def test_simulation_logs(self):
+        for log_name, async_logs in [("_sync", False), ("_async", True)]:
+            results = {}
+            Simulation(False, 20, 5, True, seed=3, log=log_name,
+                       log_directory=self.directory, async_logs=async_logs,
+                       results=results).run()
+        self.assertEqual(results["log_records_dropped"], 0)
+        for log in ["coordination", "total_cars", "left_intersection",
+                    "collisions"]:
+            self.assertEqual(
+                read_messages("{}{}_async.log".format(self.directory, log)),
+                read_messages("{}{}_sync.log".format(self.directory, log))
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from pygame import Rect
+from auxiliary_functions.auxiliary_functions import random_car
+from models.car import SupervisorCar
+from models.message import NewCarMessage, InfoMessage
+from models.message_bus import MessageBus
+
+
+class TestMessageBus(unittest.TestCase):
+
+    def setUp(self):
+        self.full_intersection_rect = Rect(0, 0, 768, 768)
+        self.bus_cars = {}
+        self.broadcast_cars = {}
+        self.bus_messages = []
+        self.broadcast_messages = []
+
+    def spawn(self, cars, messages, name):
+        car = random_car(name, 20, 20, 0, 4, True, 5, lane=name % 4,
+                         intention=["l", "s", "r"][name % 3])
+        car.new_footprint()
+        if len(cars) == 0:
+            car.__class__ = SupervisorCar
+        cars[name] = car
+        messages.append(NewCarMessage(car))
+
+    def tick(self, cars, messages, deliver):
+        messages.sort(key=lambda message: message.get_value(), reverse=True)
+        deliver = deliver(messages)
+        new_messages = []
+        left_cars = []
+        for car in cars.values():
+            deliver(car)
+            car.update()
+            new_messages.extend(car.get_new_messages())
+            car.set_new_messages([])
+            if not car.get_rect().colliderect(self.full_intersection_rect):
+                left_cars.append(car)
+                if car.get_left_intersection_messages() is not None:
+                    new_messages.append(car.get_left_intersection_messages())
+        for car in left_cars:
+            del cars[car.get_name()]
+        return new_messages
+
+    @staticmethod
+    def deliver_to_all(messages):
+        def deliver(car):
+            for message in messages:
+                message.process(car)
+        return deliver
+
+    @staticmethod
+    def deliver_with_bus(messages):
+        return MessageBus(messages).deliver
+
+    def test_same_result_as_delivering_to_all_cars(self):
+        name = 0
+        for counter in range(600):
+            if counter % 20 == 0 and counter < 400:
+                self.spawn(self.bus_cars, self.bus_messages, name)
+                self.spawn(self.broadcast_cars, self.broadcast_messages, name)
+                name += 1
+            self.bus_messages = self.tick(
+                self.bus_cars, self.bus_messages, self.deliver_with_bus
+            )
+            self.broadcast_messages = self.tick(
+                self.broadcast_cars, self.broadcast_messages,
+                self.deliver_to_all
+            )
+            self.assertEqual(sorted(self.bus_cars),
+                             sorted(self.broadcast_cars))
+            for car_name, car in self.bus_cars.items():
+                other_car = self.broadcast_cars[car_name]
+                self.assertEqual(car.__class__, other_car.__class__)
+                self.assertEqual(car.get_following_car_name(),
+                                 other_car.get_following_car_name())
+                self.assertEqual(car.get_actual_coordinates(),
+                                 other_car.get_actual_coordinates())
+                self.assertEqual(sorted(car.get_cars_at_intersection()),
+                                 sorted(other_car.get_cars_at_intersection()))
+        self.assertGreater(name, 10)
+
+    def test_info_message_receivers(self):
+        for name in range(3):
+            self.spawn(self.bus_cars, self.bus_messages, name)
+        supervisor, leader, follower = [self.bus_cars[i] for i in range(3)]
+        follower.set_following_car_message(leader.get_info_message())
+        other_car_message = follower.get_info_message()
+        leader.set_following_car_message(other_car_message)
+        supervisor.update_cars_at_intersection_counter[1] = 1
+        message = InfoMessage(leader)
+        message_bus = MessageBus([message])
+        for car in [supervisor, leader, follower]:
+            message_bus.deliver(car)
+        self.assertIs(follower.get_following_car_message(), message)
+        self.assertIs(leader.get_following_car_message(), other_car_message)
+        self.assertEqual(supervisor.update_cars_at_intersection_counter[1], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from models.car import Car
+from models.message import Message, InfoMessage, NewCarMessage, \
+    LeftIntersectionMessage, SupervisorLeftIntersectionMessage
+from models.message_queue import MessageQueue
+
+
+class TestMessageQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = MessageQueue()
+        self.messages = []
+        for name in range(4):
+            car = Car(name)
+            self.messages.extend([
+                InfoMessage(car), LeftIntersectionMessage(car),
+                NewCarMessage(car), SupervisorLeftIntersectionMessage(car),
+                Message(car)
+            ])
+
+    def test_drain_in_priority_order(self):
+        self.queue.extend(self.messages[:10])
+        for message in self.messages[10:]:
+            self.queue.append(message)
+        self.assertEqual(len(self.queue), 20)
+        self.assertEqual(
+            self.queue.drain(),
+            sorted(self.messages, key=lambda message: message.get_value(),
+                   reverse=True)
+        )
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.drain(), [])
+
+    def test_counts(self):
+        self.queue.extend(self.messages)
+        counts = self.queue.get_counts()
+        self.assertEqual(counts[0], 8)
+        self.assertEqual(counts[1], 4)
+        self.assertEqual(counts[2], 4)
+        self.assertEqual(counts[5], 4)
+        self.assertEqual(counts[6], 0)
+        self.assertEqual(sum(counts.values()), len(self.messages))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from simulations.parameter_sweep import expand_grid, run_sweep, cell_seed
+from simulations.result_cache import ResultCache
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_grid(self):
+        cells = expand_grid(limit=10, base_seed=3)
+        names = [cell["name"] for cell in cells]
+        self.assertEqual(len(set(names)), len(cells))
+        self.assertEqual(len(set(cell["seed"] for cell in cells)), len(cells))
+        self.assertEqual(cells[0]["seed"], cell_seed(names[0], 3))
+        self.assertNotEqual(cell_seed(names[0], 3), cell_seed(names[0], 4))
+        self.assertTrue(all(cell["limit"] == 10 for cell in cells))
+
+    def test_sweep(self):
+        cells = expand_grid(limit=3)[-2:]
+        results = run_sweep(cells, processes=2, directory=self.directory)
+        self.assertEqual([result["name"] for result in results],
+                         [cell["name"] for cell in cells])
+        for result in results:
+            self.assertEqual(result["return_code"], 0)
+            for name in ["collisions.log", "coordination.log",
+                         "output.log"]:
+                self.assertTrue(
+                    os.path.exists(result["log_directory"] + name)
+                )
+        with open(self.directory + "summary.csv") as summary_file:
+            rows = list(csv.DictReader(summary_file))
+        self.assertEqual(sorted(row["name"] for row in rows),
+                         sorted(cell["name"] for cell in cells))
+
+    def test_cached_sweep(self):
+        cells = expand_grid(limit=3)[-2:]
+        cache = ResultCache(self.directory + "cache/", "version")
+        results = run_sweep(cells[:1], processes=1,
+                            directory=self.directory, cache=cache)
+        self.assertFalse(results[0]["cached"])
+        ticks = results[0]["ticks"]
+        self.assertGreater(ticks, 0)
+        results = run_sweep(cells, processes=1, directory=self.directory,
+                            cache=cache)
+        self.assertEqual([result["cached"] for result in results],
+                         [True, False])
+        self.assertEqual(results[0]["ticks"], ticks)
+        with open(self.directory + "summary.csv") as summary_file:
+            rows = list(csv.DictReader(summary_file))
+        self.assertEqual(len(rows), 2)
+
+if __name__ == '__main__':
+    unittest.main()
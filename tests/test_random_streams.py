@@ -0,0 +1,51 @@
+import unittest
+import random
+from auxiliary_functions.auxiliary_functions import random_car
+from auxiliary_functions.random_streams import RandomStreams
+
+
+class TestRandomStreams(unittest.TestCase):
+
+    @staticmethod
+    def draw(stream, number=5):
+        return [stream.randint(0, 1000) for _ in range(number)]
+
+    def test_same_seed_same_streams(self):
+        first, second = RandomStreams(4), RandomStreams(4)
+        self.assertEqual(self.draw(first.get("arrivals", 0)),
+                         self.draw(second.get("arrivals", 0)))
+        self.assertIs(first.get("arrivals", 0), first.get("arrivals", 0))
+
+    def test_streams_are_independent(self):
+        streams = RandomStreams(4)
+        values = self.draw(streams.get("arrivals", 1))
+        other_streams = RandomStreams(4)
+        self.draw(other_streams.get("cars", 1), 50)
+        self.assertEqual(self.draw(other_streams.get("arrivals", 1)), values)
+        self.assertNotEqual(self.draw(RandomStreams(4).get("arrivals", 2)),
+                            values)
+        self.assertNotEqual(self.draw(RandomStreams(5).get("arrivals", 1)),
+                            values)
+
+    def test_global_state_is_not_used(self):
+        random.seed(1)
+        values = self.draw(RandomStreams(4).get("attacks"))
+        random.seed(2)
+        self.assertEqual(self.draw(RandomStreams(4).get("attacks")), values)
+
+    def test_random_seed(self):
+        streams = RandomStreams()
+        self.assertEqual(self.draw(streams.get("cars")),
+                         self.draw(RandomStreams(streams.seed).get("cars")))
+
+    def test_random_car(self):
+        cars = [
+            random_car(1, 0, 20, 0, 4, True, 5,
+                       generator=RandomStreams(3).get("cars"))
+            for _ in range(2)
+        ]
+        self.assertEqual(cars[0].get_lane(), cars[1].get_lane())
+        self.assertEqual(cars[0].get_speed(), cars[1].get_speed())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+from simulations.result_cache import ResultCache, get_code_version
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+        self.cache = ResultCache(self.directory + "cache/", "version")
+        self.config = {"limit": 10, "fix": True, "args": [], "seed": 3}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_get(self):
+        self.assertIsNone(self.cache.get(self.config))
+        self.cache.put(self.config, {"return_code": 0, "collisions": 0})
+        self.assertEqual(self.cache.get(dict(self.config)),
+                         {"return_code": 0, "collisions": 0})
+        self.assertIsNone(self.cache.get(dict(self.config, seed=4)))
+        self.assertTrue(self.cache.invalidate(self.config))
+        self.assertFalse(self.cache.invalidate(self.config))
+        self.assertIsNone(self.cache.get(self.config))
+
+    def test_code_version(self):
+        self.cache.put(self.config, {"return_code": 0})
+        new_cache = ResultCache(self.cache.directory, "new_version")
+        self.assertIsNone(new_cache.get(self.config))
+        new_cache.put(self.config, {"return_code": -1})
+        self.assertEqual(self.cache.get(self.config), {"return_code": 0})
+        self.assertEqual(new_cache.prune(), 1)
+        self.assertIsNone(self.cache.get(self.config))
+        self.assertEqual(new_cache.get(self.config), {"return_code": -1})
+        self.assertEqual(get_code_version(), get_code_version())
+
+    def test_missing_logs(self):
+        log_directory = self.directory + "cell/"
+        os.makedirs(log_directory)
+        self.cache.put(self.config, {"log_directory": log_directory})
+        self.assertIsNotNone(self.cache.get(self.config))
+        shutil.rmtree(log_directory)
+        self.assertIsNone(self.cache.get(self.config))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from models.car import Car, SupervisorCar, SecondAtChargeCar
+from models.message import NewSupervisorMessage, SecondAtChargeMessage
+from models.role_registry import RoleRegistry
+
+
+class TestRoleRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = RoleRegistry()
+        self.events = []
+        self.registry.add_listener(
+            lambda car, old_role, new_role: self.events.append(
+                (car.get_name(), old_role, new_role)
+            )
+        )
+        self.cars = [Car(name) for name in range(4)]
+        self.cars[0].__class__ = SupervisorCar
+        for car in self.cars:
+            self.registry.add(car)
+
+    def test_roles(self):
+        self.assertEqual(len(self.registry), 4)
+        self.assertIs(self.registry.get_supervisor(), self.cars[0])
+        self.assertIsNone(self.registry.get_second_at_charge())
+        self.assertEqual(self.registry.get_cars("car"), self.cars[1:])
+        self.assertEqual(self.events[0], (0, None, "supervisor"))
+        self.assertEqual(self.events[1], (1, None, "car"))
+
+    def test_transitions(self):
+        supervisor, second_at_charge = self.cars[0], self.cars[2]
+        del self.events[:]
+        second_at_charge.make_second_at_charge(
+            SecondAtChargeMessage(supervisor, 2)
+        )
+        self.assertIs(self.registry.get_second_at_charge(), second_at_charge)
+        self.registry.remove(supervisor)
+        self.assertIsNone(self.registry.get_supervisor())
+        new_supervisor = self.cars[3]
+        new_supervisor.make_supervisor(NewSupervisorMessage(second_at_charge))
+        second_at_charge.make_car()
+        self.assertIs(self.registry.get_supervisor(), new_supervisor)
+        self.assertIsNone(self.registry.get_second_at_charge())
+        self.assertEqual(self.events, [
+            (2, "car", "second_at_charge"), (0, "supervisor", None),
+            (3, "car", "supervisor"), (2, "second_at_charge", "car")
+        ])
+
+    def test_attackers(self):
+        supervisor = self.cars[0]
+        supervisor.supervisor_lies = True
+        supervisor.update_role()
+        self.assertIsNone(self.registry.get_supervisor())
+        self.assertEqual(self.registry.get_attackers(), [supervisor])
+        del self.events[:]
+        self.cars[1].update_role()
+        self.assertEqual(self.events, [])
+
+    def test_unregistered_car(self):
+        car = Car(5)
+        car.__class__ = SecondAtChargeCar
+        car.make_car()
+        self.assertEqual(len(self.registry), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from models.car import Car, SupervisorCar, InfrastructureCar, \
+    SecondAtChargeCar
+from models.message import Message, FollowingCarMessage, \
+    SecondAtChargeMessage
+
+
+class TestSlots(unittest.TestCase):
+
+    def test_cars_have_no_dict(self):
+        car = Car(1)
+        for car_class in [SupervisorCar, InfrastructureCar,
+                          SecondAtChargeCar, Car]:
+            car.__class__ = car_class
+            self.assertFalse(hasattr(car, "__dict__"))
+        self.assertEqual(car.get_acceleration(), Car.default_acceleration_rate)
+        self.assertIs(car.get_following_car_message(),
+                      Car.default_following_car_message)
+        self.assertRaises(AttributeError, setattr, car, "speed", 1)
+
+    def test_messages_have_no_dict(self):
+        car = Car(1)
+        for message in [Message(), FollowingCarMessage(car, 2, 3),
+                        SecondAtChargeMessage(car, 2)]:
+            self.assertFalse(hasattr(message, "__dict__"))
+        self.assertEqual(FollowingCarMessage(car, 2, 3).get_value(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
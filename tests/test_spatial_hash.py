@@ -0,0 +1,51 @@
+import unittest
+import random
+from auxiliary_functions.auxiliary_functions import random_car, \
+    colliding_cars, colliding_pairs
+from auxiliary_functions.spatial_hash import SpatialHash
+
+
+class TestSpatialHash(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(3)
+        self.cars = []
+        for name in range(80):
+            car = random_car(name, 10, 10, 0, 4, True, 5,
+                             lane=random.randint(0, 3))
+            car.set_position(
+                (random.uniform(-20, 788), random.uniform(-20, 788))
+            )
+            car.set_direction(random.uniform(0, 360))
+            car.new_footprint()
+            self.cars.append(car)
+
+    def brute_force_pairs(self):
+        pairs = []
+        for i in range(len(self.cars)):
+            for j in range(i + 1, len(self.cars)):
+                if self.cars[i].get_rect().colliderect(
+                        self.cars[j].get_rect()):
+                    pairs.append((self.cars[i], self.cars[j]))
+        return pairs
+
+    def test_colliding_pairs(self):
+        pairs = self.brute_force_pairs()
+        self.assertTrue(len(pairs) > 1)
+        self.assertEqual(colliding_pairs(self.cars), pairs)
+        self.assertEqual(colliding_cars(self.cars), (pairs[0], True))
+        self.assertEqual(colliding_cars(self.cars[:1]), (None, False))
+
+    def test_collides(self):
+        spatial_hash = SpatialHash()
+        spatial_hash.build(self.cars[1:])
+        self.assertEqual(spatial_hash.collides(self.cars[0]),
+                         self.cars[0].collide(self.cars[1:]))
+        self.assertEqual(
+            spatial_hash.query(self.cars[0].get_rect()),
+            [car for car in self.cars[1:]
+             if car.get_rect().colliderect(self.cars[0].get_rect())]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
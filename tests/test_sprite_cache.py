@@ -0,0 +1,30 @@
+import unittest
+from models.footprint import Footprint
+from models.sprite_cache import SpriteCache, car_sprites
+
+
+class TestSpriteCache(unittest.TestCase):
+
+    def test_image_loaded_once(self):
+        self.assertIs(car_sprites.get_image(), car_sprites.get_image())
+
+    def test_quantize(self):
+        sprites = SpriteCache(car_sprites.image_path, 5.0)
+        self.assertEqual(sprites.quantize(0), 0)
+        self.assertEqual(sprites.quantize(7.6), 2)
+        self.assertEqual(sprites.quantize(358), 0)
+        self.assertEqual(sprites.quantize(-90), 54)
+
+    def test_rotated_image(self):
+        sprites = SpriteCache(car_sprites.image_path)
+        rotated_image = sprites.get_rotated_image(90.2, 0.05)
+        self.assertIs(rotated_image, sprites.get_rotated_image(89.9, 0.05))
+        self.assertEqual(
+            rotated_image.get_size(), Footprint(0, 0, 90, 0.05).get_rect().size
+        )
+        self.assertEqual(len(sprites.atlas), 1)
+        sprites.pre_render(0.05)
+        self.assertEqual(len(sprites.atlas), 360)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from models.car import Car, SupervisorCar
+from models.message import InfoMessage
+from models.state_table import StateTable
+
+
+class TestStateTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = StateTable(capacity=1)
+        self.leader = Car(0, 100.0, 200.0, 10.0, 180, lane=0,
+                          creation_time=3, intention="l")
+        self.other_car = SupervisorCar(1, 300.0, 400.0, 5.0, 90, lane=1,
+                                       creation_time=4, intention="r")
+        self.leader.new_footprint()
+        self.table.add(self.leader)
+        self.table.add(self.other_car)
+
+    def assert_same_message(self, view, message):
+        for getter in ["get_name", "get_actual_coordinates",
+                       "get_origin_coordinates", "get_acceleration",
+                       "get_lane", "get_creation_time", "is_new",
+                       "get_intention", "get_caravan_depth",
+                       "virtual_distance", "get_value"]:
+            self.assertEqual(getattr(view, getter)(),
+                             getattr(message, getter)())
+        self.assertEqual(view.speed, message.speed)
+        self.assertEqual(view.supervisor, message.supervisor)
+
+    def test_view_has_message_getters(self):
+        self.assertEqual(self.table.capacity, 2)
+        for car in [self.leader, self.other_car]:
+            view = self.table.publish(car)
+            self.assertIsInstance(view, InfoMessage)
+            self.assert_same_message(view, InfoMessage(car))
+
+    def test_views_keep_the_state_of_their_tick(self):
+        messages = []
+        views = []
+        for _ in range(3):
+            self.leader.update()
+            messages.append(InfoMessage(self.leader))
+            views.append(self.leader.get_new_messages()[-1])
+            self.table.advance()
+        for view, message in zip(views, messages):
+            self.assert_same_message(view, message)
+        self.assertIs(self.table.get_view(0), views[-1])
+        self.assertIs(self.table.get_view(0, 3), views[0])
+
+    def test_remove_freezes_views(self):
+        self.leader.update()
+        message = InfoMessage(self.leader)
+        view = self.leader.get_new_messages()[-1]
+        self.table.remove(self.leader)
+        self.assertIsNone(self.leader.state_table)
+        new_car = Car(2, 50.0, 60.0, 1.0, 0, lane=2, intention="s")
+        self.table.add(new_car)
+        self.assertEqual(self.table.slots[2], 0)
+        self.table.publish(new_car)
+        self.assert_same_message(view, message)
+
+    def test_heartbeat(self):
+        self.other_car.update_cars_at_intersection_counter[0] = 1
+        self.table.publish(self.leader).process(self.other_car)
+        self.assertEqual(
+            self.other_car.update_cars_at_intersection_counter[0], 4
+        )
+
+if __name__ == '__main__':
+    unittest.main()
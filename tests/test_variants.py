@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+from main import Simulation
+from simulations.variants import run_variants
+
+
+class TestVariants(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp() + "/"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_variants(self):
+        simulation = Simulation(False, 30, 5, True, seed=2)
+        for _ in range(300):
+            simulation.tick()
+        names = [car.get_name() for car in simulation.cars.values()]
+        results = run_variants(simulation, [
+            {"name": "same"},
+            {"name": "no_fix", "fix": False},
+            {"name": "lies", "supervisor_lies": True, "limit": 25},
+            {"name": "seed", "seed": 3}
+        ], self.directory, processes=2)
+        self.assertEqual([result["name"] for result in results],
+                         ["same", "no_fix", "lies", "seed"])
+        for result in results:
+            self.assertTrue(
+                os.path.exists(result["log_directory"] + "output.log")
+            )
+        # the simulation isn't changed by its variants
+        self.assertEqual(simulation.counter, 300)
+        self.assertEqual(
+            [car.get_name() for car in simulation.cars.values()], names
+        )
+        self.assertTrue(simulation.fix)
+        self.assertEqual(simulation.role_registry.get_attackers(), [])
+        results_dict = {}
+        simulation.results = results_dict
+        self.assertEqual(simulation.run(), results[0]["return_code"])
+        self.assertEqual(results_dict["ticks"], results[0]["ticks"])
+        self.assertLess(results[2]["ticks"], results[0]["ticks"])
+
+    def test_graphic_simulation(self):
+        simulation = Simulation(False, 30, 5, True, seed=2)
+        simulation.graphic_environment = True
+        self.assertRaises(ValueError, run_variants, simulation, [],
+                          self.directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from auxiliary_functions.auxiliary_functions import random_car
+from main import Simulation
+from models.vehicle_engine import VehicleEngine
+
+
+class TestVehicleEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = VehicleEngine(capacity=2)
+        self.engine_cars = []
+        self.scalar_cars = []
+        name = 0
+        for lane in range(4):
+            for intention in ["l", "s", "r"]:
+                for cars in [self.engine_cars, self.scalar_cars]:
+                    car = random_car(name, 10, 10, 0, 4, True, 5, lane=lane,
+                                     intention=intention)
+                    car.new_footprint()
+                    cars.append(car)
+                self.engine.add(self.engine_cars[-1])
+                name += 1
+
+    def test_step_matches_scalar_update(self):
+        for _ in range(300):
+            self.engine.step()
+            for car in self.scalar_cars:
+                car.update_kinematics()
+            for engine_car, scalar_car in zip(self.engine_cars,
+                                              self.scalar_cars):
+                self.assertEqual(engine_car.get_actual_coordinates(),
+                                 scalar_car.get_actual_coordinates())
+                self.assertEqual(engine_car.get_speed(),
+                                 scalar_car.get_speed())
+                self.assertEqual(engine_car.get_acceleration(),
+                                 scalar_car.get_acceleration())
+                self.assertEqual(engine_car.get_rect(), scalar_car.get_rect())
+
+    def test_simulation_matches_scalar_update(self):
+        states = []
+        for args in [(), ("vectorized",)]:
+            simulation = Simulation(False, 1000, 5, True, *args, seed=2)
+            state = []
+            for _ in range(600):
+                simulation.tick()
+                state.append([
+                    (name, car.get_actual_coordinates(), car.get_speed(),
+                     car.get_acceleration(), car.get_control_law_value(),
+                     car.get_last_virtual_distance(),
+                     car.get_controller().__name__)
+                    for name, car in sorted(simulation.cars.items())
+                ])
+            states.append(state)
+        self.assertEqual(states[1], states[0])
+        self.assertIn("follower_controller", [
+            car_state[-1] for tick_state in states[1]
+            for car_state in tick_state
+        ])
+
+    def test_slots(self):
+        self.assertEqual(len(self.engine), 12)
+        self.assertEqual(self.engine.capacity, 16)
+        slot = self.engine.get_slot(5)
+        other_slot = self.engine.get_slot(6)
+        self.engine.remove(self.engine_cars[5])
+        self.assertEqual(len(self.engine), 11)
+        self.assertEqual(self.engine.get_slot(6), other_slot)
+        self.assertEqual(self.engine.add(self.scalar_cars[5]), slot)
+
+    def test_empty_engine(self):
+        engine = VehicleEngine(capacity=0)
+        self.assertEqual(engine.add(self.scalar_cars[0]), 0)
+        self.assertEqual(engine.capacity, 1)
+        engine.add(self.scalar_cars[1])
+        self.assertEqual(engine.capacity, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from models import virtual_caravan
+from models.virtual_caravan import intention_codes
+
+
+class TestVirtualCaravan(unittest.TestCase):
+
+    def setUp(self):
+        virtual_x, virtual_y = np.meshgrid(
+            np.linspace(0, 700, 71), np.linspace(-300, 300, 61)
+        )
+        self.virtual_x = virtual_x.ravel()
+        self.virtual_y = virtual_y.ravel()
+
+    def test_straight(self):
+        self.assertEqual(virtual_caravan.virtual_distance(120.5, 3, "s"),
+                         120.5)
+
+    def test_batched_matches_scalar(self):
+        for intention in ["l", "s", "r"]:
+            distances = virtual_caravan.virtual_distances(
+                self.virtual_x, self.virtual_y,
+                np.repeat(intention_codes[intention], len(self.virtual_x))
+            )
+            for virtual_x, virtual_y, distance in zip(
+                    self.virtual_x, self.virtual_y, distances):
+                self.assertEqual(
+                    virtual_caravan.virtual_distance(
+                        virtual_x, virtual_y, intention),
+                    distance
+                )
+
+    def test_positions(self):
+        origin_sin, origin_cos = np.sin(np.pi / 2), np.cos(np.pi / 2)
+        virtual_x, virtual_y = virtual_caravan.virtual_positions(
+            np.array([700.0, 760.0]), np.array([345.0, 300.0]),
+            760.0, 345.0, origin_sin, origin_cos
+        )
+        self.assertEqual(
+            (virtual_x[0], virtual_y[0]),
+            virtual_caravan.virtual_position(700.0, 345.0, 760.0, 345.0,
+                                             origin_sin, origin_cos)
+        )
+        self.assertAlmostEqual(virtual_x[0], 60)
+        self.assertAlmostEqual(virtual_y[1], -45)
+
+    def test_cross_path(self):
+        tables = [
+            [[True, True, True], [True, True, True], [True, True, True]],
+            [[True, True, False], [True, True, False], [False, True, False]],
+            [[True, True, True], [True, False, False], [True, False, False]],
+            [[True, True, False], [True, True, True], [False, False, False]]
+        ]
+        for lane in range(4):
+            for other_lane in range(4):
+                for intention in "lsr":
+                    for other_intention in "lsr":
+                        self.assertIs(
+                            virtual_caravan.cross_path(
+                                lane, intention, other_lane, other_intention
+                            ),
+                            tables[(lane - other_lane) % 4][
+                                intention_codes[intention]
+                            ][intention_codes[other_intention]]
+                        )
+                        self.assertEqual(
+                            (other_lane, other_intention) in
+                            virtual_caravan.crossing_paths[(lane, intention)],
+                            virtual_caravan.cross_path(
+                                lane, intention, other_lane, other_intention
+                            )
+                        )
+
+if __name__ == '__main__':
+    unittest.main()